@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Rolling-Origin Backtesting - Forecast Accuracy at Scale
+
+The Accuracy Dashboard lists MAPE, MAE, RMSE and Bias as formula text and
+expects ranges to be wired up by hand. This module measures them properly:
+for every forecast origin (e.g. each day of a year) it fits each method on
+the history before the origin, forecasts the following days and compares
+against what actually happened.
+
+Methods:
+- holt_winters: double seasonal Holt-Winters (holt_winters.py)
+- seasonal_decomposition: full-history indices × trend (seasonal_decomposition.py)
+- exponential_smoothing: simple exponential smoothing (α = 0.3, as on the
+  template sheet) run separately for each interval of the day
+- seasonal_naive: same interval one week earlier (the benchmark to beat)
+
+Metrics (as defined on the Accuracy Dashboard):
+    MAPE = mean(|A - F| / A) × 100   (intervals with A = 0 are skipped)
+    MAE  = mean(|A - F|)
+    RMSE = sqrt(mean((A - F)²))
+    Bias = mean(F - A)
+reported overall and by interval, day type and horizon (days ahead).
+
+Every method returns its forecast keyed by Date and Interval_Index, and
+forecasts are joined to the actuals on those keys.
+
+Origins are split into blocks and evaluated in parallel on a process pool;
+each worker receives the history once, when it starts.
+
+Usage:
+    python backtest.py call_center_annual_data.csv --days 7 --step 1
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from holt_winters import forecast_intervals
+from interval_data import read_interval_data
+from seasonal_decomposition import decompose, forecast_decomposition
+
+SES_ALPHA = 0.3
+MIN_HISTORY_DAYS = 28
+ORIGINS_PER_TASK = 16
+METRIC_COLUMNS = ['MAPE', 'MAE', 'RMSE', 'Bias', 'N']
+
+# History shared with each worker process (set once by _init_worker)
+_HISTORY = None
+
+
+def _keyed(train, frame, column):
+    """Forecast rows labelled by Date and Time_Interval, keyed by Date and Interval_Index"""
+    labels = train.drop_duplicates('Interval_Index')
+    index = dict(zip(labels['Time_Interval'].astype(str), labels['Interval_Index']))
+    return pd.DataFrame({
+        'Date': frame['Date'].to_numpy(),
+        'Interval_Index': frame['Time_Interval'].astype(str).map(index).to_numpy(),
+        'Forecast': frame[column].to_numpy(dtype=float),
+    })
+
+
+def _next_days(train, values, days):
+    """Day-major forecast values for the days after the training data, keyed by Date and Interval_Index"""
+    intervals = np.sort(train['Interval_Index'].unique())
+    dates = pd.date_range(train['Date'].max() + pd.Timedelta(days=1), periods=days)
+    return pd.DataFrame({
+        'Date': np.repeat(dates, len(intervals)),
+        'Interval_Index': np.tile(intervals, days),
+        'Forecast': values,
+    })
+
+
+def forecast_holt_winters(train, days):
+    return _keyed(train, forecast_intervals(train, days=days)[0], 'Forecasted_Calls')
+
+
+def forecast_seasonal_decomposition(train, days):
+    return _keyed(train, forecast_decomposition(decompose(train), days=days), 'Forecast')
+
+
+def _daily_matrix(train):
+    """Calls as a (days, intervals) matrix, summed over sites/queues"""
+    totals = train.groupby(['Date', 'Interval_Index'], observed=True)['Calls_Offered'].sum()
+    return totals.unstack('Interval_Index').to_numpy(dtype=float)
+
+
+def forecast_exponential_smoothing(train, days):
+    matrix = _daily_matrix(train)
+    level = matrix[0].copy()
+    for row in matrix[1:]:
+        level += SES_ALPHA * (row - level)
+    return _next_days(train, np.tile(level, days), days)
+
+
+def forecast_seasonal_naive(train, days):
+    matrix = _daily_matrix(train)
+    last_week = matrix[-7:]
+    return _next_days(train, np.concatenate([last_week[day % len(last_week)] for day in range(days)]), days)
+
+
+METHODS = {
+    'holt_winters': forecast_holt_winters,
+    'seasonal_decomposition': forecast_seasonal_decomposition,
+    'exponential_smoothing': forecast_exponential_smoothing,
+    'seasonal_naive': forecast_seasonal_naive,
+}
+
+
+def day_type(history):
+    """Weekday / Weekend / Holiday label per row"""
+    weekend = np.where(history['Date'].dt.dayofweek.to_numpy() >= 5, 'Weekend', 'Weekday')
+    if 'Holiday_Name' in history.columns:
+        holiday = history['Holiday_Name'].astype(str).to_numpy() != ''
+        return np.where(holiday, 'Holiday', weekend)
+    return weekend
+
+
+def _init_worker(history):
+    global _HISTORY
+    _HISTORY = history
+
+
+def _run_block(method, origins, days):
+    """Forecast every origin in a block; returns one error frame"""
+    history = _HISTORY
+    forecast = METHODS[method]
+    frames = []
+
+    for origin in origins:
+        train = history[history['Date'] < origin]
+        end = origin + pd.Timedelta(days=days)
+        actual = history[(history['Date'] >= origin) & (history['Date'] < end)]
+        actual = (actual.groupby(['Date', 'Interval_Index'], observed=True)
+                  .agg(Actual=('Calls_Offered', 'sum'), Time_Interval=('Time_Interval', 'first'),
+                       Day_Type=('Day_Type', 'first'))
+                  .reset_index())
+        # Match forecasts to actuals by date and interval, never by position
+        actual = actual.merge(forecast(train, days), on=['Date', 'Interval_Index'], how='inner')
+        actual['Horizon'] = (actual['Date'] - origin).dt.days + 1
+        actual['Origin'] = origin
+        actual['Method'] = method
+        frames.append(actual)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def plan_origins(history, start=None, end=None, step=1, days=7, min_history_days=MIN_HISTORY_DAYS):
+    """Forecast origins every `step` days, leaving min_history_days of training data"""
+    dates = pd.DatetimeIndex(np.sort(history['Date'].unique()))
+    first = dates[0] + pd.Timedelta(days=min_history_days)
+    last = dates[-1] - pd.Timedelta(days=days - 1)
+    if start is not None:
+        first = max(first, pd.Timestamp(start))
+    if end is not None:
+        last = min(last, pd.Timestamp(end))
+    return pd.date_range(first, last, freq=f'{step}D')
+
+
+def accuracy_metrics(errors, by=None):
+    """MAPE, MAE, RMSE, Bias and N per method (and per `by` column)"""
+    frame = pd.DataFrame({
+        'Method': errors['Method'],
+        'error': errors['Forecast'] - errors['Actual'],
+    })
+    if by is not None:
+        frame[by] = errors[by].to_numpy()
+    frame['abs_error'] = frame['error'].abs()
+    frame['sq_error'] = frame['error'] ** 2
+    actual = errors['Actual'].to_numpy(dtype=float)
+    frame['pct_error'] = np.where(actual > 0, frame['abs_error'] / np.where(actual > 0, actual, 1) * 100, np.nan)
+
+    keys = ['Method'] if by is None else ['Method', by]
+    grouped = frame.groupby(keys, observed=True, sort=True)
+    metrics = pd.DataFrame({
+        'MAPE': grouped['pct_error'].mean(),
+        'MAE': grouped['abs_error'].mean(),
+        'RMSE': np.sqrt(grouped['sq_error'].mean()),
+        'Bias': grouped['error'].mean(),
+        'N': grouped['error'].size(),
+    })
+    return metrics.round(3).reset_index()
+
+
+def run_backtest(history, methods=None, days=7, step=1, start=None, end=None, workers=None):
+    """
+    Rolling-origin backtest of the forecasting methods.
+
+    Args:
+        history: typed interval frame (see interval_data.read_interval_data)
+        methods: names from METHODS (default: all)
+        days: forecast horizon per origin, in days
+        step: days between origins (1 = daily origins)
+        start, end: optional first/last origin date
+        workers: process count (default: all cores)
+
+    Returns:
+        (errors, report): errors has one row per method × origin × interval;
+        report maps 'overall', 'interval', 'day_type' and 'horizon' to metric
+        tables
+    """
+    methods = list(methods or METHODS)
+    history = history.copy()
+    history['Day_Type'] = day_type(history)
+    origins = plan_origins(history, start, end, step, days)
+
+    tasks = [(method, origins[i:i + ORIGINS_PER_TASK])
+             for method in methods for i in range(0, len(origins), ORIGINS_PER_TASK)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(history,)) as pool:
+        futures = [pool.submit(_run_block, method, block, days) for method, block in tasks]
+        errors = pd.concat([future.result() for future in futures], ignore_index=True)
+
+    report = {
+        'overall': accuracy_metrics(errors),
+        'interval': accuracy_metrics(errors, 'Time_Interval'),
+        'day_type': accuracy_metrics(errors, 'Day_Type'),
+        'horizon': accuracy_metrics(errors, 'Horizon'),
+    }
+    return errors, report
+
+
+def write_report(report, output_file):
+    """Write all metric tables to one CSV with Breakdown/Group columns"""
+    frames = []
+    for breakdown, table in report.items():
+        table = table.copy()
+        group_column = [c for c in table.columns if c not in ['Method'] + METRIC_COLUMNS]
+        table.insert(1, 'Breakdown', breakdown)
+        table.insert(2, 'Group', table.pop(group_column[0]).astype(str) if group_column else 'All')
+        frames.append(table)
+    pd.concat(frames, ignore_index=True).to_csv(output_file, index=False)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rolling-origin forecast backtest (MAPE, MAE, RMSE, Bias)')
+    parser.add_argument('history', nargs='?', default='call_center_annual_data.csv',
+                        help='interval history: .csv, .parquet, .feather or .npz (default: %(default)s)')
+    parser.add_argument('--methods', nargs='+', choices=list(METHODS), help='methods to evaluate (default: all)')
+    parser.add_argument('--days', type=int, default=7, help='forecast horizon in days (default: 7)')
+    parser.add_argument('--step', type=int, default=1, help='days between forecast origins (default: 1)')
+    parser.add_argument('--start', help='first origin date (default: 28 days into the history)')
+    parser.add_argument('--end', help='last origin date')
+    parser.add_argument('--workers', type=int, help='worker processes (default: all cores)')
+    parser.add_argument('--output', default='backtest_metrics.csv', help='metrics CSV (default: %(default)s)')
+    args = parser.parse_args()
+
+    history = read_interval_data(args.history)
+    started = time.perf_counter()
+    errors, report = run_backtest(history, args.methods, days=args.days, step=args.step,
+                                  start=args.start, end=args.end, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    write_report(report, args.output)
+
+    origins = errors['Origin'].nunique()
+    print(f"✓ Backtested {origins} origins × {errors['Method'].nunique()} methods "
+          f"in {elapsed:.1f}s on {args.workers or os.cpu_count()} workers")
+    print(report['overall'].to_string(index=False))
+    print(f"✓ Saved metrics by interval, day type and horizon to {args.output}")
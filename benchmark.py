@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmarks - Timing and Memory Baselines for the Planning Tools
+
+Times the stages of the nightly planning run at 1×, 10× and 100× the shipped
+dataset sizes (one year of intervals in call_center_annual_data.csv, 216
+intervals in erlang_c_staffing_forecast.csv):
+
+    generate_annual_data              reference generator, rows/sec (one year only,
+                                      its date range is fixed)
+    generate_annual_data_vectorized   NumPy generator over scale × years, rows/sec
+    erlang_c_metrics                  exact Erlang C per interval (SL, ASA, occupancy)
+    required_agents                   Erlang C staffing solve per interval
+    holt_winters_fit                  forecast_intervals(): Holt-Winters fit over the whole
+                                      history + 7-day forecast
+    seasonal_decomposition            decompose() over the full history
+    create_service_level_worksheet    default Schedule_Service_Level update (one size only,
+                                      it writes a fixed one-day sample)
+    service_level_streaming           full-horizon streamed worksheet (forecast × scale)
+    create_forecast_template          create_forecast_template.main() with --history
+
+Each case runs in a fresh process, so its peak memory (peak RSS of that
+process, inputs included) is not inflated by earlier cases; the fastest of
+--repeat runs is kept. Inputs are generated once per scale before timing,
+in a process of their own, and peaks are read from VmHWM, which a spawned
+process does not inherit (see run_metrics.peak_rss_mb()).
+
+Results are written to benchmark_results.json. With --save-baseline they
+become the baseline (benchmark_baseline.json), together with the regression
+thresholds; later runs compare against it and exit with status 1 when a case
+is slower or uses more memory than its baseline allows:
+
+    python benchmark.py --save-baseline               # once, on the nightly machine
+    python benchmark.py                               # every night: compare
+    python benchmark.py --scales 1 10 --cases erlang_c_metrics holt_winters_fit
+
+Baselines are machine-specific; record them on the machine that runs the
+comparison.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from run_metrics import peak_rss_mb, reset_peak_rss
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+SHIPPED_FORECAST = os.path.join(REPO_DIR, 'erlang_c_staffing_forecast.csv')
+SHIPPED_WORKBOOK = os.path.join(REPO_DIR, 'erlang_c_staffing_forecast.xlsx')
+# Rows create_service_level_worksheet() writes (a one-day sample of the forecast)
+SERVICE_LEVEL_SAMPLE_ROWS = 36
+
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+DEFAULT_RESULTS = 'benchmark_results.json'
+
+# Allowed slowdown / memory growth over the baseline before a run fails
+DEFAULT_THRESHOLDS = {'seconds': 0.25, 'peak_rss_mb': 0.20}
+# Differences below these are timer and allocator noise, not regressions
+NOISE_FLOOR = {'seconds': 0.05, 'peak_rss_mb': 10.0}
+
+
+# =====================================================================
+# INPUTS
+# =====================================================================
+
+def history_file(workdir, scale):
+    return os.path.join(workdir, f'history_{scale}x.csv')
+
+
+def scale_dir(workdir, scale):
+    return os.path.join(workdir, f'{scale}x')
+
+
+def prepare_inputs(workdir, scales):
+    """Generate the scaled history and forecast files (not timed)"""
+    from erlang_tables import load_table
+    from generate_annual_call_data import generate_annual_data_vectorized
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        os.chdir(workdir)
+        # Build the shared Erlang C table (kept next to erlang_tables.py) untimed
+        load_table()
+        forecast = pd.read_csv(SHIPPED_FORECAST)
+        for scale in scales:
+            if not os.path.exists(history_file(workdir, scale)):
+                generate_annual_data_vectorized(datetime(2025, 1, 1), datetime(2024 + scale, 12, 31),
+                                                output_file=history_file(workdir, scale))
+            directory = scale_dir(workdir, scale)
+            os.makedirs(directory, exist_ok=True)
+            pd.concat([forecast] * scale, ignore_index=True).to_csv(
+                os.path.join(directory, 'erlang_c_staffing_forecast.csv'), index=False)
+
+
+def load_history(workdir, scale):
+    from interval_data import read_interval_data
+    return read_interval_data(history_file(workdir, scale))
+
+
+def interval_inputs(workdir, scale):
+    """Calls, AHT and a staffing level per interval of the scaled history"""
+    from erlang_c import traffic_intensity
+    history = load_history(workdir, scale)
+    calls = history['Calls_Offered'].to_numpy(dtype=float)
+    aht = history['Average_Handle_Time_Seconds'].to_numpy(dtype=float)
+    agents = np.ceil(traffic_intensity(calls, aht)) + 2
+    return calls, aht, agents
+
+
+# =====================================================================
+# CASES
+# =====================================================================
+# Each case prepares its inputs, then returns (rows processed, timed callable)
+
+def case_generate_annual_data(workdir, scale):
+    from generate_annual_call_data import generate_annual_data
+
+    def run():
+        random.seed(42)
+        generate_annual_data()
+    return 365 * 36, run
+
+
+def case_generate_annual_data_vectorized(workdir, scale):
+    from generate_annual_call_data import generate_annual_data_vectorized
+    days = (datetime(2024 + scale, 12, 31) - datetime(2025, 1, 1)).days + 1
+    return days * 36, lambda: generate_annual_data_vectorized(
+        datetime(2025, 1, 1), datetime(2024 + scale, 12, 31), output_file='generated.csv')
+
+
+def case_erlang_c_metrics(workdir, scale):
+    from erlang_c import erlang_c_metrics
+    calls, aht, agents = interval_inputs(workdir, scale)
+    return len(calls), lambda: erlang_c_metrics(calls, aht, agents)
+
+
+def case_required_agents(workdir, scale):
+    from erlang_c import required_agents
+    calls, aht, _ = interval_inputs(workdir, scale)
+    return len(calls), lambda: required_agents(calls, aht)
+
+
+def case_holt_winters_fit(workdir, scale):
+    from holt_winters import forecast_intervals
+    history = load_history(workdir, scale)
+    # The default fit window is the last few weeks; fit everything so the work scales
+    return len(history), lambda: forecast_intervals(history, days=7, history_weeks=None)
+
+
+def case_seasonal_decomposition(workdir, scale):
+    from seasonal_decomposition import decompose
+    history = load_history(workdir, scale)
+    return len(history), lambda: decompose(history)
+
+
+def case_create_service_level_worksheet(workdir, scale):
+    from create_service_level_calculator import create_service_level_worksheet
+    shutil.copy(SHIPPED_WORKBOOK, 'erlang_c_staffing_forecast.xlsx')
+    return SERVICE_LEVEL_SAMPLE_ROWS, create_service_level_worksheet
+
+
+def case_service_level_streaming(workdir, scale):
+    from create_service_level_calculator import create_service_level_worksheet_streaming
+    return 216 * scale, lambda: create_service_level_worksheet_streaming(
+        output_filename='erlang_c_service_level_full.xlsx')
+
+
+def case_create_forecast_template(workdir, scale):
+    from create_forecast_template import main
+    return len(load_history(workdir, scale)), lambda: main(
+        history_file=history_file(workdir, scale), forecast_days=7, filename='call_center_forecast_template.xlsx')
+
+
+CASES = {
+    'generate_annual_data': case_generate_annual_data,
+    'generate_annual_data_vectorized': case_generate_annual_data_vectorized,
+    'erlang_c_metrics': case_erlang_c_metrics,
+    'required_agents': case_required_agents,
+    'holt_winters_fit': case_holt_winters_fit,
+    'seasonal_decomposition': case_seasonal_decomposition,
+    'create_service_level_worksheet': case_create_service_level_worksheet,
+    'service_level_streaming': case_service_level_streaming,
+    'create_forecast_template': case_create_forecast_template,
+}
+
+# Cases whose input size is fixed by the code under test
+FIXED_SIZE = {'generate_annual_data', 'create_service_level_worksheet'}
+
+
+def in_fresh_process(function, *args):
+    """Call function(*args) in a newly spawned process and return its result"""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(function, *args).result()
+
+
+def run_case(name, workdir, scale):
+    """Run one case in the current (fresh) process and measure it"""
+    # Count memory from this process's current RSS, not an inherited peak
+    reset_peak_rss()
+    os.chdir(scale_dir(workdir, scale))
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows, run = CASES[name](workdir, scale)
+        started = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - started
+    return {'rows': rows, 'seconds': seconds, 'peak_rss_mb': peak_rss_mb()}
+
+
+def measure(name, workdir, scale, repeat):
+    """Fastest of `repeat` runs, each in its own process, with the largest peak memory"""
+    runs = [in_fresh_process(run_case, name, workdir, scale) for _ in range(repeat)]
+    seconds = min(run['seconds'] for run in runs)
+    rows = runs[0]['rows']
+    return {
+        'rows': rows,
+        'seconds': round(seconds, 4),
+        'rows_per_second': round(rows / seconds, 1) if seconds else None,
+        'us_per_row': round(seconds / rows * 1e6, 3) if rows else None,
+        'peak_rss_mb': round(max(run['peak_rss_mb'] for run in runs), 1),
+    }
+
+
+# =====================================================================
+# BASELINES
+# =====================================================================
+
+def run_benchmarks(cases, scales, repeat=3, workdir=None):
+    """
+    Measure every case at every scale.
+
+    Returns:
+        results dict: machine details plus {"<case>@<scale>x": metrics}
+    """
+    owned = workdir is None
+    workdir = os.path.abspath(workdir or tempfile.mkdtemp(prefix='benchmark_'))
+    os.makedirs(workdir, exist_ok=True)
+    cwd = os.getcwd()
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'processor': platform.processor(), 'cpus': os.cpu_count()},
+        'repeat': repeat,
+        'cases': {},
+    }
+    try:
+        # Generating the 100x history takes far more memory than most cases; keep it out of this process
+        in_fresh_process(prepare_inputs, workdir, scales)
+        for scale in scales:
+            for name in cases:
+                if name in FIXED_SIZE and scale != 1:
+                    continue
+                key = f'{name}@{scale}x'
+                results['cases'][key] = metrics = measure(name, workdir, scale, repeat)
+                print(f"  {key:<42} {metrics['seconds']:>9.3f} s  {metrics['rows_per_second'] or 0:>12,.0f} rows/s"
+                      f"  {metrics['peak_rss_mb']:>8.1f} MB")
+    finally:
+        os.chdir(cwd)
+        if owned:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, thresholds=None):
+    """
+    Cases that got slower or bigger than their baseline allows.
+
+    Args:
+        results: run_benchmarks() output
+        baseline: a saved results dict (with its "thresholds")
+        thresholds: {metric: allowed relative increase}, overriding the
+            baseline's own
+
+    Returns:
+        list of (case, metric, baseline value, current value, limit)
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **baseline.get('thresholds', {}), **(thresholds or {})}
+    regressions = []
+    for key, current in results['cases'].items():
+        previous = baseline['cases'].get(key)
+        if previous is None:
+            continue
+        for metric, allowed in thresholds.items():
+            limit = max(previous[metric] * (1 + allowed), previous[metric] + NOISE_FLOOR[metric])
+            if current[metric] > limit:
+                regressions.append((key, metric, previous[metric], current[metric], limit))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the planning tools at 1×, 10× and 100× data sizes')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help='multiples of the shipped dataset sizes (default: 1 10 100)')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES),
+                        help='cases to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case, fastest kept (default: %(default)s)')
+    parser.add_argument('--workdir', help='directory for generated inputs, kept for reuse (default: temporary)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON (default: %(default)s)')
+    parser.add_argument('--output', default=DEFAULT_RESULTS, help='results JSON (default: %(default)s)')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--time-threshold', type=float,
+                        help=f"allowed slowdown, e.g. 0.25 = 25%% (default: baseline's or "
+                             f"{DEFAULT_THRESHOLDS['seconds']})")
+    parser.add_argument('--memory-threshold', type=float,
+                        help=f"allowed peak memory growth (default: baseline's or "
+                             f"{DEFAULT_THRESHOLDS['peak_rss_mb']})")
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.time_threshold is not None:
+        overrides['seconds'] = args.time_threshold
+    if args.memory_threshold is not None:
+        overrides['peak_rss_mb'] = args.memory_threshold
+
+    print(f"Benchmarking {len(args.cases)} cases at {', '.join(f'{scale}×' for scale in args.scales)} "
+          f"(best of {args.repeat})")
+    results = run_benchmarks(args.cases, args.scales, args.repeat, args.workdir)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"✓ Saved results to {args.output}")
+
+    if args.save_baseline:
+        results['thresholds'] = {**DEFAULT_THRESHOLDS, **overrides}
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Saved baseline to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, overrides)
+        compared = len(set(results['cases']) & set(baseline['cases']))
+        if regressions:
+            print(f"✗ {len(regressions)} regression(s) against {args.baseline}:")
+            for key, metric, previous, current, limit in regressions:
+                print(f"  {key} {metric}: {previous} → {current} (limit {limit:.3f})")
+            sys.exit(1)
+        print(f"✓ No regressions in {compared} cases against {args.baseline}")
+    else:
+        print(f"! No baseline at {args.baseline}; run with --save-baseline to record one")
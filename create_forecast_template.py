@@ -5,19 +5,79 @@ Create Excel Forecast Template for Call Center Workforce Planning
 This script generates a comprehensive Excel workbook with pre-built worksheets
 for forecasting call center volumes using multiple methods.
 
-Requires: openpyxl (pip install openpyxl)
+Requires: openpyxl, numpy, pandas (pip install openpyxl numpy pandas)
 """
 
 try:
     from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
     from openpyxl.utils import get_column_letter
+    from openpyxl.utils.datetime import to_excel
     from openpyxl.worksheet.datavalidation import DataValidation
 except ImportError:
     print("ERROR: openpyxl library not found.")
     print("Please install it using: pip install openpyxl")
     exit(1)
 
+import calendar
+import time
+from copy import copy
+
+import numpy as np
+
+from erlang_c import required_agents
+from holt_winters import forecast_intervals
+from seasonal_decomposition import decompose, forecast_decomposition
+from interval_data import read_interval_data, INTERVAL_MINUTES
+from k_calibration import load_k_table
+from run_metrics import RunMetrics, add_arguments as add_metrics_arguments, stage
+from xlsx_cache import cache_formula_values, excel_round
+
+# Largest calls-per-interval value in the Staffing Calculator's Erlang C table
+ERLANG_TABLE_MAX_CALLS = 200
+
+# Last 'Data Input' row the template's formulas reference ($5:$1000)
+DATA_INPUT_LAST_ROW = 1000
+
+STAFFING_SHEET = "👥 Staffing Calculator"
+FORECAST_SHEET = "📈 FORECAST.ETS"
+DECOMPOSITION_SHEET = "📉 Seasonal Decomp"
+
+# Staffing Calculator configuration cells: B5 interval length, B6 AHT, B7 K-value
+STAFFING_INTERVAL_SECONDS = 900
+STAFFING_AHT = 270
+STAFFING_K = 1.6
+
+# Calibrated K table (k_calibration.py) beside the Erlang C table: header row
+# and key/K columns, plus the per-row lookup key for each grouping
+K_TABLE_HEADER_ROW = 10
+K_TABLE_COLUMNS = ('N', 'O', 'P', 'Q')
+K_LOOKUP_KEYS = {
+    'interval': ('B{row}', 0),
+    'day_type': ('IF(WEEKDAY(A{row},2)>5,"Weekend","Weekday")', 0),
+    'traffic_band': ('D{row}', 1),
+}
+
+def interval_labels(spec=None, interval_minutes=INTERVAL_MINUTES):
+    """
+    Interval labels for an expanded template.
+
+    Args:
+        spec: "08:00-20:00" for every interval between opening and closing,
+            or a comma-separated list of labels ("08:00-08:15,08:15-08:30");
+            None for a full 24-hour day
+        interval_minutes: interval length for a range spec
+    """
+    if spec and ',' in spec:
+        return [label.strip() for label in spec.split(',') if label.strip()]
+    start, end = (spec or '00:00-24:00').split('-')
+    first = int(start[:2]) * 60 + int(start[3:5])
+    last = int(end[:2]) * 60 + int(end[3:5])
+    minutes = range(first, last, interval_minutes)
+    return [f"{m // 60:02d}:{m % 60:02d}-{(m + interval_minutes) // 60 % 24:02d}:{(m + interval_minutes) % 60:02d}"
+            for m in minutes]
+
 def create_instructions_sheet(wb):
     """Create the Instructions worksheet"""
     ws = wb.create_sheet("📖 Instructions", 0)
@@ -132,9 +192,20 @@ def create_data_input_sheet(wb):
 
     return ws
 
-def create_forecast_ets_sheet(wb):
-    """Create the FORECAST.ETS worksheet"""
-    ws = wb.create_sheet("📈 FORECAST.ETS")
+def create_forecast_ets_sheet(wb, forecast_df=None, horizon=None):
+    """
+    Create the FORECAST.ETS worksheet.
+
+    With forecast_df (from holt_winters.forecast_intervals()) the forecast
+    rows are written as values for every period, so the sheet works in any
+    Excel version and nothing needs copying down. Without it, row 11 holds
+    the FORECAST.ETS formula template.
+
+    With horizon = (days, labels) the setup describes the expanded template
+    and the forecast rows are left to forecast_ets_rows() (streamed by
+    create_expanded_template()).
+    """
+    ws = wb.create_sheet(FORECAST_SHEET)
 
     # Title
     ws['A1'] = "FORECAST.ETS - Automated Forecasting"
@@ -171,19 +242,39 @@ def create_forecast_ets_sheet(wb):
         cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
         cell.alignment = Alignment(horizontal="center")
 
-    # Formula examples (row 11)
-    ws['A11'] = "=$B$6"
-    ws['B11'] = '="08:00-08:15"'
-    ws['C11'] = '=IFERROR(FORECAST.ETS($A11, \'📥 Data Input\'!$C$5:$C$1000, \'📥 Data Input\'!$A$5:$A$1000, $B$8, 1, 1), "Need Excel 2016+")'
-    ws['D11'] = '=IFERROR(C11 - FORECAST.ETS.CONFINT($A11, \'📥 Data Input\'!$C$5:$C$1000, \'📥 Data Input\'!$A$5:$A$1000, 0.95, $B$8), "")'
-    ws['E11'] = '=IFERROR(C11 + FORECAST.ETS.CONFINT($A11, \'📥 Data Input\'!$C$5:$C$1000, \'📥 Data Input\'!$A$5:$A$1000, 0.95, $B$8), "")'
-    ws['F11'] = 1.0
-    ws['G11'] = "=C11*F11"
-
-    # Instructions for copying
-    ws['A13'] = "Instructions: Copy formulas in row 11 down for all forecast periods"
-    ws['A13'].font = Font(italic=True, color="7F7F7F")
-    ws.merge_cells('A13:G13')
+    if forecast_df is not None:
+        if horizon is None:
+            write_forecast_rows(ws, forecast_df, first_row=11)
+        ws['B6'] = forecast_df['Date'].iloc[0].to_pydatetime()
+        ws['B6'].number_format = 'm/d/yy'
+        ws['B7'] = len(forecast_df)
+        ws['C7'] = f"({len(forecast_df)} periods forecast by holt_winters.py)"
+        ws['B8'] = forecast_df['Time_Interval'].nunique()
+        ws['A9'] = "Values computed by the Python Holt-Winters engine. Rerun create_forecast_template.py --history to refresh."
+        ws['A9'].font = Font(italic=True, size=9, color="7F7F7F")
+        ws.merge_cells('A9:G9')
+        for col, width in zip('ABCDEFG', (12, 15, 18, 18, 18, 18, 18)):
+            ws.column_dimensions[col].width = width
+        return ws
+
+    if horizon is not None:
+        days, labels = horizon
+        periods = days * len(labels)
+        ws['B7'] = periods
+        ws['C7'] = f"({days} days × {len(labels)} intervals)"
+        ws['B8'] = len(labels)
+        ws['A9'] = f"Every forecast period is pre-filled in rows 11-{10 + periods}; no copying down needed."
+        ws['A9'].font = Font(italic=True, size=9, color="7F7F7F")
+        ws.merge_cells('A9:G9')
+    else:
+        # Formula examples (row 11)
+        for col, value in enumerate(forecast_ets_formulas(11, 0, "08:00-08:15"), start=1):
+            ws.cell(row=11, column=col, value=value)
+
+        # Instructions for copying
+        ws['A13'] = "Instructions: Copy formulas in row 11 down for all forecast periods"
+        ws['A13'].font = Font(italic=True, color="7F7F7F")
+        ws.merge_cells('A13:G13')
 
     # Column widths
     ws.column_dimensions['A'].width = 12
@@ -196,9 +287,55 @@ def create_forecast_ets_sheet(wb):
 
     return ws
 
-def create_seasonal_decomp_sheet(wb):
-    """Create the Seasonal Decomposition worksheet"""
-    ws = wb.create_sheet("📉 Seasonal Decomp")
+def forecast_ets_formulas(row, day, label):
+    """FORECAST.ETS row formulas for a period `day` days after the start date (B6)"""
+    history = "'📥 Data Input'!$C$5:$C$1000, '📥 Data Input'!$A$5:$A$1000"
+    return [
+        f"=$B$6+{day}" if day else "=$B$6",
+        label,
+        f'=IFERROR(FORECAST.ETS($A{row}, {history}, $B$8, 1, 1), "Need Excel 2016+")',
+        f'=IFERROR(C{row} - FORECAST.ETS.CONFINT($A{row}, {history}, 0.95, $B$8), "")',
+        f'=IFERROR(C{row} + FORECAST.ETS.CONFINT($A{row}, {history}, 0.95, $B$8), "")',
+        1.0,
+        f"=C{row}*F{row}",
+    ]
+
+def forecast_ets_rows(horizon, forecast_df=None, first_row=11):
+    """
+    Yield every FORECAST.ETS row of the horizon: the computed values of
+    forecast_df when given, otherwise the per-period formulas.
+    """
+    if forecast_df is not None:
+        for _, values in forecast_row_values(forecast_df, first_row):
+            yield values
+        return
+    days, labels = horizon
+    for period in range(days * len(labels)):
+        yield forecast_ets_formulas(first_row + period, period // len(labels), labels[period % len(labels)])
+
+def forecast_row_values(forecast_df, first_row=11):
+    """Yield (row, values): Date, interval, point, bounds, event adjustment and final forecast formula"""
+    columns = ['Date', 'Time_Interval', 'Forecasted_Calls', 'Lower_Bound_95%', 'Upper_Bound_95%']
+    rows = zip(*(forecast_df[column].tolist() for column in columns))
+    for row_idx, (date, interval, point, lower, upper) in enumerate(rows, start=first_row):
+        yield row_idx, [date.to_pydatetime(), interval, point, lower, upper, 1.0, f"=C{row_idx}*F{row_idx}"]
+
+def write_forecast_rows(ws, forecast_df, first_row=11):
+    """Write forecast values (Date, interval, point, bounds) with an editable event adjustment"""
+    for row_idx, values in forecast_row_values(forecast_df, first_row):
+        for col, value in enumerate(values, start=1):
+            ws.cell(row=row_idx, column=col, value=value)
+        ws.cell(row=row_idx, column=1).number_format = 'm/d/yy'
+
+def create_seasonal_decomp_sheet(wb, decomposition=None, forecast_days=7):
+    """
+    Create the Seasonal Decomposition worksheet.
+
+    With decomposition (from seasonal_decomposition.decompose()) the indices,
+    fitted trend and forecast rows are written as values computed over the
+    full history. Without it, the sheet holds the AVERAGEIF formula template.
+    """
+    ws = wb.create_sheet(DECOMPOSITION_SHEET)
 
     # Title
     ws['A1'] = "Seasonal Decomposition Method"
@@ -224,6 +361,10 @@ def create_seasonal_decomp_sheet(wb):
         ws[f'{col}5'].font = Font(bold=True)
         ws[f'{col}5'].fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
 
+    if decomposition is not None:
+        write_decomposition(ws, decomposition, forecast_days)
+        return ws
+
     # Sample seasonal index calculations
     time_intervals = ["08:00-08:15", "08:15-08:30", "08:30-08:45", "...(continue for all 96 intervals)"]
     for idx, interval in enumerate(time_intervals, start=6):
@@ -271,8 +412,100 @@ def create_seasonal_decomp_sheet(wb):
 
     return ws
 
-def create_exponential_smoothing_sheet(wb):
-    """Create the Simple Exponential Smoothing worksheet"""
+def write_decomposition(ws, decomposition, forecast_days=7):
+    """Write computed seasonal indices, trend and forecast rows (values, any Excel version)"""
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    subheader_fill = PatternFill(start_color="D9E1F2", end_color="D9E1F2", fill_type="solid")
+
+    # Step 1: one row per interval of the day, full history
+    intervals = decomposition['interval_index']
+    for row_idx, (label, average, index) in enumerate(intervals.itertuples(index=False), start=6):
+        ws[f'A{row_idx}'] = label
+        ws[f'B{row_idx}'] = round(float(average), 2)
+        ws[f'C{row_idx}'] = round(decomposition['overall_average'], 2)
+        ws[f'D{row_idx}'] = round(float(index), 4)
+    last_index_row = 5 + len(intervals)
+
+    # Day-of-week and monthly indices beside the interval table
+    for col, header in (('H', "Day of Week"), ('I', "DOW Index"), ('K', "Month"), ('L', "Monthly Index")):
+        ws[f'{col}5'] = header
+        ws[f'{col}5'].font = Font(bold=True)
+        ws[f'{col}5'].fill = subheader_fill
+    for row_idx, (day, index) in enumerate(decomposition['day_of_week_index'].items(), start=6):
+        ws[f'H{row_idx}'] = day
+        ws[f'I{row_idx}'] = None if np.isnan(index) else round(float(index), 4)
+    for row_idx, (month, index) in enumerate(decomposition['monthly_index'].items(), start=6):
+        ws[f'K{row_idx}'] = calendar.month_abbr[month]
+        ws[f'L{row_idx}'] = None if np.isnan(index) else round(float(index), 4)
+
+    # Step 2: fitted trend
+    trend = decomposition['trend']
+    step2 = last_index_row + 2
+    ws[f'A{step2}'] = "Step 2: Calculate Trend"
+    ws[f'A{step2}'].font = Font(size=12, bold=True, color="1F4E78")
+    ws[f'A{step2 + 1}'] = "Fitted from full history"
+    ws[f'A{step2 + 1}'].font = Font(italic=True)
+    ws[f'B{step2 + 1}'] = "Trend_Multiplier:"
+    ws[f'C{step2 + 1}'] = round(trend['annual_multiplier'], 4)
+    ws[f'D{step2 + 1}'] = "(annual growth, log-linear fit on daily totals)"
+    ws[f'D{step2 + 1}'].font = Font(italic=True, size=9, color="7F7F7F")
+
+    # Step 3: forecast rows = Base × Seasonal_Index (interval × weekday × month) × Trend
+    step3 = step2 + 4
+    ws[f'A{step3}'] = "Step 3: Generate Forecast"
+    ws[f'A{step3}'].font = Font(size=12, bold=True, color="1F4E78")
+    headers = ["Date", "Time_Interval", "Base_Calls", "Seasonal_Index", "Trend", "Forecast"]
+    for col, header in enumerate(headers, start=1):
+        cell = ws.cell(row=step3 + 1, column=col, value=header)
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = header_fill
+
+    first_row, rows = decomposition_forecast_rows(decomposition, forecast_days)
+    for row_idx, (date, label, base, index, growth) in enumerate(rows, start=first_row):
+        ws.cell(row=row_idx, column=1, value=date).number_format = 'm/d/yy'
+        ws.cell(row=row_idx, column=2, value=label)
+        ws.cell(row=row_idx, column=3, value=base)
+        ws.cell(row=row_idx, column=4, value=index)
+        ws.cell(row=row_idx, column=5, value=growth)
+        ws.cell(row=row_idx, column=6, value=f"=C{row_idx}*D{row_idx}*E{row_idx}")
+
+    ws.column_dimensions['A'].width = 15
+    ws.column_dimensions['B'].width = 20
+    ws.column_dimensions['C'].width = 18
+    ws.column_dimensions['D'].width = 18
+    ws.column_dimensions['E'].width = 12
+    ws.column_dimensions['F'].width = 15
+    ws.column_dimensions['H'].width = 14
+    ws.column_dimensions['K'].width = 10
+    ws.column_dimensions['L'].width = 14
+
+def decomposition_forecast_rows(decomposition, forecast_days=7):
+    """
+    Step 3 rows of a computed Seasonal Decomp sheet, as written.
+
+    Returns:
+        (first row, list of (date, label, base calls, seasonal index, trend))
+        with the values rounded as they appear in the sheet
+    """
+    trend = decomposition['trend']
+    forecast_df = forecast_decomposition(decomposition, days=forecast_days)
+    base = round(float(trend['base_calls']), 3)
+    rows = zip(forecast_df['Date'].tolist(), forecast_df['Time_Interval'].tolist(),
+               (forecast_df['Base_Calls'] / trend['base_calls']).tolist(),
+               forecast_df['Seasonal_Index'].tolist())
+    # Below the interval table (from row 6), Step 2 and the Step 3 header
+    first_row = 6 + len(decomposition['interval_index']) + 7
+    return first_row, [(date.to_pydatetime(), label, base, round(index, 4), round(growth, 5))
+                       for date, label, growth, index in rows]
+
+def create_exponential_smoothing_sheet(wb, horizon=None):
+    """
+    Create the Simple Exponential Smoothing worksheet.
+
+    With horizon = (days, labels) the rows are left to
+    exponential_smoothing_rows(), which smooths every Data Input row and then
+    carries the last level over the forecast periods.
+    """
     ws = wb.create_sheet("⚡ Simple Exp Smooth")
 
     # Title
@@ -302,22 +535,29 @@ def create_exponential_smoothing_sheet(wb):
         cell.font = Font(bold=True, color="FFFFFF")
         cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
 
-    # Sample formulas
-    ws['A8'] = "='📥 Data Input'!A5"
-    ws['B8'] = "='📥 Data Input'!B5"
-    ws['C8'] = "='📥 Data Input'!C5"
-    ws['D8'] = "=$B$5"
-    ws['E8'] = "=C8-D8"
-
-    ws['A9'] = "='📥 Data Input'!A6"
-    ws['B9'] = "='📥 Data Input'!B6"
-    ws['C9'] = "='📥 Data Input'!C6"
-    ws['D9'] = "=$B$4*C8+(1-$B$4)*D8"
-    ws['E9'] = "=C9-D9"
-
-    ws['A11'] = "Copy row 9 formulas down for all historical data, then continue for forecast periods"
-    ws['A11'].font = Font(italic=True, color="7F7F7F")
-    ws.merge_cells('A11:E11')
+    if horizon is not None:
+        days, labels = horizon
+        history_rows = DATA_INPUT_LAST_ROW - 4
+        ws['C5'] = (f"(rows 8-{7 + history_rows}: Data Input history; "
+                    f"rows {8 + history_rows}-{7 + history_rows + days * len(labels)}: forecast)")
+        ws['C5'].font = Font(italic=True, size=9, color="7F7F7F")
+    else:
+        # Sample formulas
+        ws['A8'] = "='📥 Data Input'!A5"
+        ws['B8'] = "='📥 Data Input'!B5"
+        ws['C8'] = "='📥 Data Input'!C5"
+        ws['D8'] = "=$B$5"
+        ws['E8'] = "=C8-D8"
+
+        ws['A9'] = "='📥 Data Input'!A6"
+        ws['B9'] = "='📥 Data Input'!B6"
+        ws['C9'] = "='📥 Data Input'!C6"
+        ws['D9'] = "=$B$4*C8+(1-$B$4)*D8"
+        ws['E9'] = "=C9-D9"
+
+        ws['A11'] = "Copy row 9 formulas down for all historical data, then continue for forecast periods"
+        ws['A11'].font = Font(italic=True, color="7F7F7F")
+        ws.merge_cells('A11:E11')
 
     # Column widths
     ws.column_dimensions['A'].width = 12
@@ -328,8 +568,45 @@ def create_exponential_smoothing_sheet(wb):
 
     return ws
 
-def create_accuracy_dashboard(wb):
-    """Create the Accuracy Dashboard worksheet"""
+def exponential_smoothing_rows(horizon, first_row=8):
+    """
+    Yield the Simple Exp Smooth rows: one per Data Input row (5 through
+    DATA_INPUT_LAST_ROW), then one per forecast period of the horizon.
+
+    Blank actuals carry the previous forecast forward, so history shorter
+    than the Data Input range and the forecast periods both end up at the
+    last smoothed level.
+    """
+    days, labels = horizon
+    source = "'📥 Data Input'!{}{}"
+    row = first_row
+    for input_row in range(5, DATA_INPUT_LAST_ROW + 1):
+        date, interval, actual = (source.format(col, input_row) for col in 'ABC')
+        yield [
+            f'=IF({date}="","",{date})',
+            f'=IF({interval}="","",{interval})',
+            f'=IF({actual}="","",{actual})',
+            "=$B$5" if row == first_row else f'=IF(C{row - 1}="",D{row - 1},$B$4*C{row - 1}+(1-$B$4)*D{row - 1})',
+            f'=IF(C{row}="","",C{row}-D{row})',
+        ]
+        row += 1
+    for period in range(days * len(labels)):
+        yield [
+            f"='📈 FORECAST.ETS'!A{11 + period}",
+            f"='📈 FORECAST.ETS'!B{11 + period}",
+            None,
+            f'=IF(C{row - 1}="",D{row - 1},$B$4*C{row - 1}+(1-$B$4)*D{row - 1})',
+            None,
+        ]
+        row += 1
+
+def create_accuracy_dashboard(wb, horizon=None):
+    """
+    Create the Accuracy Dashboard worksheet.
+
+    With horizon = (days, labels) the error rows are left to accuracy_rows()
+    and the Key Metrics results are computed over all of them.
+    """
     ws = wb.create_sheet("📊 Accuracy Dashboard")
 
     # Title
@@ -376,15 +653,21 @@ def create_accuracy_dashboard(wb):
         cell.font = Font(bold=True, color="FFFFFF")
         cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
 
-    # Sample formulas
-    ws['A18'] = "='📥 Data Input'!A5"
-    ws['B18'] = "='📥 Data Input'!B5"
-    ws['C18'] = "='📥 Data Input'!C5"
-    ws['D18'] = "='📈 FORECAST.ETS'!G11"
-    ws['E18'] = "=D18-C18"
-    ws['F18'] = "=ABS(E18)"
-    ws['G18'] = "=IF(C18<>0, ABS(E18/C18)*100, 0)"
-    ws['H18'] = "=E18^2"
+    if horizon is not None:
+        days, labels = horizon
+        last_row = 17 + days * len(labels)
+        # Blank until the first actual is entered (AVERAGE of only "" is #DIV/0!)
+        ws['C5'] = f'=IFERROR(AVERAGE(G18:G{last_row}), "")'
+        ws['C6'] = f'=IFERROR(AVERAGE(F18:F{last_row}), "")'
+        ws['C7'] = f'=IFERROR(SQRT(AVERAGE(H18:H{last_row})), "")'
+        ws['C8'] = f'=IFERROR(AVERAGE(E18:E{last_row}), "")'
+        for row in range(5, 9):
+            ws[f'C{row}'].number_format = '0.00'
+        ws['A11'] = f"1. Your Result averages the error rows below that have an actual (rows 18-{last_row})"
+    else:
+        # Sample formulas
+        for col, value in enumerate(accuracy_formulas(18, 0), start=1):
+            ws.cell(row=18, column=col, value=value)
 
     # Column widths
     for col in ['A', 'B']:
@@ -394,6 +677,32 @@ def create_accuracy_dashboard(wb):
 
     return ws
 
+def accuracy_formulas(row, period):
+    """
+    Error analysis formulas comparing Data Input actuals with the FORECAST.ETS final forecast.
+
+    Rows whose actual is still blank return "" in every error column, and
+    Pct_Error is also "" for zero actuals, so AVERAGE skips them instead of
+    counting the full forecast as the error.
+    """
+    actual = f"'📥 Data Input'!C{5 + period}"
+    return [
+        f"='📥 Data Input'!A{5 + period}",
+        f"='📥 Data Input'!B{5 + period}",
+        f'=IF({actual}="", "", {actual})',
+        f"='📈 FORECAST.ETS'!G{11 + period}",
+        f'=IF(C{row}="", "", D{row}-C{row})',
+        f'=IF(E{row}="", "", ABS(E{row}))',
+        f'=IF(OR(C{row}="", C{row}=0), "", ABS(E{row}/C{row})*100)',
+        f'=IF(E{row}="", "", E{row}^2)',
+    ]
+
+def accuracy_rows(horizon, first_row=18):
+    """Yield one Accuracy Dashboard error row per forecast period of the horizon"""
+    days, labels = horizon
+    for period in range(days * len(labels)):
+        yield accuracy_formulas(first_row + period, period)
+
 def create_event_calendar(wb):
     """Create the Event Calendar worksheet"""
     ws = wb.create_sheet("📅 Event Calendar")
@@ -459,9 +768,16 @@ def create_event_calendar(wb):
 
     return ws
 
-def create_staffing_calculator(wb):
-    """Create the Staffing Calculator worksheet"""
-    ws = wb.create_sheet("👥 Staffing Calculator")
+def create_staffing_calculator(wb, horizon=None, k_table=None):
+    """
+    Create the Staffing Calculator worksheet.
+
+    With horizon = (days, labels) the rows are left to staffing_rows() and
+    the summary statistics sit below the last period and cover all of them.
+    With a calibrated k_table (k_calibration.py) B7 holds its overall K and
+    the Safety_Buffer column looks up each row's K in the table.
+    """
+    ws = wb.create_sheet(STAFFING_SHEET)
 
     # Title
     ws['A1'] = "Staffing Requirements Calculator"
@@ -479,15 +795,15 @@ def create_staffing_calculator(wb):
     ws['A4'].font = Font(size=11, bold=True, color="1F4E78")
 
     ws['A5'] = "Interval Length (seconds):"
-    ws['B5'] = 900
+    ws['B5'] = STAFFING_INTERVAL_SECONDS
     ws['C5'] = "(900 = 15 minutes)"
     ws['C5'].font = Font(italic=True, size=9, color="7F7F7F")
 
     ws['A6'] = "Expected AHT (seconds):"
-    ws['B6'] = 270
+    ws['B6'] = STAFFING_AHT
 
     ws['A7'] = "K-value (safety factor):"
-    ws['B7'] = 1.6
+    ws['B7'] = STAFFING_K
     ws['C7'] = "(1.4-2.0 range, higher = better service)"
     ws['C7'].font = Font(italic=True, size=9, color="7F7F7F")
 
@@ -495,43 +811,48 @@ def create_staffing_calculator(wb):
     ws['B8'] = "80/90"
 
     # Headers
-    headers = ["Date", "Time", "Forecasted_Calls", "Traffic (Erlangs)", "Base_Agents", "Safety_Buffer", "Required_Agents", "Notes"]
+    headers = ["Date", "Time", "Forecasted_Calls", "Traffic (Erlangs)", "Base_Agents", "Safety_Buffer", "Required_Agents", "Notes", "Erlang_C_Agents"]
     for col, header in enumerate(headers, start=1):
         cell = ws.cell(row=10, column=col, value=header)
         cell.font = Font(bold=True, color="FFFFFF")
         cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
         cell.alignment = Alignment(horizontal="center")
 
-    # Sample formulas
-    ws['A11'] = "='📈 FORECAST.ETS'!A11"
-    ws['B11'] = "='📈 FORECAST.ETS'!B11"
-    ws['C11'] = "='📈 FORECAST.ETS'!G11"
-    ws['D11'] = "=(C11*$B$6)/$B$5"
-    ws['E11'] = "=D11"
-    ws['F11'] = "=$B$7*SQRT(D11)"
-    ws['G11'] = "=CEILING(E11+F11, 1)"
-    ws['H11'] = '=IF(G11>20,"Peak Period",IF(G11<5,"Low Volume","Normal"))'
-
-    ws['A13'] = "Copy formulas down for all forecast periods"
-    ws['A13'].font = Font(italic=True, color="7F7F7F")
-    ws.merge_cells('A13:H13')
+    # Exact Erlang C lookup table (minimum agents for 80/90 by calls per interval)
+    create_erlang_lookup_table(ws, aht=ws['B6'].value, interval_seconds=ws['B5'].value)
+
+    if horizon is not None:
+        days, labels = horizon
+        last_row = 10 + days * len(labels)
+        summary_row = last_row + 2
+        hours = ["Total Agent Hours (Horizon)", f"=SUM(G11:G{last_row})*$B$5/3600", ""]
+    else:
+        # Sample formulas
+        for col, value in enumerate(staffing_formulas(11, k_table), start=1):
+            ws.cell(row=11, column=col, value=value)
+
+        ws['A13'] = "Copy formulas down for all forecast periods"
+        ws['A13'].font = Font(italic=True, color="7F7F7F")
+        ws.merge_cells('A13:H13')
+        last_row, summary_row = 107, 15
+        hours = ["Total Agent Hours (Weekly)", "=SUM(G11:G107)/4", ""]
 
     # Summary section
-    ws['A15'] = "📊 Summary Statistics"
-    ws['A15'].font = Font(size=11, bold=True, color="1F4E78")
+    ws[f'A{summary_row}'] = "📊 Summary Statistics"
+    ws[f'A{summary_row}'].font = Font(size=11, bold=True, color="1F4E78")
 
     summary = [
         ["Metric", "Formula", "Result"],
-        ["Average Agents Required", "=AVERAGE(G11:G107)", ""],
-        ["Peak Agents Required", "=MAX(G11:G107)", ""],
-        ["Minimum Agents Required", "=MIN(G11:G107)", ""],
-        ["Total Agent Hours (Weekly)", "=SUM(G11:G107)/4", ""],
+        ["Average Agents Required", f"=AVERAGE(G11:G{last_row})", ""],
+        ["Peak Agents Required", f"=MAX(G11:G{last_row})", ""],
+        ["Minimum Agents Required", f"=MIN(G11:G{last_row})", ""],
+        hours,
     ]
 
-    for row_idx, row in enumerate(summary, start=16):
+    for row_idx, row in enumerate(summary, start=summary_row + 1):
         for col_idx, value in enumerate(row, start=1):
             cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            if row_idx == 16:
+            if row_idx == summary_row + 1:
                 cell.font = Font(bold=True, color="FFFFFF")
                 cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
 
@@ -544,16 +865,255 @@ def create_staffing_calculator(wb):
     ws.column_dimensions['F'].width = 15
     ws.column_dimensions['G'].width = 17
     ws.column_dimensions['H'].width = 15
+    ws.column_dimensions['I'].width = 16
+
+    if k_table is not None:
+        write_k_table(ws, k_table)
 
     return ws
 
-def main():
-    """Main function to create the Excel workbook"""
-    print("Creating Call Center Forecast Template...")
+def k_value_formula(row, k_table=None):
+    """K for one Staffing Calculator row: $B$7, or a lookup in the calibrated K table"""
+    if k_table is None or k_table['by'] not in K_LOOKUP_KEYS:
+        return "$B$7"
+    key, match_type = K_LOOKUP_KEYS[k_table['by']]
+    first = K_TABLE_HEADER_ROW + 1
+    last = K_TABLE_HEADER_ROW + max(len(k_table['groups']), 1)
+    keys, values = (f"${column}${first}:${column}${last}" for column in K_TABLE_COLUMNS[:2])
+    return f"IFERROR(INDEX({values},MATCH({key.format(row=row)},{keys},{match_type})),$B$7)"
+
+def write_k_table(ws, k_table):
+    """
+    Write a k_calibration.py table into a Staffing Calculator sheet.
+
+    Sets B7 to the overall K, replaces the table in columns N-Q and points
+    every Safety_Buffer formula (column F) at it. Works on a freshly built
+    sheet and on one loaded from an existing template.
+
+    Returns:
+        number of Safety_Buffer formulas written
+    """
+    ws['B7'] = k_table['k']
+    ws['C7'] = f"(calibrated from history, {k_table['coverage']:.0%} coverage)"
+    ws['C7'].font = Font(italic=True, size=9, color="7F7F7F")
+
+    # Clear a previous table (title, note, header and its rows)
+    top = K_TABLE_HEADER_ROW - 2
+    row = top
+    while row <= K_TABLE_HEADER_ROW or ws[f'N{row}'].value is not None:
+        for column in K_TABLE_COLUMNS:
+            ws[f'{column}{row}'].value = None
+        row += 1
+
+    by = k_table['by'].replace('_', ' ')
+    ws[f'N{top}'] = f"Calibrated K by {by} ({k_table['target_sl']:.0%}/{k_table['threshold']:g})"
+    ws[f'N{top}'].font = Font(size=11, bold=True, color="1F4E78")
+    ws[f'N{top + 1}'] = "From k_calibration.py; rows without a match use B7"
+    ws[f'N{top + 1}'].font = Font(italic=True, size=9, color="7F7F7F")
+
+    key_header = "Traffic ≥" if k_table['by'] == 'traffic_band' else by.capitalize()
+    for column, header in zip(K_TABLE_COLUMNS, (key_header, "K", "Intervals", "Met %")):
+        cell = ws[f'{column}{K_TABLE_HEADER_ROW}']
+        cell.value = header
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        cell.alignment = Alignment(horizontal="center")
 
+    for row, group in enumerate(k_table['groups'], start=K_TABLE_HEADER_ROW + 1):
+        ws[f'N{row}'] = group['key']
+        ws[f'O{row}'] = group['k']
+        ws[f'P{row}'] = group['intervals']
+        ws[f'Q{row}'] = round(group['met_target'] / 100, 4)
+        ws[f'Q{row}'].number_format = '0.0%'
+
+    for column in K_TABLE_COLUMNS:
+        ws.column_dimensions[column].width = 12
+
+    formulas = 0
+    for row in range(K_TABLE_HEADER_ROW + 1, ws.max_row + 1):
+        value = ws[f'F{row}'].value
+        if isinstance(value, str) and value.endswith(f"*SQRT(D{row})"):
+            ws[f'F{row}'] = f"={k_value_formula(row, k_table)}*SQRT(D{row})"
+            formulas += 1
+    return formulas
+
+def staffing_formulas(row, k_table=None):
+    """Staffing Calculator formulas for one period (same row number as its FORECAST.ETS period)"""
+    return [
+        f"='📈 FORECAST.ETS'!A{row}",
+        f"='📈 FORECAST.ETS'!B{row}",
+        f"='📈 FORECAST.ETS'!G{row}",
+        f"=(C{row}*$B$6)/$B$5",
+        f"=D{row}",
+        f"={k_value_formula(row, k_table)}*SQRT(D{row})",
+        f"=CEILING(E{row}+F{row}, 1)",
+        f'=IF(G{row}>20,"Peak Period",IF(G{row}<5,"Low Volume","Normal"))',
+        f'=IFERROR(INDEX($L$11:$L${11 + ERLANG_TABLE_MAX_CALLS}, ROUND(C{row},0)+1), "Extend table")',
+    ]
+
+def staffing_rows(horizon, first_row=11, k_table=None):
+    """Yield one Staffing Calculator row per forecast period of the horizon"""
+    days, labels = horizon
+    for row in range(first_row, first_row + days * len(labels)):
+        yield staffing_formulas(row, k_table)
+
+def create_erlang_lookup_table(ws, aht, interval_seconds, first_row=10):
+    """
+    Write an exact Erlang C staffing table (calls per interval → agents).
+
+    Values come from the batched inverse solver in erlang_c.py: the minimum
+    whole agents meeting 80/90 for 0..ERLANG_TABLE_MAX_CALLS calls at the
+    configured AHT. Unlike the square-root rule, no K-value tuning is needed.
+    """
+    calls = np.arange(ERLANG_TABLE_MAX_CALLS + 1)
+    agents = required_agents(calls, aht, interval_seconds=interval_seconds)
+
+    ws[f'K{first_row - 2}'] = f"Exact Erlang C (80/90, AHT {aht}s)"
+    ws[f'K{first_row - 2}'].font = Font(size=11, bold=True, color="1F4E78")
+    ws[f'K{first_row - 1}'] = "Regenerate the template if AHT (B6) changes"
+    ws[f'K{first_row - 1}'].font = Font(italic=True, size=9, color="7F7F7F")
+
+    for col, header in (('K', "Calls"), ('L', "Agents")):
+        cell = ws[f'{col}{first_row}']
+        cell.value = header
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        cell.alignment = Alignment(horizontal="center")
+
+    for row_idx, (call_count, agent_count) in enumerate(zip(calls.tolist(), agents.tolist()), start=first_row + 1):
+        ws[f'K{row_idx}'] = call_count
+        ws[f'L{row_idx}'] = agent_count
+
+    ws.column_dimensions['K'].width = 10
+    ws.column_dimensions['L'].width = 10
+
+def stream_sheet(wb, source, rows=None, first_row=None, number_formats=None):
+    """
+    Copy an in-memory worksheet into a write-only workbook, splicing in
+    generated rows.
+
+    Every cell of `source` is copied with its style. From `first_row` on,
+    each list yielded by `rows` replaces the leading cells of that row; cells
+    to its right (e.g. the Erlang C table beside the Staffing Calculator
+    rows) are still copied from `source`. Generated rows are serialized as
+    they are appended, so memory does not grow with the horizon.
+
+    Args:
+        number_formats: {column letter: number format} for generated cells
+    """
+    ws = wb.create_sheet(source.title)
+    for key, dimension in source.column_dimensions.items():
+        if dimension.width:
+            ws.column_dimensions[key].width = dimension.width
+    for cell_range in source.merged_cells.ranges:
+        ws.merged_cells.add(str(cell_range))
+
+    # One reusable template cell per formatted column
+    templates = {}
+    for column, number_format in (number_formats or {}).items():
+        templates[ord(column) - ord('A')] = WriteOnlyCell(ws)
+        templates[ord(column) - ord('A')].number_format = number_format
+
+    def copied(cell):
+        if not cell.has_style:
+            return cell.value
+        new = WriteOnlyCell(ws, value=cell.value)
+        new.font = copy(cell.font)
+        new.fill = copy(cell.fill)
+        new.border = copy(cell.border)
+        new.alignment = copy(cell.alignment)
+        new.number_format = cell.number_format
+        return new
+
+    def generated(values):
+        cells = list(values)
+        for col, template in templates.items():
+            if col < len(cells) and cells[col] is not None:
+                template.value = cells[col]
+                cells[col] = template
+        return cells
+
+    # Occupied layout cells by row (iter_rows() would create every empty
+    # cell of the spliced region in the layout sheet)
+    layout = {}
+    for (row_idx, col), cell in source._cells.items():
+        layout.setdefault(row_idx, {})[col - 1] = cell
+    last_layout_row = max(layout, default=0)
+
+    rows = iter(rows if rows is not None else ())
+    row_idx = 0
+    while True:
+        row_idx += 1
+        values = next(rows, None) if first_row and row_idx >= first_row else None
+        if values is None and row_idx > last_layout_row:
+            break
+        row = generated(values) if values is not None else []
+        for col, cell in sorted(layout.get(row_idx, {}).items()):
+            if col >= len(row):
+                row.extend([None] * (col - len(row)))
+                row.append(copied(cell))
+        ws.append(row)
+    return ws
+
+def create_expanded_template(filename, horizon, forecast_df=None, decomposition=None, k_table=None):
+    """
+    Write the template with every forecast period pre-filled.
+
+    The sheets are laid out by the regular create_* functions (without their
+    "copy down" sample rows), then streamed into a write-only workbook with
+    one generated row per period spliced into FORECAST.ETS, Simple Exp
+    Smooth, Accuracy Dashboard and Staffing Calculator. Nothing needs to be
+    copied down in Excel, and the summary ranges cover the whole horizon.
+
+    Args:
+        horizon: (days, interval labels); the forecast covers days × labels
+            periods starting at FORECAST.ETS B6
+        forecast_df, decomposition: optional computed forecasts (--history);
+            FORECAST.ETS then holds values instead of FORECAST.ETS formulas
+        k_table: optional calibrated K table (k_calibration.py)
+
+    Returns:
+        number of forecast periods written
+    """
+    layout = Workbook()
+    layout.remove(layout.active)
+    build = stage('layout_sheets')
+
+    create_instructions_sheet(layout)
+    create_data_input_sheet(layout)
+    forecast_ws = create_forecast_ets_sheet(layout, forecast_df, horizon)
+    create_seasonal_decomp_sheet(layout, decomposition, horizon[0])
+    smoothing_ws = create_exponential_smoothing_sheet(layout, horizon)
+    accuracy_ws = create_accuracy_dashboard(layout, horizon)
+    create_event_calendar(layout)
+    staffing_ws = create_staffing_calculator(layout, horizon, k_table)
+
+    splices = {
+        forecast_ws.title: (forecast_ets_rows(horizon, forecast_df), 11, {'A': 'm/d/yy'}),
+        smoothing_ws.title: (exponential_smoothing_rows(horizon), 8, {'A': 'm/d/yy'}),
+        accuracy_ws.title: (accuracy_rows(horizon), 18, {'A': 'm/d/yy'}),
+        staffing_ws.title: (staffing_rows(horizon, k_table=k_table), 11, {'A': 'm/d/yy', 'C': '0.0', 'D': '0.00', 'F': '0.00'}),
+    }
+
+    build.stop()
+
+    days, labels = horizon
+    wb = Workbook(write_only=True)
+    with stage('stream_sheets', rows=days * len(labels)):
+        for source in layout.worksheets:
+            rows, first_row, number_formats = splices.get(source.title, (None, None, None))
+            stream_sheet(wb, source, rows, first_row, number_formats)
+    with stage('save'):
+        wb.save(filename)
+
+    return days * len(labels)
+
+def create_template(filename, forecast_df=None, decomposition=None, forecast_days=7, k_table=None):
+    """Create the workbook in memory, with one "copy down" formula row per sheet"""
     # Create workbook
     wb = Workbook()
     wb.remove(wb.active)  # Remove default sheet
+    build = stage('build_sheets')
 
     # Create all worksheets
     print("  ✓ Creating Instructions sheet")
@@ -563,10 +1123,10 @@ def main():
     create_data_input_sheet(wb)
 
     print("  ✓ Creating FORECAST.ETS sheet")
-    create_forecast_ets_sheet(wb)
+    create_forecast_ets_sheet(wb, forecast_df)
 
     print("  ✓ Creating Seasonal Decomposition sheet")
-    create_seasonal_decomp_sheet(wb)
+    create_seasonal_decomp_sheet(wb, decomposition, forecast_days)
 
     print("  ✓ Creating Simple Exponential Smoothing sheet")
     create_exponential_smoothing_sheet(wb)
@@ -578,11 +1138,151 @@ def main():
     create_event_calendar(wb)
 
     print("  ✓ Creating Staffing Calculator")
-    create_staffing_calculator(wb)
+    create_staffing_calculator(wb, k_table=k_table)
+    build.stop()
 
     # Save workbook
-    filename = "call_center_forecast_template.xlsx"
-    wb.save(filename)
+    with stage('save'):
+        wb.save(filename)
+
+def row_k_values(dates, labels, traffic, k_table=None):
+    """K used by each Staffing Calculator row's Safety_Buffer, as k_value_formula() looks it up"""
+    default = k_table['k'] if k_table is not None else STAFFING_K
+    k = np.full(len(traffic), float(default))
+    if k_table is None or k_table['by'] not in K_LOOKUP_KEYS or not k_table['groups']:
+        return k
+    groups = k_table['groups']
+    if k_table['by'] == 'traffic_band':
+        # MATCH(..., 1): the last band whose lower bound is <= the traffic
+        bounds = np.array([group['key'] for group in groups], dtype=float)
+        band = np.searchsorted(bounds, traffic, side='right') - 1
+        values = np.array([group['k'] for group in groups], dtype=float)
+        return np.where(band >= 0, values[np.maximum(band, 0)], k)
+    lookup = {str(group['key']): group['k'] for group in groups}
+    if k_table['by'] == 'day_type':
+        keys = ['Weekend' if date.weekday() >= 5 else 'Weekday' for date in dates]
+    else:
+        keys = [str(label) for label in labels]
+    return np.array([lookup.get(key, default) for key in keys], dtype=float)
+
+def formula_values(forecast_df, decomposition, forecast_days=7, expand=False, k_table=None):
+    """
+    Results of the template formulas whose inputs are all computed in history mode.
+
+    Covers FORECAST.ETS Final_Forecast (G), the Seasonal Decomp forecast
+    (F), and the Staffing Calculator rows (A-I) with their summary. Every
+    forecast period is covered with expand; otherwise only the single
+    "copy down" row 11. Values are computed as Excel evaluates the formulas
+    (Excel ROUND, CEILING to whole agents, the same K lookup and Erlang C
+    table), to be stored by xlsx_cache.cache_formula_values(). Formulas that
+    read the Data Input sheet (Simple Exp Smooth, Accuracy Dashboard) have
+    no inputs until data is pasted in and stay uncached.
+
+    Returns:
+        {sheet title: (columns, cells)} as cache_formula_values() takes them
+    """
+    point = forecast_df['Forecasted_Calls'].to_numpy(dtype=float)
+    sheets = {FORECAST_SHEET: ({'G': (11, point)}, {})}
+
+    if decomposition is not None:
+        first_row, rows = decomposition_forecast_rows(decomposition, forecast_days)
+        sheets[DECOMPOSITION_SHEET] = ({'F': (first_row, [base * index * growth for _, _, base, index, growth in rows])}, {})
+
+    # ===== STAFFING CALCULATOR (rows from FORECAST.ETS row 11 on) =====
+    periods = len(forecast_df) if expand else 1
+    dates = [date.to_pydatetime() for date in forecast_df['Date'].iloc[:periods]]
+    labels = forecast_df['Time_Interval'].astype(str).iloc[:periods].tolist()
+    calls = point[:periods]
+    traffic = (calls * STAFFING_AHT) / STAFFING_INTERVAL_SECONDS
+    safety = row_k_values(dates, labels, traffic, k_table) * np.sqrt(traffic)
+    agents = np.ceil(traffic + safety)
+    notes = np.where(agents > 20, "Peak Period", np.where(agents < 5, "Low Volume", "Normal"))
+    table = required_agents(np.arange(ERLANG_TABLE_MAX_CALLS + 1), STAFFING_AHT,
+                            interval_seconds=STAFFING_INTERVAL_SECONDS)
+    rounded = excel_round(calls).astype(np.int64)
+    erlang = [int(table[n]) if 0 <= n <= ERLANG_TABLE_MAX_CALLS else "Extend table" for n in rounded]
+
+    # Summary block: below the horizon when expanded, else the sample layout (G11:G107, rows 15+)
+    if expand:
+        summary_row = 10 + periods + 2
+        hours = agents.sum() * STAFFING_INTERVAL_SECONDS / 3600
+    else:
+        summary_row = 15
+        hours = agents.sum() / 4
+    summary = [agents.mean(), agents.max(), agents.min(), hours]
+    sheets[STAFFING_SHEET] = (
+        {'A': (11, [to_excel(date) for date in dates]), 'B': (11, labels), 'C': (11, calls),
+         'D': (11, traffic), 'E': (11, traffic), 'F': (11, safety), 'G': (11, agents),
+         'H': (11, notes.tolist()), 'I': (11, erlang)},
+        {f'B{summary_row + 2 + index}': value for index, value in enumerate(summary)},
+    )
+    return sheets
+
+def cache_template_values(filename, forecast_df, decomposition, forecast_days=7, expand=False, k_table=None):
+    """Store formula_values() as cached values in a saved template; returns the number of cells cached"""
+    sheets = formula_values(forecast_df, decomposition, forecast_days, expand, k_table)
+    return sum(cache_formula_values(filename, title, columns, cells)
+               for title, (columns, cells) in sheets.items())
+
+def main(history_file=None, forecast_days=7, expand=False, intervals=None,
+         filename="call_center_forecast_template.xlsx", k_table_file=None, cache_values=False):
+    """
+    Main function to create the Excel workbook.
+
+    Args:
+        history_file: optional interval history (.csv/.parquet/.feather/.npz);
+            when given, the FORECAST.ETS and Seasonal Decomp sheets are filled
+            with values computed over the full history
+        forecast_days: forecast horizon in days for the Holt-Winters engine
+        expand: pre-fill every forecast period (create_expanded_template())
+            instead of a single "copy down" formula row
+        intervals: interval spec for expand without history (see
+            interval_labels(); default a full 24-hour day)
+        filename: output workbook
+        k_table_file: optional calibrated K table (k_calibration.py JSON) for
+            the Staffing Calculator
+        cache_values: with history_file, store the computed results next to
+            the formulas that depend only on them (see formula_values())
+    """
+    if cache_values and not history_file:
+        raise ValueError("cache_values needs history_file: without history the formulas have no inputs yet")
+    print("Creating Call Center Forecast Template...")
+
+    forecast_df = decomposition = k_table = None
+    if k_table_file:
+        k_table = load_k_table(k_table_file)
+        print(f"  ✓ Calibrated K table: {len(k_table['groups'])} groups by {k_table['by']}, K = {k_table['k']:.2f}")
+    if history_file:
+        with stage('read_history') as span:
+            history = read_interval_data(history_file)
+            span.rows = len(history)
+        with stage('holt_winters', rows=len(history)):
+            forecast_df, model = forecast_intervals(history, days=forecast_days)
+        print(f"  ✓ Holt-Winters forecast: {len(forecast_df)} intervals "
+              f"(one-step RMSE {model.sigma:.2f} calls)")
+        with stage('seasonal_decomposition', rows=len(history)):
+            decomposition = decompose(history)
+        print(f"  ✓ Seasonal decomposition: {len(history)} intervals, "
+              f"trend ×{decomposition['trend']['annual_multiplier']:.3f}/year")
+
+    if expand:
+        if forecast_df is not None:
+            labels = forecast_df['Time_Interval'].iloc[:forecast_df['Time_Interval'].nunique()].tolist()
+        else:
+            labels = interval_labels(intervals)
+        started = time.perf_counter()
+        periods = create_expanded_template(filename, (forecast_days, labels), forecast_df, decomposition,
+                                           k_table)
+        print(f"  ✓ Streamed {periods} forecast periods ({forecast_days} days × {len(labels)} intervals) "
+              f"into every sheet in {time.perf_counter() - started:.1f}s")
+    else:
+        create_template(filename, forecast_df, decomposition, forecast_days, k_table)
+
+    if cache_values:
+        with stage('cache_values') as span:
+            span.rows = cache_template_values(filename, forecast_df, decomposition, forecast_days,
+                                              expand, k_table)
+        print(f"  ✓ Cached {span.rows} formula values (FORECAST.ETS, Seasonal Decomp, Staffing Calculator)")
 
     print(f"\n✅ Successfully created {filename}")
     print(f"\n📋 Template includes:")
@@ -593,7 +1293,7 @@ def main():
     print(f"   • Simple Exponential Smoothing")
     print(f"   • Accuracy tracking dashboard (MAPE, MAE, RMSE)")
     print(f"   • Event calendar for special events")
-    print(f"   • Staffing calculator (Square Root method)")
+    print(f"   • Staffing calculator (Square Root method + exact Erlang C table)")
     print(f"\n🎯 Next steps:")
     print(f"   1. Open {filename} in Excel")
     print(f"   2. Paste your historical data in 'Data Input' sheet")
@@ -601,4 +1301,27 @@ def main():
     print(f"   4. Check accuracy in 'Accuracy Dashboard'")
 
 if __name__ == '__main__':
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Create the call center forecast template')
+    parser.add_argument('--history', help='interval history to forecast from (.csv, .parquet, .feather, .npz)')
+    parser.add_argument('--days', type=int, default=7, help='forecast horizon in days (default: 7)')
+    parser.add_argument('--expand', action='store_true',
+                        help='pre-fill every forecast period instead of one "copy down" row per sheet')
+    parser.add_argument('--intervals',
+                        help='intervals per day for --expand without --history: "08:00-20:00" or a '
+                             'comma-separated list of labels (default: 24 hours of 15-minute intervals)')
+    parser.add_argument('--output', default='call_center_forecast_template.xlsx',
+                        help='output workbook (default: %(default)s)')
+    parser.add_argument('--k-table', help='calibrated K-values from k_calibration.py (JSON) for the Staffing Calculator')
+    parser.add_argument('--cache-values', action='store_true',
+                        help='with --history: store the computed results next to the formulas (readable without Excel)')
+    add_metrics_arguments(parser, 'create_forecast_template')
+    args = parser.parse_args()
+    if args.cache_values and not args.history:
+        parser.error('--cache-values needs --history')
+
+    with RunMetrics('create_forecast_template', args.metrics, args.profile):
+        main(history_file=args.history, forecast_days=args.days, expand=args.expand,
+             intervals=args.intervals, filename=args.output, k_table_file=args.k_table,
+             cache_values=args.cache_values)
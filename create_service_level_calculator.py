@@ -15,36 +15,177 @@ The worksheet calculates:
 - Staffing gap analysis
 """
 
+import argparse
+import os
 import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 from openpyxl.formatting.rule import CellIsRule
 import pandas as pd
 from datetime import datetime, timedelta
 
-def create_service_level_worksheet():
+import numpy as np
+
+from erlang_c import erlang_c_excel_formula, erlang_c_metrics, required_agents, SERVICE_LEVEL_TARGET
+from erlang_tables import load_table
+from interval_data import COLUMNAR_EXTENSIONS, read_interval_data, iter_interval_chunks, format_dates
+from xlsx_cache import cache_formula_values, excel_round, keep_cached_values
+from xlsx_patch import replace_sheet
+from run_metrics import RunMetrics, add_arguments as add_metrics_arguments, stage
+
+def row_formulas(row_num):
     """
-    Create a new worksheet for service level calculations based on agent schedules
+    Build the calculated-column formulas for one Schedule_Service_Level row.
+
+    Returns a dict keyed by column letter (E, I, J, K, L, M, N). Shared by the
+    in-memory and streaming worksheet writers so both emit identical formulas.
     """
+    r = row_num
+    return {
+        # Net Agents: Scheduled × (1 - Shrinkage)
+        'E': f'=ROUND(D{r}*(1-$E$4),1)',
+        # Traffic Intensity: (Calls × AHT) / 900 seconds (15 min interval)
+        'I': f'=(G{r}*H{r})/900',
+        # Erlang C P(W>0) = P(N) / (P(N) + (1 - A/N) × F(N-1)) with Poisson P/F (see erlang_c.py)
+        # Non-volatile, works past 170 agents and interpolates fractional net agents
+        'J': erlang_c_excel_formula(f'E{r}', f'I{r}'),
+        # Service Level: 1 - (P(W>0) × e^(-(N-A)×(T/AHT))), T = 90 seconds for 80/90
+        'K': f'''=IF(E{r}<=I{r},0,
+IF(ISNUMBER(J{r}),1-(J{r}*EXP(-((E{r}-I{r})*(90/H{r})))),0))''',
+        # ASA (Average Speed of Answer): (P(W>0) × AHT) / (N - A)
+        'L': f'=IF(E{r}<=I{r},"Need More",IF(ISNUMBER(J{r}),(J{r}*H{r})/(E{r}-I{r}),0))',
+        # Occupancy: Traffic / Net Agents
+        'M': f'=IF(E{r}>0,I{r}/E{r},0)',
+        # Staffing Gap: Net Agents - Required Agents
+        'N': f'=E{r}-F{r}',
+    }
 
-    # Load the existing workbook
-    try:
-        workbook = openpyxl.load_workbook('erlang_c_staffing_forecast.xlsx')
-        print("✓ Loaded existing workbook: erlang_c_staffing_forecast.xlsx")
-    except FileNotFoundError:
-        print("! Workbook not found. Creating new workbook.")
-        workbook = openpyxl.Workbook()
-        # Remove default sheet
-        if 'Sheet' in workbook.sheetnames:
-            del workbook['Sheet']
+def add_conditional_formatting(ws, data_start_row, last_data_row):
+    """Apply the service level, occupancy and staffing gap highlight rules"""
+    # Highlight service levels below 80% in red
+    red_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+    red_font = Font(color="9C0006", bold=True)
+    ws.conditional_formatting.add(
+        f'K{data_start_row}:K{last_data_row}',
+        CellIsRule(operator='lessThan', formula=['0.8'], fill=red_fill, font=red_font)
+    )
 
-    # Create new worksheet
-    if 'Schedule_Service_Level' in workbook.sheetnames:
-        print("! Worksheet 'Schedule_Service_Level' already exists. Removing old version.")
-        del workbook['Schedule_Service_Level']
+    # Highlight occupancy > 85% in orange (too high)
+    orange_fill = PatternFill(start_color="FFE699", end_color="FFE699", fill_type="solid")
+    ws.conditional_formatting.add(
+        f'M{data_start_row}:M{last_data_row}',
+        CellIsRule(operator='greaterThan', formula=['0.85'], fill=orange_fill)
+    )
 
-    ws = workbook.create_sheet('Schedule_Service_Level', 0)
-    print("✓ Created new worksheet: Schedule_Service_Level")
+    # Highlight occupancy < 70% in blue (too low)
+    blue_fill = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
+    ws.conditional_formatting.add(
+        f'M{data_start_row}:M{last_data_row}',
+        CellIsRule(operator='lessThan', formula=['0.70'], fill=blue_fill)
+    )
+
+    # Highlight negative staffing gap (understaffed) in red
+    ws.conditional_formatting.add(
+        f'N{data_start_row}:N{last_data_row}',
+        CellIsRule(operator='lessThan', formula=['0'], fill=red_fill, font=red_font)
+    )
+
+def evaluate_service_levels(forecast_df, shrinkage=0.25, threshold=90):
+    """
+    Evaluate Erlang C service levels for every forecast interval at once.
+
+    Mirrors the worksheet calculations (net agents, traffic, P(W>0), service
+    level, ASA, occupancy, staffing gap) with O(1) reads from the shared
+    Erlang C lookup table (erlang_tables.py), treating the forecast's
+    Required_Agents as the scheduled agents. Required agents are the exact
+    Erlang C minimum for 80/90 from the batched solver in erlang_c.py.
+    """
+    table = load_table()
+    scheduled = forecast_df['Required_Agents'].to_numpy(dtype=float)
+    net_agents = excel_round(scheduled * (1 - shrinkage), 1)
+    calls = forecast_df['Calls_Offered'].to_numpy(dtype=float)
+    aht = forecast_df['Average_Handle_Time_Seconds'].to_numpy(dtype=float)
+    metrics = table.metrics(calls, aht, net_agents, threshold=threshold)
+    required = required_agents(calls, aht, threshold=threshold)
+
+    return pd.DataFrame({
+        'Net_Agents': net_agents,
+        'Required_Agents': required,
+        'Traffic_Erlangs': metrics['traffic'],
+        'Erlang_C_Prob': metrics['prob_wait'],
+        'Service_Level': metrics['service_level'],
+        'ASA_Seconds': metrics['asa'],
+        'Occupancy': metrics['occupancy'],
+        'Staffing_Gap': net_agents - required,
+    }, index=forecast_df.index)
+
+def formula_values(forecast_df, results, shrinkage=0.25, threshold=90):
+    """
+    Results of the row formulas (columns E and I-N) for every forecast row.
+
+    Computed with the exact Erlang C engine exactly as the worksheet
+    formulas compute them (Excel ROUND for net agents, "Need More" text where
+    net agents do not exceed traffic), to be stored as cached values next to
+    the formulas by xlsx_cache.cache_formula_values().
+
+    Args:
+        results: evaluate_service_levels() for the same rows (column F holds
+            its Required_Agents)
+
+    Returns:
+        dict of column letter → array of values
+    """
+    scheduled = forecast_df['Required_Agents'].to_numpy(dtype=float)
+    calls = forecast_df['Calls_Offered'].to_numpy(dtype=float)
+    aht = forecast_df['Average_Handle_Time_Seconds'].to_numpy(dtype=float)
+    net_agents = excel_round(scheduled * (1 - shrinkage), 1)
+    metrics = erlang_c_metrics(calls, aht, net_agents, threshold=threshold)
+    stable = net_agents > metrics['traffic']
+
+    return {
+        'E': net_agents,
+        'I': metrics['traffic'],
+        'J': np.where(stable, metrics['prob_wait'].astype(object), 'Need More'),
+        'K': metrics['service_level'],
+        'L': np.where(stable, metrics['asa'].astype(object), 'Need More'),
+        'M': metrics['occupancy'],
+        'N': net_agents - results['Required_Agents'].to_numpy(dtype=float),
+    }
+
+def summary_values(values):
+    """Summary dashboard results over formula_values(): AVERAGE/COUNTIF/SUM as Excel evaluates them"""
+    asa = np.array([value for value in values['L'] if not isinstance(value, str)], dtype=float)
+    return {
+        'average_service_level': float(np.mean(values['K'])) if len(values['K']) else None,
+        'below_target': int(np.sum(values['K'] < SERVICE_LEVEL_TARGET)),
+        'average_occupancy': float(np.mean(values['M'])) if len(values['M']) else None,
+        'average_asa': float(asa.mean()) if asa.size else None,
+        'total_gap': float(np.sum(values['N'])),
+    }
+
+def create_service_level_worksheet(cache_values=False):
+    """
+    Create a new worksheet for service level calculations based on agent schedules
+
+    Args:
+        cache_values: store the Python results as cached values next to the
+            formulas, so readers without a calculation engine see numbers
+            (the rest of the workbook still recalculates when Excel opens it)
+    """
+
+    # Build the sheet on its own; an existing workbook only has this sheet's
+    # part replaced, so its other sheets are not parsed or rewritten
+    output_filename = 'erlang_c_staffing_forecast.xlsx'
+    update = os.path.exists(output_filename)
+    if update:
+        print(f"✓ Updating existing workbook: {output_filename}")
+    else:
+        print("! Workbook not found. Creating new workbook.")
+    workbook = openpyxl.Workbook()
+    ws = workbook.active
+    ws.title = 'Schedule_Service_Level'
+    build = stage('build_sheet')
 
     # Define styles
     header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
@@ -85,7 +226,7 @@ def create_service_level_worksheet():
     ws['A1'].alignment = center_align
 
     ws.merge_cells('A2:N2')
-    ws['A2'] = 'Instructions: Enter your Shrinkage Rate in cell E4. Enter your Scheduled Agents in column D (starting row 7). The calculator will show achievable service levels.'
+    ws['A2'] = 'Instructions: Enter your Shrinkage Rate in cell E4. Enter your Scheduled Agents in column D (starting row 8). The calculator will show achievable service levels.'
     ws['A2'].font = Font(italic=True, size=9)
     ws['A2'].alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
     ws.row_dimensions[2].height = 30
@@ -149,6 +290,7 @@ def create_service_level_worksheet():
         cell.border = border
 
     # ===== LOAD FORECAST DATA =====
+    read = stage('read_forecast')
     try:
         forecast_df = pd.read_csv('erlang_c_staffing_forecast.csv')
         print(f"✓ Loaded forecast data: {len(forecast_df)} rows")
@@ -168,10 +310,15 @@ def create_service_level_worksheet():
                               9, 9, 9, 10, 9, 8, 7, 7, 6, 6, 5, 5,
                               5, 4, 4, 4, 3, 3, 3, 4, 4, 4, 5, 5]
         })
+    read.stop(rows=len(forecast_df))
 
     # ===== POPULATE DATA ROWS =====
     data_start_row = 8
 
+    # Python Erlang C for every forecast interval (exact required agents)
+    with stage('erlang_c', rows=len(forecast_df)):
+        results = evaluate_service_levels(forecast_df, shrinkage=ws['E4'].value)
+
     for idx, row_data in forecast_df.head(36).iterrows():  # One day sample
         row_num = data_start_row + idx
 
@@ -186,8 +333,10 @@ def create_service_level_worksheet():
         ws[f'D{row_num}'].alignment = center_align
         ws[f'D{row_num}'].value = row_data.get('Required_Agents', 10)  # Placeholder
 
+        formulas = row_formulas(row_num)
+
         # Net Agents formula: Scheduled × (1 - Shrinkage)
-        ws[f'E{row_num}'] = f'=ROUND(D{row_num}*(1-$E$4),1)'
+        ws[f'E{row_num}'] = formulas['E']
         ws[f'E{row_num}'].number_format = '0.0'
         ws[f'E{row_num}'].fill = calc_fill
         ws[f'E{row_num}'].border = border
@@ -204,92 +353,57 @@ def create_service_level_worksheet():
         ws[f'H{row_num}'].alignment = center_align
 
         # Traffic Intensity: (Calls × AHT) / 900 seconds (15 min interval)
-        ws[f'I{row_num}'] = f'=(G{row_num}*H{row_num})/900'
+        ws[f'I{row_num}'] = formulas['I']
         ws[f'I{row_num}'].number_format = '0.00'
         ws[f'I{row_num}'].fill = calc_fill
         ws[f'I{row_num}'].border = border
         ws[f'I{row_num}'].alignment = center_align
 
-        # Required Agents (from forecast - for comparison)
-        ws[f'F{row_num}'] = row_data.get('Required_Agents', 8)
+        # Required Agents (exact Erlang C minimum for 80/90 - for comparison)
+        ws[f'F{row_num}'] = int(results.at[idx, 'Required_Agents'])
         ws[f'F{row_num}'].border = border
         ws[f'F{row_num}'].alignment = center_align
 
         # Erlang C Probability formula
-        # This is a complex formula - using simplified approximation for demonstration
-        # Full formula: P(W>0) = (A^N / N!) * (N/(N-A)) / [sum(A^k/k!) + (A^N/N!)*(N/(N-A))]
-        # Simplified: Using Excel's SUMPRODUCT approach
-        erlang_c_formula = f'''=IF(E{row_num}<=I{row_num},"Need More",
-(POWER(E{row_num},I{row_num})/FACT(E{row_num})*(E{row_num}/(E{row_num}-I{row_num})))/
-(SUMPRODUCT(POWER(I{row_num},ROW(INDIRECT("0:"&(E{row_num}-1))))/
-FACT(ROW(INDIRECT("0:"&(E{row_num}-1)))))+
-(POWER(E{row_num},I{row_num})/FACT(E{row_num})*(E{row_num}/(E{row_num}-I{row_num})))))'''
-
-        ws[f'J{row_num}'] = erlang_c_formula
+        ws[f'J{row_num}'] = formulas['J']
         ws[f'J{row_num}'].number_format = '0.0%'
         ws[f'J{row_num}'].fill = calc_fill
         ws[f'J{row_num}'].border = border
         ws[f'J{row_num}'].alignment = center_align
 
-        # Service Level formula: 1 - (P(W>0) × e^(-(N-A)×(T/AHT)))
-        # For 80/90 target: T = 90 seconds
-        service_level_formula = f'''=IF(E{row_num}<=I{row_num},0,
-IF(ISNUMBER(J{row_num}),1-(J{row_num}*EXP(-((E{row_num}-I{row_num})*(90/H{row_num})))),0))'''
-
-        ws[f'K{row_num}'] = service_level_formula
+        # Service Level formula
+        ws[f'K{row_num}'] = formulas['K']
         ws[f'K{row_num}'].number_format = '0.0%'
         ws[f'K{row_num}'].border = border
         ws[f'K{row_num}'].alignment = center_align
 
-        # ASA (Average Speed of Answer): (P(W>0) × AHT) / (N - A)
-        asa_formula = f'=IF(E{row_num}<=I{row_num},"Need More",IF(ISNUMBER(J{row_num}),(J{row_num}*H{row_num})/(E{row_num}-I{row_num}),0))'
-        ws[f'L{row_num}'] = asa_formula
+        # ASA (Average Speed of Answer)
+        ws[f'L{row_num}'] = formulas['L']
         ws[f'L{row_num}'].number_format = '0'
         ws[f'L{row_num}'].border = border
         ws[f'L{row_num}'].alignment = center_align
 
         # Occupancy: Traffic / Net Agents
-        ws[f'M{row_num}'] = f'=IF(E{row_num}>0,I{row_num}/E{row_num},0)'
+        ws[f'M{row_num}'] = formulas['M']
         ws[f'M{row_num}'].number_format = '0.0%'
         ws[f'M{row_num}'].border = border
         ws[f'M{row_num}'].alignment = center_align
 
         # Staffing Gap: Net Agents - Required Agents
-        ws[f'N{row_num}'] = f'=E{row_num}-F{row_num}'
+        ws[f'N{row_num}'] = formulas['N']
         ws[f'N{row_num}'].number_format = '0.0'
         ws[f'N{row_num}'].border = border
         ws[f'N{row_num}'].alignment = center_align
 
     last_data_row = data_start_row + min(len(forecast_df), 36) - 1
 
-    # ===== CONDITIONAL FORMATTING =====
-    # Highlight service levels below 80% in red
-    red_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-    red_font = Font(color="9C0006", bold=True)
-    ws.conditional_formatting.add(
-        f'K{data_start_row}:K{last_data_row}',
-        CellIsRule(operator='lessThan', formula=['0.8'], fill=red_fill, font=red_font)
-    )
+    # ===== PYTHON ERLANG C CHECK (all forecast intervals) =====
+    below_target = int((results['Service_Level'] < SERVICE_LEVEL_TARGET).sum())
+    print(f"✓ Erlang C evaluated for {len(results)} intervals "
+          f"({below_target} below {SERVICE_LEVEL_TARGET:.0%} at {ws['E4'].value:.0%} shrinkage)")
 
-    # Highlight occupancy > 85% in orange (too high)
-    orange_fill = PatternFill(start_color="FFE699", end_color="FFE699", fill_type="solid")
-    ws.conditional_formatting.add(
-        f'M{data_start_row}:M{last_data_row}',
-        CellIsRule(operator='greaterThan', formula=['0.85'], fill=orange_fill)
-    )
-
-    # Highlight occupancy < 70% in blue (too low)
-    blue_fill = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
-    ws.conditional_formatting.add(
-        f'M{data_start_row}:M{last_data_row}',
-        CellIsRule(operator='lessThan', formula=['0.70'], fill=blue_fill)
-    )
-
-    # Highlight negative staffing gap (understaffed) in red
-    ws.conditional_formatting.add(
-        f'N{data_start_row}:N{last_data_row}',
-        CellIsRule(operator='lessThan', formula=['0'], fill=red_fill, font=red_font)
-    )
+    # ===== CONDITIONAL FORMATTING =====
+    add_conditional_formatting(ws, data_start_row, last_data_row)
 
     # ===== SUMMARY DASHBOARD =====
     summary_row = last_data_row + 3
@@ -345,9 +459,40 @@ IF(ISNUMBER(J{row_num}),1-(J{row_num}*EXP(-((E{row_num}-I{row_num})*(90/H{row_nu
     ws[f'E{summary_row}'] = '(Positive = Overstaffed, Negative = Understaffed)'
     ws[f'E{summary_row}'].font = Font(italic=True, size=9, color="7F7F7F")
 
+    build.stop(rows=last_data_row - data_start_row + 1)
+
     # Save the workbook
-    output_filename = 'erlang_c_staffing_forecast.xlsx'
-    workbook.save(output_filename)
+    sheet_filename = f"{output_filename}.sheet.xlsx" if update else output_filename
+    with stage('save'):
+        workbook.save(sheet_filename)
+
+    if cache_values:
+        span = stage('cache_values')
+        sample = forecast_df.head(36)
+        values = formula_values(sample, results.loc[sample.index], shrinkage=ws['E4'].value)
+        summary = summary_values(values)
+        summary_row = last_data_row + 4
+        cached = cache_formula_values(sheet_filename, 'Schedule_Service_Level',
+                                      columns={column: (data_start_row, column_values)
+                                               for column, column_values in values.items()},
+                                      cells={
+                                          f'C{summary_row}': summary['average_service_level'],
+                                          f'G{summary_row}': summary['below_target'],
+                                          f'C{summary_row + 1}': summary['average_occupancy'],
+                                          f'G{summary_row + 1}': summary['average_asa'],
+                                          f'C{summary_row + 2}': summary['total_gap'],
+                                      })
+        span.stop(rows=cached)
+        print(f"✓ Cached {cached} formula results")
+
+    if update:
+        with stage('replace_sheet'):
+            try:
+                replaced = replace_sheet(output_filename, sheet_filename, 'Schedule_Service_Level', index=0)
+            finally:
+                os.remove(sheet_filename)
+        print(f"✓ {'Replaced' if replaced else 'Added'} worksheet Schedule_Service_Level "
+              "(other sheets copied unchanged)")
     print(f"\n✓ Successfully created worksheet in '{output_filename}'")
     print(f"✓ Sample data populated for {last_data_row - data_start_row + 1} intervals")
     print("\nNext steps:")
@@ -362,13 +507,286 @@ IF(ISNUMBER(J{row_num}),1-(J{row_num}*EXP(-((E{row_num}-I{row_num})*(90/H{row_nu
     print("  • Occupancy < 70%: Highlighted in BLUE (understaffed)")
     print("  • Staffing Gap < 0: Highlighted in RED (need more agents)")
 
+# Column widths shared by both worksheet writers
+COLUMN_WIDTHS = {
+    'A': 12, 'B': 12, 'C': 18, 'D': 18, 'E': 16, 'F': 14, 'G': 16,
+    'H': 14, 'I': 16, 'J': 18, 'K': 20, 'L': 14, 'M': 14, 'N': 16
+}
+
+def register_named_styles(workbook):
+    """
+    Register the shared named styles used by the streaming writer.
+
+    Each style is stored once in the workbook and referenced by name from
+    every cell, instead of attaching fill/font/border objects cell by cell.
+    """
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    center_align = Alignment(horizontal="center", vertical="center")
+    input_fill = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
+    calc_fill = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
+
+    styles = [
+        NamedStyle('SL Title', font=Font(bold=True, size=14, color="FFFFFF"),
+                   fill=PatternFill(start_color="203864", end_color="203864", fill_type="solid"),
+                   alignment=center_align),
+        NamedStyle('SL Header', font=Font(bold=True, color="FFFFFF", size=11),
+                   fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+                   alignment=center_align),
+        NamedStyle('SL Subheader', font=Font(bold=True, size=10),
+                   fill=PatternFill(start_color="B4C7E7", end_color="B4C7E7", fill_type="solid"),
+                   alignment=center_align, border=border),
+        NamedStyle('SL Note', font=Font(italic=True, size=9, color="7F7F7F")),
+        NamedStyle('SL Shrinkage', font=Font(bold=True, size=12, color="C00000"),
+                   fill=input_fill, border=border, number_format='0%'),
+        NamedStyle('SL Input', fill=input_fill, border=border, alignment=center_align),
+        NamedStyle('SL Value', border=border, alignment=center_align),
+        NamedStyle('SL Calc 0.0', fill=calc_fill, border=border, alignment=center_align,
+                   number_format='0.0'),
+        NamedStyle('SL Calc 0.00', fill=calc_fill, border=border, alignment=center_align,
+                   number_format='0.00'),
+        NamedStyle('SL Calc %', fill=calc_fill, border=border, alignment=center_align,
+                   number_format='0.0%'),
+        NamedStyle('SL Output %', border=border, alignment=center_align, number_format='0.0%'),
+        NamedStyle('SL Output 0', border=border, alignment=center_align, number_format='0'),
+        NamedStyle('SL Output 0.0', border=border, alignment=center_align, number_format='0.0'),
+    ]
+    for style in styles:
+        workbook.add_named_style(style)
+
+    return [style.name for style in styles]
+
+def read_forecast_chunks(forecast_file, columns, chunksize=10000):
+    """
+    Yield the forecast in chunks of rows.
+
+    CSVs are streamed through the typed loader in interval_data.py;
+    .parquet/.feather/.npz forecasts are read whole (they are compact) and
+    sliced. Dates are formatted back to the CSV's m/d/yy style for display.
+    """
+    if forecast_file.lower().endswith(COLUMNAR_EXTENSIONS):
+        with stage('read_forecast'):
+            forecast_df = read_interval_data(forecast_file, columns=columns)
+        chunks = (forecast_df.iloc[start:start + chunksize]
+                  for start in range(0, len(forecast_df), chunksize))
+    else:
+        chunks = iter_interval_chunks(forecast_file, chunksize, columns)
+
+    while True:
+        # Parsing happens when the next chunk is requested, so time it here
+        with stage('read_forecast') as span:
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            chunk = chunk.copy()
+            chunk['Date'] = format_dates(chunk['Date'])
+            for column in ['Day', 'Time_Interval']:
+                chunk[column] = chunk[column].astype(str)
+            span.rows = len(chunk)
+        yield chunk
+
+def create_service_level_worksheet_streaming(forecast_file='erlang_c_staffing_forecast.csv',
+                                             output_filename='erlang_c_service_level_full.xlsx',
+                                             shrinkage=0.25, chunksize=10000, cache_values=False, into=None):
+    """
+    Write Schedule_Service_Level for the full forecast horizon.
+
+    Streams every row of the forecast (CSV, or a .parquet/.feather/.npz file
+    from interval_data.py) in chunks into a write-only
+    workbook, so memory stays flat no matter how many intervals the forecast
+    covers. Cells reference shared named styles and each styled column reuses
+    a single template cell, which the write-only writer serializes immediately.
+
+    With cache_values, every formula also gets its Python result as cached
+    value and Excel opens the workbook without recalculating it.
+
+    With into, the streamed sheet replaces Schedule_Service_Level inside that
+    existing workbook (xlsx_patch.replace_sheet) instead of being kept as a
+    separate file; the workbook's other sheets are copied unchanged.
+    """
+    if into:
+        output_filename = f"{into}.sheet.xlsx"
+    workbook = openpyxl.Workbook(write_only=True)
+    register_named_styles(workbook)
+    ws = workbook.create_sheet('Schedule_Service_Level')
+
+    for column, width in COLUMN_WIDTHS.items():
+        ws.column_dimensions[column].width = width
+    ws.row_dimensions[2].height = 30
+    ws.freeze_panes = 'A8'
+
+    def styled(value, style):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    # ===== TITLE, INSTRUCTIONS AND SHRINKAGE INPUT (rows 1-5) =====
+    ws.append([styled('SERVICE LEVEL CALCULATOR - Agent Schedule → Achievable Service Levels', 'SL Title')])
+    instructions = WriteOnlyCell(ws, value='Instructions: Enter your Shrinkage Rate in cell E4. Enter your Scheduled Agents in column D (starting row 8). The calculator will show achievable service levels.')
+    instructions.font = Font(italic=True, size=9)
+    instructions.alignment = Alignment(horizontal="left", vertical="center", wrap_text=True)
+    ws.append([instructions])
+    ws.append([])
+    label = WriteOnlyCell(ws, value='Shrinkage Rate:')
+    label.font = Font(bold=True, size=11)
+    ws.append([label, None, None, None, styled(shrinkage, 'SL Shrinkage'),
+               styled('Typical shrinkage: 25-30% (includes breaks, lunch, meetings, training, absenteeism)', 'SL Note')])
+    ws.append([])
+
+    # ===== COLUMN HEADERS (rows 6-7) =====
+    ws.append([styled('SCHEDULE INPUTS', 'SL Header'), None, None,
+               styled('STAFFING', 'SL Header'), None,
+               styled('CALCULATIONS', 'SL Header'), None, None, None,
+               styled('OUTPUTS & METRICS', 'SL Header')])
+    headers = [
+        'Day', 'Date', 'Time Interval',
+        'Scheduled Agents', 'Net Agents',
+        'Calls Offered', 'AHT (sec)', 'Traffic (Erlangs)', 'Req. Agents',
+        'Erlang C Prob.', 'Service Level %', 'ASA (sec)', 'Occupancy %', 'Staffing Gap'
+    ]
+    ws.append([styled(header, 'SL Subheader') for header in headers])
+
+    for cell_range in ['A1:N1', 'A2:N2', 'F4:N4', 'A6:C6', 'D6:E6', 'F6:I6', 'J6:N6']:
+        ws.merged_cells.add(cell_range)
+
+    # ===== STREAM DATA ROWS =====
+    # One reusable template cell per styled column (D..N)
+    column_styles = {
+        'D': 'SL Input', 'E': 'SL Calc 0.0', 'F': 'SL Value', 'G': 'SL Value',
+        'H': 'SL Value', 'I': 'SL Calc 0.00', 'J': 'SL Calc %', 'K': 'SL Output %',
+        'L': 'SL Output 0', 'M': 'SL Output %', 'N': 'SL Output 0.0'
+    }
+    template = {column: styled(None, style) for column, style in column_styles.items()}
+
+    def cell(column, value):
+        template[column].value = value
+        return template[column]
+
+    data_start_row = 8
+    row_num = data_start_row
+    below_target = 0
+    cached_parts = []
+    columns = ['Day', 'Date', 'Time_Interval', 'Calls_Offered',
+               'Average_Handle_Time_Seconds', 'Required_Agents']
+
+    for chunk in read_forecast_chunks(forecast_file, columns, chunksize):
+        with stage('erlang_c', rows=len(chunk)):
+            results = evaluate_service_levels(chunk, shrinkage=shrinkage)
+            if cache_values:
+                cached_parts.append(formula_values(chunk, results, shrinkage=shrinkage))
+        below_target += int((results['Service_Level'] < SERVICE_LEVEL_TARGET).sum())
+
+        with stage('write_rows', rows=len(chunk)):
+            rows = zip(*(chunk[c].tolist() for c in columns), results['Required_Agents'].tolist())
+            for day, date, interval, calls, aht, scheduled, required in rows:
+                formulas = row_formulas(row_num)
+                ws.append([
+                    day, date, interval,
+                    cell('D', scheduled), cell('E', formulas['E']), cell('F', required),
+                    cell('G', calls), cell('H', aht), cell('I', formulas['I']),
+                    cell('J', formulas['J']), cell('K', formulas['K']), cell('L', formulas['L']),
+                    cell('M', formulas['M']), cell('N', formulas['N'])
+                ])
+                row_num += 1
+
+    last_data_row = row_num - 1
+    print(f"✓ Streamed {last_data_row - data_start_row + 1} intervals "
+          f"({below_target} below {SERVICE_LEVEL_TARGET:.0%} at {shrinkage:.0%} shrinkage)")
+
+    add_conditional_formatting(ws, data_start_row, last_data_row)
+
+    # ===== SUMMARY DASHBOARD =====
+    def bold(value):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = Font(bold=True)
+        return cell
+
+    def kpi(value, number_format=None, color=None):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = Font(bold=True, size=12, color=color)
+        if number_format:
+            cell.number_format = number_format
+        return cell
+
+    k_range, l_range, m_range, n_range = (
+        f'{col}{data_start_row}:{col}{last_data_row}' for col in 'KLMN'
+    )
+    summary_row = last_data_row + 3
+
+    ws.append([])
+    ws.append([])
+    ws.append([styled('SUMMARY DASHBOARD', 'SL Header')])
+    ws.merged_cells.add(f'A{summary_row}:N{summary_row}')
+    ws.append([bold('Average Service Level:'), None, kpi(f'=AVERAGE({k_range})', '0.0%'), None,
+               bold('Intervals Below 80%:'), None, kpi(f'=COUNTIF({k_range},"<0.8")', color="C00000")])
+    ws.append([bold('Average Occupancy:'), None, kpi(f'=AVERAGE({m_range})', '0.0%'), None,
+               bold('Average ASA:'), None, kpi(f'=AVERAGE({l_range})', '0" sec"')])
+    ws.append([bold('Total Staffing Gap:'), None, kpi(f'=SUM({n_range})', '0.0'), None,
+               styled('(Positive = Overstaffed, Negative = Understaffed)', 'SL Note')])
+
+    if cache_values and not into:
+        keep_cached_values(workbook)
+    with stage('save', rows=last_data_row - data_start_row + 1):
+        workbook.save(output_filename)
+    if not into:
+        print(f"✓ Saved full-horizon worksheet to '{output_filename}'")
+
+    if cache_values:
+        span = stage('cache_values')
+        values = {column: np.concatenate([part[column] for part in cached_parts])
+                  for column in cached_parts[0]} if cached_parts else {}
+        summary = summary_values(values) if values else {}
+        cached = cache_formula_values(output_filename, 'Schedule_Service_Level',
+                                      columns={column: (data_start_row, column_values)
+                                               for column, column_values in values.items()},
+                                      cells={
+                                          f'C{summary_row + 1}': summary.get('average_service_level'),
+                                          f'G{summary_row + 1}': summary.get('below_target'),
+                                          f'C{summary_row + 2}': summary.get('average_occupancy'),
+                                          f'G{summary_row + 2}': summary.get('average_asa'),
+                                          f'C{summary_row + 3}': summary.get('total_gap'),
+                                      })
+        span.stop(rows=cached)
+        print(f"✓ Cached {cached} formula results")
+
+    if into:
+        with stage('replace_sheet'):
+            try:
+                replaced = replace_sheet(into, output_filename, 'Schedule_Service_Level', index=0)
+            finally:
+                os.remove(output_filename)
+        print(f"✓ {'Replaced' if replaced else 'Added'} full-horizon Schedule_Service_Level in '{into}'")
+
 if __name__ == "__main__":
     print("=" * 70)
     print("SERVICE LEVEL CALCULATOR - Excel Worksheet Generator")
     print("=" * 70)
     print()
 
-    create_service_level_worksheet()
+    parser = argparse.ArgumentParser(description='Generate the Schedule_Service_Level worksheet')
+    parser.add_argument('--full-horizon', action='store_true',
+                        help='stream every forecast interval into a separate write-only workbook')
+    parser.add_argument('--forecast', default='erlang_c_staffing_forecast.csv',
+                        help='forecast for --full-horizon: .csv, .parquet, .feather or .npz (default: %(default)s)')
+    parser.add_argument('--output', default='erlang_c_service_level_full.xlsx',
+                        help='output file for --full-horizon (default: %(default)s)')
+    parser.add_argument('--into', metavar='WORKBOOK',
+                        help='with --full-horizon: replace the sheet inside this existing workbook instead')
+    parser.add_argument('--cache-values', action='store_true',
+                        help='store the computed results next to the formulas (readable without Excel)')
+    add_metrics_arguments(parser, 'create_service_level_calculator')
+    args = parser.parse_args()
+
+    with RunMetrics('create_service_level_calculator', args.metrics, args.profile):
+        if args.full_horizon:
+            create_service_level_worksheet_streaming(forecast_file=args.forecast, output_filename=args.output,
+                                                     cache_values=args.cache_values, into=args.into)
+        else:
+            create_service_level_worksheet(cache_values=args.cache_values)
 
     print("\n" + "=" * 70)
     print("COMPLETE!")
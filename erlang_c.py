@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Erlang C Engine - Vectorized Queueing Calculations
+
+This module evaluates the Erlang C queueing model for whole arrays of
+intervals at once using NumPy. It is the Python counterpart of the Erlang C
+formulas in ERLANG_C_EXCEL_FORMULAS_GUIDE.txt and is used by the worksheet
+generators so they no longer depend on volatile INDIRECT/FACT formulas.
+
+The calculations:
+- Traffic intensity (Erlangs) = Calls × AHT / Interval_Seconds
+- Erlang B via the stable recursion B(k) = A·B(k-1) / (k + A·B(k-1))
+- Erlang C (probability of waiting) from Erlang B
+- Service level, Average Speed of Answer (ASA) and occupancy
+- The inverse: minimum agents that meet SL / ASA / occupancy targets
+
+Fractional agent counts (e.g. net agents after shrinkage) are handled by
+linear interpolation between the neighbouring whole agent counts. The
+recursion never forms A^N or N!, so it stays accurate for hundreds of agents
+where Excel's FACT() overflows (N > 170).
+"""
+
+import numpy as np
+
+# Defaults used throughout the toolkit (15-minute intervals, 80/90 target)
+INTERVAL_SECONDS = 900
+SERVICE_LEVEL_THRESHOLD = 90
+SERVICE_LEVEL_TARGET = 0.80
+
+
+def traffic_intensity(calls, aht, interval_seconds=INTERVAL_SECONDS):
+    """Traffic intensity in Erlangs: (Calls × AHT) / interval length"""
+    calls = np.asarray(calls, dtype=float)
+    aht = np.asarray(aht, dtype=float)
+    return calls * aht / interval_seconds
+
+
+def erlang_b(traffic, agents):
+    """
+    Erlang B blocking probability for whole agent counts.
+
+    Uses the recursion B(0) = 1, B(k) = A·B(k-1) / (k + A·B(k-1)), evaluated
+    for every interval simultaneously up to the largest agent count.
+    """
+    traffic, agents = np.broadcast_arrays(
+        np.asarray(traffic, dtype=float),
+        np.floor(np.asarray(agents, dtype=float)).astype(np.int64)
+    )
+    blocking = np.ones(traffic.shape)
+    result = np.ones(traffic.shape)
+    max_agents = int(agents.max(initial=0))
+
+    for k in range(1, max_agents + 1):
+        load = traffic * blocking
+        blocking = load / (k + load)
+        result = np.where(agents == k, blocking, result)
+
+    return result
+
+
+def _erlang_c_whole(traffic, agents):
+    """Erlang C for whole agent counts (1.0 wherever agents <= traffic)"""
+    blocking = erlang_b(traffic, agents)
+    stable = agents > traffic
+    safe_agents = np.where(stable, agents, 1.0)
+    denominator = safe_agents - traffic * (1 - blocking)
+    prob_wait = np.where(stable, safe_agents * blocking / np.where(stable, denominator, 1.0), 1.0)
+    return np.clip(prob_wait, 0.0, 1.0)
+
+
+def erlang_c(traffic, agents):
+    """
+    Erlang C probability that a call has to wait, P(W>0).
+
+    Accepts scalars or arrays. Fractional agent counts are interpolated
+    linearly between floor(agents) and floor(agents) + 1. Intervals where
+    agents <= traffic return 1.0 (the queue grows without bound).
+    """
+    traffic, agents = np.broadcast_arrays(
+        np.asarray(traffic, dtype=float),
+        np.asarray(agents, dtype=float)
+    )
+    lower = np.floor(np.maximum(agents, 0))
+    weight = np.maximum(agents, 0) - lower
+
+    prob_lower = _erlang_c_whole(traffic, lower)
+    prob_upper = _erlang_c_whole(traffic, lower + 1)
+    prob_wait = prob_lower + weight * (prob_upper - prob_lower)
+
+    return np.where(agents > traffic, prob_wait, 1.0)
+
+
+def service_level(traffic, agents, aht, threshold=SERVICE_LEVEL_THRESHOLD, prob_wait=None):
+    """
+    Fraction of calls answered within `threshold` seconds:
+    SL = 1 - P(W>0) × e^(-(N-A) × T / AHT)
+    """
+    traffic, agents, aht = np.broadcast_arrays(
+        np.asarray(traffic, dtype=float),
+        np.asarray(agents, dtype=float),
+        np.asarray(aht, dtype=float)
+    )
+    if prob_wait is None:
+        prob_wait = erlang_c(traffic, agents)
+
+    stable = (agents > traffic) & (aht > 0)
+    safe_aht = np.where(aht > 0, aht, 1.0)
+    sl = 1 - prob_wait * np.exp(-(agents - traffic) * threshold / safe_aht)
+    return np.where(stable, sl, 0.0)
+
+
+def average_speed_of_answer(traffic, agents, aht, prob_wait=None):
+    """
+    Average Speed of Answer in seconds: ASA = P(W>0) × AHT / (N - A).
+    Returns infinity for intervals where agents <= traffic.
+    """
+    traffic, agents, aht = np.broadcast_arrays(
+        np.asarray(traffic, dtype=float),
+        np.asarray(agents, dtype=float),
+        np.asarray(aht, dtype=float)
+    )
+    if prob_wait is None:
+        prob_wait = erlang_c(traffic, agents)
+
+    stable = agents > traffic
+    spare = np.where(stable, agents - traffic, 1.0)
+    return np.where(stable, prob_wait * aht / spare, np.inf)
+
+
+def occupancy(traffic, agents):
+    """Agent occupancy: Traffic / Agents (0 when no agents are scheduled)"""
+    traffic, agents = np.broadcast_arrays(
+        np.asarray(traffic, dtype=float),
+        np.asarray(agents, dtype=float)
+    )
+    return np.where(agents > 0, traffic / np.where(agents > 0, agents, 1.0), 0.0)
+
+
+def erlang_c_metrics(calls, aht, agents, threshold=SERVICE_LEVEL_THRESHOLD,
+                     interval_seconds=INTERVAL_SECONDS):
+    """
+    Evaluate the full Erlang C model for arrays of intervals in one call.
+
+    Args:
+        calls: Calls offered per interval
+        aht: Average handle time in seconds per interval
+        agents: Agents available per interval (may be fractional)
+        threshold: Service level answer-time threshold in seconds (90 for 80/90)
+        interval_seconds: Interval length in seconds (900 for 15 minutes)
+
+    Returns:
+        dict of NumPy arrays: traffic, prob_wait, service_level, asa, occupancy
+    """
+    traffic = traffic_intensity(calls, aht, interval_seconds)
+    traffic, agents, aht = np.broadcast_arrays(
+        traffic,
+        np.asarray(agents, dtype=float),
+        np.asarray(aht, dtype=float)
+    )
+    prob_wait = erlang_c(traffic, agents)
+
+    return {
+        'traffic': traffic,
+        'prob_wait': prob_wait,
+        'service_level': service_level(traffic, agents, aht, threshold, prob_wait),
+        'asa': average_speed_of_answer(traffic, agents, aht, prob_wait),
+        'occupancy': occupancy(traffic, agents),
+    }
+
+
+def required_agents(calls, aht, target_sl=SERVICE_LEVEL_TARGET, threshold=SERVICE_LEVEL_THRESHOLD,
+                    max_asa=None, max_occupancy=None, interval_seconds=INTERVAL_SECONDS):
+    """
+    Exact minimum whole agents per interval that meet every given target.
+
+    Inverse of erlang_c_metrics(): instead of the square-root rule
+    A + K×√A, each interval gets the smallest N with SL >= target_sl (calls
+    answered within `threshold` seconds), and optionally ASA <= max_asa and
+    occupancy <= max_occupancy. Pass target_sl=None to drop the SL target.
+
+    The Erlang B recursion is advanced one agent at a time for all intervals
+    together, so each candidate N reuses the value from N-1 instead of
+    re-evaluating from scratch. Intervals drop out of the working set as soon
+    as they are satisfied. Intervals with no traffic need 0 agents.
+    """
+    if target_sl is not None and not 0 <= target_sl < 1:
+        raise ValueError("target_sl must be in [0, 1)")
+    if max_asa is not None and max_asa <= 0:
+        raise ValueError("max_asa must be positive")
+    if max_occupancy is not None and not 0 < max_occupancy <= 1:
+        raise ValueError("max_occupancy must be in (0, 1]")
+
+    traffic = traffic_intensity(calls, aht, interval_seconds)
+    traffic, aht = np.broadcast_arrays(traffic, np.asarray(aht, dtype=float))
+    shape = traffic.shape
+    traffic = traffic.ravel()
+    aht = aht.ravel()
+
+    agents = np.zeros(traffic.shape, dtype=np.int64)
+    pending = np.flatnonzero(traffic > 0)
+    load = traffic[pending]
+    handle = aht[pending]
+    blocking = np.ones(load.shape)
+    k = 0
+
+    while pending.size:
+        k += 1
+        blocking = load * blocking / (k + load * blocking)
+
+        met = k > load
+        spare = np.where(met, k - load, 1.0)
+        prob_wait = np.where(met, k * blocking / (spare + load * blocking), 1.0)
+        if target_sl is not None:
+            met &= 1 - prob_wait * np.exp(-spare * threshold / handle) >= target_sl
+        if max_asa is not None:
+            met &= prob_wait * handle / spare <= max_asa
+        if max_occupancy is not None:
+            met &= load <= max_occupancy * k
+
+        if met.any():
+            agents[pending[met]] = k
+            keep = ~met
+            pending, load, handle, blocking = pending[keep], load[keep], handle[keep], blocking[keep]
+
+    return agents.reshape(shape)
+
+
+def erlang_c_excel_formula(agents_ref, traffic_ref):
+    """
+    Build a non-volatile Excel formula for P(W>0) that matches erlang_c().
+
+    Uses POISSON() instead of POWER/FACT so it works past 170 agents, and
+    interpolates between INT(agents) and INT(agents)+1 for fractional counts:
+        P(W>0) = P(N) / (P(N) + (1 - A/N) × F(N-1))
+    where P is the Poisson probability and F the cumulative Poisson.
+    """
+    def whole(n):
+        pmf = f'POISSON({n},{traffic_ref},FALSE)'
+        cdf = f'POISSON({n}-1,{traffic_ref},TRUE)'
+        return f'IF({n}<={traffic_ref},1,{pmf}/({pmf}+(1-{traffic_ref}/({n}))*{cdf}))'
+
+    lower = f'INT({agents_ref})'
+    upper = f'(INT({agents_ref})+1)'
+    return (
+        f'=IF({agents_ref}<={traffic_ref},"Need More",'
+        f'{whole(lower)}+({agents_ref}-{lower})*({whole(upper)}-{whole(lower)}))'
+    )
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Erlang C Lookup Tables - Precomputed, Memory-Mapped Grids
+
+Evaluating Erlang C repeatedly for the same traffic/agent combinations is
+wasted work: every weekday at 10:00 looks roughly alike. This module
+precomputes P(W>0) over a grid of quantized traffic intensity × whole agent
+counts and stores it as a .npy file that is opened with mmap_mode='r', so
+every script and worker process shares the same pages through the OS cache
+instead of loading (or rebuilding) the grid.
+
+Only P(W>0) is stored. Service level and ASA follow from it in O(1):
+    SL  = 1 - P(W>0) × e^(-(N-A) × T / AHT)
+    ASA = P(W>0) × AHT / (N - A)
+so one table serves every AHT and answer-time threshold.
+
+Lookups:
+- Traffic between grid points is linearly interpolated, fractional agents
+  are interpolated between whole counts (same convention as erlang_c.py).
+- Points outside the grid fall back to the exact recursion through an LRU
+  memo cache keyed on (traffic, agents).
+
+Interpolation error bound:
+    Linear interpolation with step h has error <= h²/8 × max|∂²C/∂A²|.
+    Rather than rely on an analytic bound for the curvature, build_table()
+    measures the worst absolute error at every cell midpoint against the
+    exact recursion and records it as `max_interpolation_error` in the
+    sidecar JSON. With the default step of 0.02 Erlangs it is about 5e-5 in
+    P(W>0), i.e. well under 0.01 percentage points of service level.
+
+Usage:
+    python erlang_tables.py            # build erlang_c_table.npy (+ .json) next to this module
+"""
+
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from erlang_c import (erlang_c, service_level, average_speed_of_answer, occupancy,
+                      traffic_intensity, SERVICE_LEVEL_THRESHOLD, INTERVAL_SECONDS)
+
+# Next to this module, so every script and worker finds the same table
+# whatever its working directory
+DEFAULT_TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'erlang_c_table.npy')
+TRAFFIC_STEP = 0.02
+MAX_TRAFFIC = 150.0
+MAX_AGENTS = 250
+
+# Decimal places used to quantize LRU cache keys for out-of-grid lookups
+CACHE_PRECISION = 4
+
+
+def _metadata_path(table_file):
+    return os.path.splitext(table_file)[0] + '.json'
+
+
+def _replace_atomically(path, write):
+    """
+    Write a file through a per-process temp file, then os.replace() it in.
+
+    Workers that build the table at the same time never read or leave a
+    half-written file: each rename swaps in a complete one.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            write(f)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _erlang_c_grid(traffic, max_agents):
+    """P(W>0) for every traffic value × agents 0..max_agents (Erlang B recursion)"""
+    grid = np.ones((traffic.size, max_agents + 1), dtype=np.float64)
+    blocking = np.ones(traffic.size)
+
+    for k in range(1, max_agents + 1):
+        load = traffic * blocking
+        blocking = load / (k + load)
+        stable = k > traffic
+        denominator = np.where(stable, k - traffic * (1 - blocking), 1.0)
+        grid[:, k] = np.where(stable, k * blocking / denominator, 1.0)
+
+    return grid
+
+
+def build_table(table_file=DEFAULT_TABLE_FILE, traffic_step=TRAFFIC_STEP,
+                max_traffic=MAX_TRAFFIC, max_agents=MAX_AGENTS):
+    """
+    Precompute the Erlang C grid and save it with its metadata.
+
+    Writes `table_file` (float32 .npy, traffic rows × agent columns) and a
+    sidecar JSON holding the grid parameters and the measured maximum
+    interpolation error. Both are replaced atomically, so concurrent builds
+    are safe.
+    """
+    points = int(round(max_traffic / traffic_step)) + 1
+    traffic = np.arange(points) * traffic_step
+    grid = _erlang_c_grid(traffic, max_agents).astype(np.float32)
+
+    # Measure the worst interpolation error at the midpoints between grid rows
+    midpoints = traffic[:-1] + traffic_step / 2
+    exact = _erlang_c_grid(midpoints, max_agents)
+    interpolated = (grid[:-1].astype(np.float64) + grid[1:]) / 2
+    max_error = float(np.abs(exact - interpolated).max())
+
+    metadata = {
+        'traffic_step': traffic_step,
+        'max_traffic': float(traffic[-1]),
+        'max_agents': max_agents,
+        'dtype': 'float32',
+        'max_interpolation_error': max_error,
+    }
+    # Grid first: load_table() only opens the table once the sidecar exists
+    _replace_atomically(table_file, lambda f: np.save(f, grid))
+    _replace_atomically(_metadata_path(table_file),
+                        lambda f: f.write(json.dumps(metadata, indent=2).encode()))
+
+    load_table.cache_clear()
+    return metadata
+
+
+@lru_cache(maxsize=65536)
+def _cached_erlang_c(traffic, agents):
+    return float(erlang_c(traffic, agents))
+
+
+def cached_erlang_c(traffic, agents):
+    """Exact scalar Erlang C behind an LRU memo cache (keys rounded to 4 dp)"""
+    return _cached_erlang_c(round(float(traffic), CACHE_PRECISION),
+                            round(float(agents), CACHE_PRECISION))
+
+
+class ErlangTable:
+    """
+    Read-only view of a precomputed Erlang C grid.
+
+    The grid is memory-mapped, so opening a table is cheap and the data is
+    shared between processes. All lookup methods accept scalars or arrays.
+    """
+
+    def __init__(self, table_file=DEFAULT_TABLE_FILE):
+        with open(_metadata_path(table_file)) as f:
+            self.metadata = json.load(f)
+        self.grid = np.load(table_file, mmap_mode='r')
+        self.traffic_step = self.metadata['traffic_step']
+        self.max_traffic = self.metadata['max_traffic']
+        self.max_agents = self.metadata['max_agents']
+        self.max_error = self.metadata['max_interpolation_error']
+
+    def erlang_c(self, traffic, agents):
+        """
+        P(W>0) by bilinear interpolation on the grid.
+
+        Intervals beyond the grid (traffic > max_traffic or agents >=
+        max_agents) are computed exactly through cached_erlang_c().
+        """
+        traffic, agents = np.broadcast_arrays(
+            np.asarray(traffic, dtype=float),
+            np.asarray(agents, dtype=float)
+        )
+        agents = np.maximum(agents, 0)
+        inside = (traffic >= 0) & (traffic < self.max_traffic) & (agents < self.max_agents)
+
+        t = np.where(inside, traffic, 0) / self.traffic_step
+        row = np.floor(t).astype(np.int64)
+        row_weight = t - row
+        col = np.floor(np.where(inside, agents, 0)).astype(np.int64)
+        col_weight = np.where(inside, agents, 0) - col
+
+        grid = self.grid
+        lower = grid[row, col] + row_weight * (grid[row + 1, col] - grid[row, col])
+        upper = grid[row, col + 1] + row_weight * (grid[row + 1, col + 1] - grid[row, col + 1])
+        prob_wait = lower + col_weight * (upper - lower)
+        prob_wait = np.where(agents > traffic, prob_wait, 1.0)
+
+        if not inside.all():
+            prob_wait = np.array(prob_wait, dtype=float)
+            flat = prob_wait.reshape(-1)
+            for index in np.flatnonzero(~inside):
+                flat[index] = cached_erlang_c(traffic.flat[index], agents.flat[index])
+
+        return prob_wait
+
+    def metrics(self, calls, aht, agents, threshold=SERVICE_LEVEL_THRESHOLD,
+                interval_seconds=INTERVAL_SECONDS):
+        """Table-backed equivalent of erlang_c.erlang_c_metrics()"""
+        traffic = traffic_intensity(calls, aht, interval_seconds)
+        traffic, agents, aht = np.broadcast_arrays(
+            traffic,
+            np.asarray(agents, dtype=float),
+            np.asarray(aht, dtype=float)
+        )
+        prob_wait = self.erlang_c(traffic, agents)
+
+        return {
+            'traffic': traffic,
+            'prob_wait': prob_wait,
+            'service_level': service_level(traffic, agents, aht, threshold, prob_wait),
+            'asa': average_speed_of_answer(traffic, agents, aht, prob_wait),
+            'occupancy': occupancy(traffic, agents),
+        }
+
+
+@lru_cache(maxsize=None)
+def load_table(table_file=DEFAULT_TABLE_FILE):
+    """
+    Open the shared Erlang C table, building it on first use.
+
+    Cached per process, so repeated calls return the same memory-mapped
+    ErlangTable.
+    """
+    if not (os.path.exists(table_file) and os.path.exists(_metadata_path(table_file))):
+        build_table(table_file)
+    return ErlangTable(table_file)
+
+
+if __name__ == '__main__':
+    print("Building Erlang C lookup table...")
+    metadata = build_table()
+    print(f"✓ Saved {DEFAULT_TABLE_FILE}")
+    print(f"✓ Traffic 0-{metadata['max_traffic']:g} Erlangs in steps of {metadata['traffic_step']}")
+    print(f"✓ Agents 0-{metadata['max_agents']}")
+    print(f"✓ Max interpolation error in P(W>0): {metadata['max_interpolation_error']:.2e}")
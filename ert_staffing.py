@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Multi-Skill ERT Staffing - Effective Agents and Erlang C per Skill
+
+Vectorized version of the Equivalent Random Traffic (ERT) method in
+MULTI_SKILLED_AGENT_FORECASTING_GUIDE.md (Approach 1):
+
+1. Traffic per skill and interval = Calls × AHT / 900
+2. Effective agents per skill = Σ agents × skill allocation × efficiency
+   (the skill matrix, e.g. A03: 60% Sales / 40% Support at 0.85)
+3. Erlang C per skill on the effective (fractional) agents: SL, ASA and
+   occupancy
+4. Check and adjust: wherever a skill misses its target, add an agent to
+   the group that contributes most to the skills still short, and check
+   again
+
+Every step is an array operation over all intervals × skills, and the
+adjust loop works on all short intervals at once (one agent per interval
+per round), so a year of intervals is staffed in about a second.
+
+Skill matrix CSV, as in the guide (one row per agent or per group of
+identical agents; Agents defaults to 1):
+    Agent_ID,Agents,Sales_Skill,Support_Skill,Efficiency_Factor
+    A01,2,100%,0%,1.00
+    A03,2,60%,40%,0.85
+
+Usage:
+    python ert_staffing.py Sales=sales.csv Support=support.csv --skill-matrix agent_skill_matrix.csv
+"""
+
+import numpy as np
+import pandas as pd
+
+from erlang_c import (INTERVAL_SECONDS, SERVICE_LEVEL_TARGET, SERVICE_LEVEL_THRESHOLD,
+                      erlang_c_metrics, required_agents)
+
+MAX_ROUNDS = 1000
+
+
+def _fractions(values):
+    """Percent strings, percentages or fractions as fractions"""
+    numbers = pd.to_numeric(pd.Series(values).astype(str).str.rstrip('%'), errors='coerce').fillna(0.0)
+    numbers = numbers.to_numpy(dtype=float)
+    percent = pd.Series(values).astype(str).str.endswith('%').to_numpy() | (numbers > 1)
+    return np.where(percent, numbers / 100, numbers)
+
+
+def load_ert_matrix(path, skills):
+    """
+    Read a skill matrix in the guide's layout.
+
+    Skill columns may be named "<Skill>_Skill" or "<Skill>"; the first
+    column names the agent or group.
+
+    Returns:
+        (groups, agents, weights): weights is the (groups × skills) effective
+        agents one agent of each group contributes (allocation × efficiency)
+    """
+    matrix = pd.read_csv(path)
+    columns = []
+    for skill in skills:
+        for name in (f'{skill}_Skill', skill):
+            if name in matrix.columns:
+                columns.append(name)
+                break
+        else:
+            raise ValueError(f"Skill matrix {path} has no column for skill {skill}")
+
+    allocation = np.column_stack([_fractions(matrix[column]) for column in columns])
+    efficiency = _fractions(matrix['Efficiency_Factor']) if 'Efficiency_Factor' in matrix.columns else 1.0
+    agents = matrix['Agents'].to_numpy(dtype=int) if 'Agents' in matrix.columns else np.ones(len(matrix), dtype=int)
+    groups = matrix.iloc[:, 0].astype(str).tolist()
+    return groups, agents, allocation * np.asarray(efficiency).reshape(-1, 1)
+
+
+def effective_agents(staffing, weights):
+    """Effective agents per interval and skill: staffing (intervals × groups) @ weights"""
+    return np.asarray(staffing, dtype=float) @ np.asarray(weights, dtype=float)
+
+
+def ert_metrics(calls, aht, staffing, weights, threshold=SERVICE_LEVEL_THRESHOLD,
+                interval_seconds=INTERVAL_SECONDS):
+    """
+    Erlang C per skill on effective agents, for every interval at once.
+
+    Args:
+        calls, aht: (intervals × skills) forecast calls and handle time
+        staffing: (intervals × groups) agents on duty, or one count per group
+        weights: (groups × skills) allocation × efficiency
+
+    Returns:
+        dict of (intervals × skills) arrays: effective_agents plus the
+        erlang_c_metrics() results (traffic, prob_wait, service_level, asa,
+        occupancy)
+    """
+    calls = np.asarray(calls, dtype=float)
+    staffing = np.broadcast_to(np.asarray(staffing, dtype=float), (calls.shape[0], np.shape(weights)[0]))
+    effective = effective_agents(staffing, weights)
+    metrics = erlang_c_metrics(calls, aht, effective, threshold, interval_seconds)
+    metrics['effective_agents'] = effective
+    return metrics
+
+
+def check_and_adjust(calls, aht, weights, staffing=None, target_sl=SERVICE_LEVEL_TARGET,
+                     threshold=SERVICE_LEVEL_THRESHOLD, max_asa=None, interval_seconds=INTERVAL_SECONDS):
+    """
+    Add agents until every skill meets its target in every interval.
+
+    Each round, every interval with a skill below target gets one more agent
+    in the group whose effective agents best cover the remaining shortfall
+    (Σ weight × (needed - effective) over the short skills), and all those
+    intervals are re-checked together. "Needed" is the whole-agent Erlang C
+    requirement of each skill, so the loop ends once each skill reaches it,
+    and usually sooner because fractional effective agents are evaluated
+    exactly.
+
+    Args:
+        staffing: starting (intervals × groups) agents (default: none)
+        target_sl, threshold, max_asa: targets per skill, as in
+            erlang_c.required_agents()
+
+    Returns:
+        (staffing, metrics): adjusted whole agents per interval and group and
+        the final ert_metrics()
+    """
+    calls = np.asarray(calls, dtype=float)
+    aht = np.broadcast_to(np.asarray(aht, dtype=float), calls.shape)
+    weights = np.asarray(weights, dtype=float)
+    n_intervals, n_groups = calls.shape[0], weights.shape[0]
+    if staffing is None:
+        staffing = np.zeros((n_intervals, n_groups), dtype=np.int64)
+    staffing = np.broadcast_to(np.asarray(staffing, dtype=np.int64), (n_intervals, n_groups)).copy()
+    unserved = ~(weights > 0).any(axis=0) & (calls > 0).any(axis=0)
+    if unserved.any():
+        raise ValueError(f"No agent group contributes to skill column(s) {np.flatnonzero(unserved).tolist()}")
+
+    needed = required_agents(calls, aht, target_sl, threshold, max_asa=max_asa,
+                             interval_seconds=interval_seconds)
+
+    def short_of_target(rows):
+        metrics = ert_metrics(calls[rows], aht[rows], staffing[rows], weights, threshold, interval_seconds)
+        short = calls[rows] > 0
+        met = np.ones(short.shape, dtype=bool)
+        if target_sl is not None:
+            met &= metrics['service_level'] >= target_sl
+        if max_asa is not None:
+            met &= metrics['asa'] <= max_asa
+        return short & ~met, metrics['effective_agents']
+
+    pending = np.arange(n_intervals)
+    for _ in range(MAX_ROUNDS):
+        short, effective = short_of_target(pending)
+        keep = short.any(axis=1)
+        pending, short, effective = pending[keep], short[keep], effective[keep]
+        if not pending.size:
+            break
+        shortfall = np.where(short, np.maximum(needed[pending] - effective, 1e-6), 0.0)
+        best = np.argmax(shortfall @ weights.T, axis=1)
+        staffing[pending, best] += 1
+    else:
+        raise RuntimeError(f"Targets not met after {MAX_ROUNDS} rounds")
+
+    return staffing, ert_metrics(calls, aht, staffing, weights, threshold, interval_seconds)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from interval_data import format_dates
+    from multiskill_simulation import DEFAULT_AHT, load_skill_forecasts, load_staffing
+
+    parser = argparse.ArgumentParser(description='Multi-skill staffing with the ERT (effective agents) method')
+    parser.add_argument('forecasts', nargs='+',
+                        help='forecast files as Skill=path or path (a Queue column splits skills)')
+    parser.add_argument('--skill-matrix', required=True,
+                        help='CSV of agents/groups with <Skill>_Skill allocations and Efficiency_Factor')
+    parser.add_argument('--staffing', help='CSV of Date, Time_Interval and agents per group (default: matrix Agents)')
+    parser.add_argument('--aht', type=float, default=DEFAULT_AHT,
+                        help='handle time in seconds where the forecast has none (default: %(default)s)')
+    parser.add_argument('--target-sl', type=float, default=SERVICE_LEVEL_TARGET,
+                        help='service level target per skill (default: %(default)s)')
+    parser.add_argument('--threshold', type=float, default=SERVICE_LEVEL_THRESHOLD,
+                        help='service level threshold in seconds (default: %(default)s)')
+    parser.add_argument('--max-asa', type=float, help='optional ASA cap in seconds per skill')
+    parser.add_argument('--no-adjust', action='store_true', help='only evaluate the given staffing')
+    parser.add_argument('--output', default='ert_staffing.csv', help='per-skill results CSV (default: %(default)s)')
+    parser.add_argument('--staffing-output', default='ert_group_staffing.csv',
+                        help='adjusted agents per group CSV (default: %(default)s)')
+    args = parser.parse_args()
+
+    intervals, skills, calls, aht, _ = load_skill_forecasts(args.forecasts)
+    aht = np.where(np.isnan(aht), args.aht, aht)
+    groups, agents, weights = load_ert_matrix(args.skill_matrix, skills)
+    staffing = load_staffing(args.staffing, intervals, groups) if args.staffing else agents
+
+    started = time.perf_counter()
+    if args.no_adjust:
+        staffing = np.broadcast_to(staffing, (len(intervals), len(groups)))
+        metrics = ert_metrics(calls, aht, staffing, weights, args.threshold)
+    else:
+        staffing, metrics = check_and_adjust(calls, aht, weights, staffing, args.target_sl,
+                                             args.threshold, args.max_asa)
+    elapsed = time.perf_counter() - started
+
+    n_skills = len(skills)
+    dates = format_dates(intervals['Date']).to_numpy()
+    results = pd.DataFrame({
+        'Date': np.repeat(dates, n_skills),
+        'Time_Interval': np.repeat(intervals['Time_Interval'].to_numpy(), n_skills),
+        'Skill': skills * len(intervals),
+        'Calls': calls.ravel().round(1),
+        'AHT_Seconds': aht.ravel().round(0),
+        'Traffic_Erlangs': metrics['traffic'].ravel().round(2),
+        'Effective_Agents': metrics['effective_agents'].ravel().round(2),
+        'Service_Level_%': (metrics['service_level'] * 100).ravel().round(1),
+        'ASA_Seconds': np.minimum(metrics['asa'], 9999).ravel().round(1),
+        'Occupancy_%': (metrics['occupancy'] * 100).ravel().round(1),
+    })
+    results['Target_Met'] = np.where((results['Service_Level_%'] >= args.target_sl * 100) | (results['Calls'] == 0),
+                                     'Yes', 'No')
+    results.to_csv(args.output, index=False)
+
+    group_staffing = pd.DataFrame(np.asarray(staffing), columns=groups)
+    group_staffing.insert(0, 'Time_Interval', intervals['Time_Interval'].to_numpy())
+    group_staffing.insert(0, 'Date', dates)
+    group_staffing.to_csv(args.staffing_output, index=False)
+
+    print(f"✓ {'Evaluated' if args.no_adjust else 'Staffed'} {len(intervals)} intervals × {n_skills} skills "
+          f"in {elapsed * 1000:.0f} ms")
+    for skill in skills:
+        rows = results[results['Skill'] == skill]
+        print(f"  {skill}: {(rows['Target_Met'] == 'Yes').mean() * 100:.0f}% of intervals meet target, "
+              f"mean effective agents {rows['Effective_Agents'].mean():.1f}")
+    print(f"✓ Saved {args.output} and {args.staffing_output}")
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Incremental Forecast State - Constant-Time Daily Re-Forecasting
+
+Refitting every forecast from the full history each day costs more as the
+history grows. This module keeps the state of each method on disk instead:
+
+- Holt-Winters: level, trend, intraday and weekly seasonal components plus
+  the fitted parameters (holt_winters.py)
+- Seasonal decomposition: per-interval totals and the normal equations of
+  the trend/weekday/month fit (seasonal_decomposition.DecompositionState)
+- Simple exponential smoothing: one level per interval of the day
+
+Appending a day of actuals advances each state by that day's intervals only,
+O(intervals) regardless of how many years the state has absorbed, and the
+next forecast is produced from the updated state. Holt-Winters parameters
+stay as fitted at `init`; re-run `init` now and then (e.g. monthly) to
+re-estimate them.
+
+Usage:
+    python forecast_state.py init call_center_annual_data.csv      # fit, save forecast_state.json
+    python forecast_state.py update new_day.csv --days 7           # add actuals, write next forecast
+"""
+
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from holt_winters import HoltWinters, forecast_intervals, interval_series, HISTORY_WEEKS
+from interval_data import read_interval_data, format_dates
+from seasonal_decomposition import DecompositionState, forecast_decomposition, is_regular_day
+
+DEFAULT_STATE_FILE = 'forecast_state.json'
+STATE_VERSION = 1
+
+# Smoothing constant of the template's Simple Exp Smooth sheet (B4)
+SES_ALPHA = 0.3
+
+
+class ForecastState:
+    """Persisted Holt-Winters, decomposition and exponential smoothing states"""
+
+    def __init__(self, slots, labels, holt_winters, decomposition, ses_levels, ses_alpha=SES_ALPHA):
+        self.slots = list(slots)
+        self.labels = list(labels)
+        self.holt_winters = holt_winters
+        self.decomposition = decomposition
+        self.ses_levels = np.asarray(ses_levels, dtype=np.float64)
+        self.ses_alpha = ses_alpha
+
+    @property
+    def last_date(self):
+        return self.decomposition.last_date
+
+    @classmethod
+    def from_history(cls, history, history_weeks=HISTORY_WEEKS):
+        """Fit every method on a typed interval history (the one full pass)"""
+        grouped, labels = interval_series(history)
+        slots = np.sort(grouped['Interval_Index'].unique()).tolist()
+        _, model = forecast_intervals(history, days=1, history_weeks=history_weeks)
+
+        complete = grouped.groupby('Date')['value'].transform('size') == len(slots)
+        matrix = grouped.loc[complete, 'value'].to_numpy(dtype=np.float64).reshape(-1, len(slots))
+        levels = matrix[0].copy()
+        for row in matrix[1:]:
+            levels += SES_ALPHA * (row - levels)
+
+        return cls(slots, labels, model, DecompositionState.from_history(history), levels)
+
+    def add_day(self, day):
+        """
+        Advance every state by one day of actuals.
+
+        Args:
+            day: typed interval rows for a single date (several sites or
+                queues are summed); every interval of the day must be present,
+                and the date must be the day after last_date
+
+        Holt-Winters tracks position, not dates, so a skipped day would shift
+        every seasonal slot after it; gaps are rejected rather than filled.
+        """
+        date = pd.Timestamp(day['Date'].iloc[0])
+        expected = self.last_date + pd.Timedelta(days=1)
+        if date != expected:
+            raise ValueError(f"{date:%Y-%m-%d} does not follow the last day in the state "
+                             f"({self.last_date:%Y-%m-%d}); add {expected:%Y-%m-%d} first")
+        totals = (day.groupby('Interval_Index', observed=True)['Calls_Offered'].sum()
+                  .reindex(self.slots))
+        if totals.isna().any():
+            missing = [self.labels[i] for i in np.flatnonzero(totals.isna().to_numpy())]
+            raise ValueError(f"{date:%Y-%m-%d} is missing intervals: {', '.join(missing)}")
+        values = totals.to_numpy(dtype=np.float64)
+
+        self.decomposition.add_day(date, self.slots, values, regular=bool(is_regular_day(day).all()))
+        self.holt_winters.update(values)
+        self.ses_levels += self.ses_alpha * (values - self.ses_levels)
+
+    def update(self, actuals):
+        """
+        Add every new day in `actuals` (in date order); returns the number of days added.
+
+        Days already in the state are skipped. The new days must continue
+        from last_date without gaps (see add_day()).
+        """
+        actuals = actuals[actuals['Date'] > self.last_date]
+        # Check the whole run of dates first, so a gap leaves the state untouched
+        dates = pd.DatetimeIndex(np.sort(actuals['Date'].unique()))
+        expected = pd.date_range(self.last_date + pd.Timedelta(days=1), periods=len(dates), freq='D')
+        if not dates.equals(expected):
+            gap = expected[np.argmax(dates != expected)]
+            raise ValueError(f"actuals skip {gap:%Y-%m-%d}; days must continue from "
+                             f"{self.last_date:%Y-%m-%d} without gaps")
+        days = 0
+        for _, day in actuals.groupby('Date', sort=True):
+            self.add_day(day)
+            days += 1
+        return days
+
+    def forecast(self, days=7):
+        """
+        Forecast the days after the last update from the current states.
+
+        Returns a DataFrame with Date, Time_Interval, the Holt-Winters
+        Forecasted_Calls and 95% bounds, and the Seasonal_Decomposition and
+        Exponential_Smoothing forecasts for comparison.
+        """
+        point, lower, upper = self.holt_winters.forecast(days * len(self.slots))
+        decomposition = forecast_decomposition(self.decomposition.decomposition(), days=days)
+        dates = pd.date_range(self.last_date + pd.Timedelta(days=1), periods=days, freq='D')
+
+        return pd.DataFrame({
+            'Date': np.repeat(dates, len(self.slots)),
+            'Time_Interval': self.labels * days,
+            'Forecasted_Calls': np.round(point, 1),
+            'Lower_Bound_95%': np.round(lower, 1),
+            'Upper_Bound_95%': np.round(upper, 1),
+            'Seasonal_Decomposition': np.round(decomposition['Forecast'].to_numpy(), 1),
+            'Exponential_Smoothing': np.round(np.tile(self.ses_levels, days), 1),
+        })
+
+    def save(self, path=DEFAULT_STATE_FILE):
+        state = {
+            'version': STATE_VERSION,
+            'slots': [int(slot) for slot in self.slots],
+            'labels': self.labels,
+            'holt_winters': self.holt_winters.to_dict(),
+            'decomposition': self.decomposition.to_dict(),
+            'ses_alpha': self.ses_alpha,
+            'ses_levels': self.ses_levels.tolist(),
+        }
+        with open(path, 'w') as f:
+            json.dump(state, f)
+
+    @classmethod
+    def load(cls, path=DEFAULT_STATE_FILE):
+        with open(path) as f:
+            state = json.load(f)
+        if state.get('version') != STATE_VERSION:
+            raise ValueError(f"{path} was written by an incompatible version; run 'init' again")
+        return cls(state['slots'], state['labels'],
+                   HoltWinters.from_dict(state['holt_winters']),
+                   DecompositionState.from_dict(state['decomposition']),
+                   state['ses_levels'], state['ses_alpha'])
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Persisted forecast states with incremental daily updates')
+    parser.add_argument('command', choices=['init', 'update'],
+                        help='init: fit on a full history; update: add new days of actuals')
+    parser.add_argument('data', help='interval data: .csv, .parquet, .feather or .npz')
+    parser.add_argument('--state', default=DEFAULT_STATE_FILE, help='state file (default: %(default)s)')
+    parser.add_argument('--days', type=int, default=7, help='forecast horizon in days (default: 7)')
+    parser.add_argument('--output', default='next_forecast.csv', help='forecast CSV (default: %(default)s)')
+    args = parser.parse_args()
+
+    data = read_interval_data(args.data)
+    started = time.perf_counter()
+    if args.command == 'init':
+        state = ForecastState.from_history(data)
+        added = data['Date'].nunique()
+    else:
+        state = ForecastState.load(args.state)
+        added = state.update(data)
+    forecast_df = state.forecast(args.days)
+    elapsed = time.perf_counter() - started
+
+    state.save(args.state)
+    forecast_df['Date'] = format_dates(forecast_df['Date'])
+    forecast_df.to_csv(args.output, index=False)
+    print(f"✓ {args.command}: {added} day(s) through {state.last_date:%Y-%m-%d} in {elapsed * 1000:.0f} ms")
+    print(f"✓ Saved state to {args.state}")
+    print(f"✓ Saved {len(forecast_df)} forecast intervals to {args.output}")
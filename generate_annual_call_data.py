@@ -1,8 +1,21 @@
+import argparse
+import bisect
 import csv
-from datetime import datetime, timedelta
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, date, timedelta
 import random
 import math
 
+import numpy as np
+import pandas as pd
+
+from interval_data import COLUMNAR_EXTENSIONS, read_interval_data, write_interval_data
+from run_metrics import RunMetrics, add_arguments as add_metrics_arguments, stage
+
 # US Federal Holidays for 2025
 US_HOLIDAYS = {
     '1/1/25': "New Year's Day",
@@ -88,6 +101,58 @@ WEEKEND_PATTERN = {k: int(v * 0.4) for k, v in WEEKDAY_PATTERN.items()}
 # Holiday pattern - minimal volume
 HOLIDAY_PATTERN = {k: int(v * 0.15) for k, v in WEEKDAY_PATTERN.items()}
 
+# Site/queue definitions for multi-site generation. volume_scale multiplies the
+# intraday pattern, growth_rate replaces the 7% annual trend, variation the ±12% noise.
+DEFAULT_SITES = [
+    {'site': 'Main', 'queue': 'General', 'volume_scale': 1.0, 'growth_rate': 0.07, 'variation': 0.12},
+]
+
+def _nth_weekday(year, month, weekday, n):
+    """Date of the n-th given weekday (0=Monday) in a month; n=-1 for the last"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year, month + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+def _date_key(day):
+    """Date string in the generator's m/d/yy format"""
+    return f"{day.month}/{day.day}/{day.year % 100:02d}"
+
+def holidays_for_year(year):
+    """
+    US federal holidays (plus the observed eves) for any year.
+
+    Fixed-date holidays keep their date; floating ones follow their rule
+    (e.g. Thanksgiving = 4th Thursday of November). For 2025 this returns
+    exactly US_HOLIDAYS.
+    """
+    thanksgiving = _nth_weekday(year, 11, 3, 4)
+    holidays = {
+        date(year, 1, 1): "New Year's Day",
+        _nth_weekday(year, 1, 0, 3): "MLK Jr. Day",
+        _nth_weekday(year, 2, 0, 3): "Presidents' Day",
+        _nth_weekday(year, 5, 0, -1): "Memorial Day",
+        date(year, 7, 4): "Independence Day",
+        _nth_weekday(year, 9, 0, 1): "Labor Day",
+        _nth_weekday(year, 10, 0, 2): "Columbus Day",
+        date(year, 11, 11): "Veterans Day",
+        thanksgiving: "Thanksgiving",
+        thanksgiving + timedelta(days=1): "Day after Thanksgiving",
+        date(year, 12, 24): "Christmas Eve",
+        date(year, 12, 25): "Christmas Day",
+        date(year, 12, 31): "New Year's Eve",
+    }
+    return {_date_key(day): name for day, name in holidays.items()}
+
+def special_events_for_year(year):
+    """SPECIAL_EVENTS moved to another year (same month/day and impact)"""
+    events = {}
+    for date_str, event in SPECIAL_EVENTS.items():
+        month, day, _ = date_str.split('/')
+        events[_date_key(date(year, int(month), int(day)))] = event
+    return events
+
 def get_growth_multiplier(day_number):
     """
     Calculate growth multiplier for given day (7% annual growth trend).
@@ -142,39 +207,342 @@ def calculate_calls(base_calls, current_date, day_number, day_name, variation=0.
 
     return max(0, int(round(final_calls))), event_type
 
+# Abandonment-rate and ASA bands by calls offered (<10, <20, <30, 30+),
+# shared by calculate_metrics() and calculate_metrics_array()
+VOLUME_BANDS = [10, 20, 30]
+ABANDONMENT_BANDS = [(0, 0.03), (0.02, 0.06), (0.04, 0.08), (0.05, 0.10)]
+ASA_BANDS = [(18, 30), (25, 40), (35, 50), (45, 60)]
+
+# Average Handle Time range in seconds, and the AHT/ASA of intervals with no calls
+AHT_RANGE = (258, 282)
+IDLE_AHT = 264
+IDLE_ASA = 20
+
 def calculate_metrics(calls_offered):
     """Calculate other call metrics based on calls offered"""
     if calls_offered == 0:
-        return 0, 0, 0, 264, 20
-
-    # Abandonment increases with higher call volumes
-    if calls_offered < 10:
-        abandonment_rate = random.uniform(0, 0.03)
-    elif calls_offered < 20:
-        abandonment_rate = random.uniform(0.02, 0.06)
-    elif calls_offered < 30:
-        abandonment_rate = random.uniform(0.04, 0.08)
-    else:
-        abandonment_rate = random.uniform(0.05, 0.10)
+        return 0, 0, 0, IDLE_AHT, IDLE_ASA
+
+    # Abandonment and ASA increase with higher call volumes
+    band = bisect.bisect_right(VOLUME_BANDS, calls_offered)
+
+    abandonment_rate = random.uniform(*ABANDONMENT_BANDS[band])
 
     calls_abandoned = int(round(calls_offered * abandonment_rate))
     calls_answered = calls_offered - calls_abandoned
 
     # Average Handle Time: 258-282 seconds
-    aht = random.randint(258, 282)
-
-    # Average Speed of Answer increases with volume
-    if calls_offered < 10:
-        asa = random.randint(18, 30)
-    elif calls_offered < 20:
-        asa = random.randint(25, 40)
-    elif calls_offered < 30:
-        asa = random.randint(35, 50)
-    else:
-        asa = random.randint(45, 60)
+    aht = random.randint(*AHT_RANGE)
+
+    asa = random.randint(*ASA_BANDS[band])
+
+    return calls_answered, calls_abandoned, abandonment_rate, aht, asa
+
+OUTPUT_FIELDS = [
+    'Day', 'Date', 'Time_Interval', 'Calls_Offered', 'Calls_Answered',
+    'Calls_Abandoned', 'Abandonment_Rate_%', 'Average_Handle_Time_Seconds',
+    'Average_Speed_of_Answer_Seconds', 'Day_Type', 'Holiday_Name', 'Special_Event'
+]
+
+def calculate_calls_array(base_calls, growth, monthly, day_mult, event_impact, rng, variation=0.12):
+    """
+    Vectorized calculate_calls() over a (days × intervals) grid.
+
+    base_calls is the (days × intervals) intraday pattern; growth, monthly,
+    day_mult and event_impact are per-day arrays broadcast across intervals.
+    """
+    day_factor = (growth * monthly * day_mult * event_impact)[:, np.newaxis]
+    random_factor = rng.uniform(1 - variation, 1 + variation, size=base_calls.shape)
+    final_calls = base_calls * day_factor * random_factor
+    return np.maximum(0, np.rint(final_calls)).astype(np.int64)
+
+def calculate_metrics_array(calls_offered, rng):
+    """
+    Vectorized calculate_metrics(): same bands and ranges, drawn in bulk.
+
+    Returns calls_answered, calls_abandoned, abandonment_rate, aht, asa as
+    arrays shaped like calls_offered.
+    """
+    band = np.digitize(calls_offered, VOLUME_BANDS)
+    abandon_low, abandon_high = (np.array(bounds)[band] for bounds in zip(*ABANDONMENT_BANDS))
+    asa_low, asa_high = (np.array(bounds)[band] for bounds in zip(*ASA_BANDS))
+
+    abandonment_rate = rng.uniform(abandon_low, abandon_high)
+    aht = rng.integers(AHT_RANGE[0], AHT_RANGE[1] + 1, size=calls_offered.shape)
+    asa = rng.integers(asa_low, asa_high + 1)
+
+    # Intervals with no calls: no abandonment, default AHT/ASA (as calculate_metrics)
+    idle = calls_offered == 0
+    abandonment_rate = np.where(idle, 0.0, abandonment_rate)
+    aht = np.where(idle, IDLE_AHT, aht)
+    asa = np.where(idle, IDLE_ASA, asa)
+
+    calls_abandoned = np.rint(calls_offered * abandonment_rate).astype(np.int64)
+    calls_answered = calls_offered - calls_abandoned
 
     return calls_answered, calls_abandoned, abandonment_rate, aht, asa
 
+def build_calendar(start_date, end_date, first_day_number=1, growth_rate=0.07):
+    """
+    Per-day calendar for a date range: names, date strings, day types and the
+    growth / monthly / day-of-week / special-event multipliers.
+
+    Holidays and special events are generated for every year in the range.
+    day numbers start at first_day_number, so a shard of a longer range can
+    continue the growth trend where the previous shard stopped.
+    """
+    dates = pd.date_range(start_date, end_date, freq='D')
+    date_str = (dates.month.astype(str) + '/' + dates.day.astype(str) + '/'
+                + pd.Index(dates.year % 100).map('{:02d}'.format))
+    day_name = dates.day_name()
+
+    holidays, events = {}, {}
+    for year in sorted(set(dates.year)):
+        holidays.update(holidays_for_year(year))
+        events.update(special_events_for_year(year))
+
+    holiday_name = date_str.map(lambda d: holidays.get(d, ''))
+    event_type = date_str.map(lambda d: events.get(d, {}).get('type', ''))
+    is_holiday = holiday_name != ''
+    is_weekend = day_name.isin(['Saturday', 'Sunday'])
+    day_type = np.where(is_holiday, 'HOLIDAY: ' + holiday_name,
+                        np.where(is_weekend, 'WEEKEND', 'Weekday'))
+
+    day_number = np.arange(first_day_number, first_day_number + len(dates))
+
+    return pd.DataFrame({
+        'Day': day_name,
+        'Date': date_str,
+        'Day_Type': day_type,
+        'Holiday_Name': holiday_name,
+        'Special_Event': event_type,
+        'is_holiday': is_holiday,
+        'is_weekend': is_weekend,
+        'growth': 1 + growth_rate * day_number / 365,
+        'monthly': dates.month.map(MONTHLY_MULTIPLIERS).to_numpy(dtype=float),
+        'day_mult': day_name.map(DAY_MULTIPLIERS).to_numpy(dtype=float),
+        'event_impact': date_str.map(lambda d: events.get(d, {}).get('impact', 1.0)).to_numpy(dtype=float),
+    })
+
+def generate_interval_frame(calendar, rng, variation=0.12, volume_scale=1.0):
+    """
+    Generate every interval for the days in `calendar` as one DataFrame.
+
+    The intraday pattern, all multipliers and the random noise are built as
+    (days × intervals) arrays, so no per-row Python code runs.
+    """
+    intervals = list(WEEKDAY_PATTERN.keys())
+    weekday = np.array([WEEKDAY_PATTERN[t] for t in intervals], dtype=float)
+    weekend = np.array([WEEKEND_PATTERN[t] for t in intervals], dtype=float)
+    holiday = np.array([HOLIDAY_PATTERN[t] for t in intervals], dtype=float)
+
+    is_holiday = calendar['is_holiday'].to_numpy()[:, np.newaxis]
+    is_weekend = calendar['is_weekend'].to_numpy()[:, np.newaxis]
+    base_calls = np.where(is_holiday, holiday, np.where(is_weekend, weekend, weekday)) * volume_scale
+
+    calls_offered = calculate_calls_array(
+        base_calls,
+        calendar['growth'].to_numpy(),
+        calendar['monthly'].to_numpy(),
+        calendar['day_mult'].to_numpy(),
+        calendar['event_impact'].to_numpy(),
+        rng, variation
+    )
+    calls_answered, calls_abandoned, abandonment_rate, aht, asa = calculate_metrics_array(calls_offered, rng)
+
+    per_day = len(intervals)
+
+    def daily(column):
+        return np.repeat(calendar[column].to_numpy(), per_day)
+
+    return pd.DataFrame({
+        'Day': daily('Day'),
+        'Date': daily('Date'),
+        'Time_Interval': np.tile(intervals, len(calendar)),
+        'Calls_Offered': calls_offered.ravel(),
+        'Calls_Answered': calls_answered.ravel(),
+        'Calls_Abandoned': calls_abandoned.ravel(),
+        'Abandonment_Rate_%': abandonment_rate.ravel(),
+        'Average_Handle_Time_Seconds': aht.ravel(),
+        'Average_Speed_of_Answer_Seconds': asa.ravel(),
+        'Day_Type': daily('Day_Type'),
+        'Holiday_Name': daily('Holiday_Name'),
+        'Special_Event': daily('Special_Event'),
+    })
+
+def write_csv_block(frame, output_file, first):
+    """Format rates as percentages and write (first) or append a block to a CSV"""
+    frame['Abandonment_Rate_%'] = np.char.mod('%.2f%%', frame['Abandonment_Rate_%'].to_numpy() * 100)
+    frame.to_csv(output_file, mode='w' if first else 'a', header=first, index=False)
+
+def is_columnar(output_file):
+    """True when the output path is a typed columnar file (.parquet/.feather/.npz)"""
+    return output_file.lower().endswith(COLUMNAR_EXTENSIONS)
+
+def write_columnar(frame, output_file):
+    """Write generated intervals to a typed columnar file (rates as numeric percentages)"""
+    frame['Abandonment_Rate_%'] = (frame['Abandonment_Rate_%'] * 100).round(2)
+    write_interval_data(frame, output_file)
+
+def generate_annual_data_vectorized(start_date=datetime(2025, 1, 1), end_date=datetime(2025, 12, 31),
+                                    output_file='call_center_annual_data.csv', seed=42,
+                                    days_per_block=366):
+    """
+    Vectorized replacement for generate_annual_data().
+
+    Builds the same layered model (growth, monthly, day-of-week, events,
+    noise) in NumPy over blocks of days and appends each block to the CSV.
+    The same seed always produces the same file, although the numbers differ
+    from the random-module loop in generate_annual_data().
+
+    Pass output_file=None to get the DataFrame back instead of writing a CSV.
+    A .parquet, .feather or .npz output_file writes typed columns instead
+    (see interval_data.py); columnar files are written once at the end.
+    """
+    rng = np.random.default_rng(seed)
+    with stage('build_calendar') as span:
+        calendar = build_calendar(start_date, end_date)
+        span.rows = len(calendar)
+    frames = []
+    total_rows = 0
+
+    for block_start in range(0, len(calendar), days_per_block):
+        with stage('generate_intervals') as span:
+            frame = generate_interval_frame(calendar.iloc[block_start:block_start + days_per_block], rng)
+            span.rows = len(frame)
+        total_rows += len(frame)
+
+        if output_file is None or is_columnar(output_file):
+            frames.append(frame)
+            continue
+
+        with stage('write_csv', rows=len(frame)):
+            write_csv_block(frame, output_file, first=block_start == 0)
+
+    if output_file is None:
+        return pd.concat(frames, ignore_index=True)
+    if frames:
+        with stage('write_columnar', rows=total_rows):
+            write_columnar(pd.concat(frames, ignore_index=True), output_file)
+
+    print(f"✓ Generated {output_file} (vectorized, seed={seed})")
+    print(f"✓ Total days: {len(calendar)}")
+    print(f"✓ Total records: {total_rows}")
+
+def plan_shards(sites, start_date, end_date, seed=42):
+    """
+    Split a multi-site date range into (site, calendar year) shards.
+
+    Each shard carries its own seed derived from (seed, site index, year), so
+    its data never depends on which worker runs it or in what order.
+    """
+    shards = []
+    for site_index, site in enumerate(sites):
+        for year in range(start_date.year, end_date.year + 1):
+            shard_start = max(start_date, datetime(year, 1, 1))
+            shard_end = min(end_date, datetime(year, 12, 31))
+            shards.append({
+                'site': site,
+                'site_index': site_index,
+                'start': shard_start,
+                'end': shard_end,
+                'first_day_number': (shard_start - start_date).days + 1,
+                'seed': [seed, site_index, year],
+            })
+    return shards
+
+def generate_shard(shard, output_file):
+    """Generate one (site, year) shard and write it to its own file (CSV or columnar)"""
+    site = shard['site']
+    rng = np.random.default_rng(np.random.SeedSequence(shard['seed']))
+    calendar = build_calendar(shard['start'], shard['end'], shard['first_day_number'],
+                              growth_rate=site.get('growth_rate', 0.07))
+    frame = generate_interval_frame(calendar, rng, variation=site.get('variation', 0.12),
+                                    volume_scale=site.get('volume_scale', 1.0))
+    frame.insert(0, 'Queue', site.get('queue', ''))
+    frame.insert(0, 'Site', site['site'])
+
+    if is_columnar(output_file):
+        write_columnar(frame, output_file)
+    else:
+        write_csv_block(frame, output_file, first=True)
+    return output_file, len(frame)
+
+def partition_path(output, shard, file_format):
+    """Partition file of a shard: <output>/<site>/<queue>/<year>.<file_format> (no queue level if unset)"""
+    site = shard['site']
+    return os.path.join(output, site['site'], site.get('queue', ''),
+                        f"{shard['start'].year}.{file_format}")
+
+def generate_multi_site_data(sites=DEFAULT_SITES, start_date=datetime(2025, 1, 1),
+                             end_date=datetime(2025, 12, 31), output='call_center_multi_site.csv',
+                             partition=False, workers=None, seed=42, file_format='csv'):
+    """
+    Generate multi-year, multi-site interval data on a process pool.
+
+    Work is sharded by site and calendar year, and every shard has its own
+    deterministic seed, so the output is identical for any worker count.
+
+    Args:
+        sites: list of site dicts (site, queue, volume_scale, growth_rate, variation)
+        output: merged file path, or a directory when partition=True
+        partition: write one file per shard as <output>/<site>/<queue>/<year>.<file_format>
+        workers: process count (default: all cores)
+        file_format: csv, parquet, feather or npz (taken from the output
+            extension when not partitioning)
+    """
+    if not partition:
+        file_format = os.path.splitext(output)[1].lstrip('.').lower() or 'csv'
+    formats = ['csv'] + [extension.lstrip('.') for extension in COLUMNAR_EXTENSIONS]
+    if file_format not in formats:
+        target = 'file_format' if partition else f"output extension of {output}"
+        raise ValueError(f"Unsupported {target}: {file_format!r} (use {', '.join(formats)})")
+
+    with stage('plan_shards') as span:
+        shards = plan_shards(sites, start_date, end_date, seed)
+        span.rows = len(shards)
+
+    if partition:
+        paths = [partition_path(output, shard, file_format) for shard in shards]
+        duplicates = sorted({path for path in paths if paths.count(path) > 1})
+        if duplicates:
+            raise ValueError(f"several shards would write the same partition file: {', '.join(duplicates)} "
+                             f"(give every site/queue pair a distinct name)")
+        for path in paths:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        work_dir = None
+    else:
+        work_dir = tempfile.mkdtemp(prefix='call_center_shards_')
+        paths = [os.path.join(work_dir, f'shard_{i:05d}.{file_format}') for i in range(len(shards))]
+
+    try:
+        with stage('generate_shards') as span, ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(generate_shard, shards, paths))
+            span.rows = total_rows = sum(rows for _, rows in results)
+
+        with stage('merge_output', rows=0 if partition else total_rows):
+            if not partition and file_format != 'csv':
+                # Columnar shards are small and typed: concatenate in shard order and rewrite
+                merged = pd.concat([read_interval_data(path) for path in paths], ignore_index=True)
+                write_interval_data(merged, output)
+            elif not partition:
+                # Merge in shard order (site, then year): header from the first shard only
+                with open(output, 'wb') as merged:
+                    for index, path in enumerate(paths):
+                        with open(path, 'rb') as part:
+                            if index > 0:
+                                part.readline()
+                            shutil.copyfileobj(part, merged)
+    finally:
+        # Also on failure or interruption, so no shard directory is left behind
+        if work_dir is not None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"✓ Generated {len(shards)} shards ({len(sites)} sites × "
+          f"{end_date.year - start_date.year + 1} years) → {output}")
+    print(f"✓ Total records: {total_rows}")
+    return total_rows
+
 def generate_annual_data():
     """Generate a full year of call center data with realistic patterns"""
     start_date = datetime(2025, 1, 1)
@@ -182,13 +550,8 @@ def generate_annual_data():
 
     output_file = 'call_center_annual_data.csv'
 
-    with open(output_file, 'w', newline='') as csvfile:
-        fieldnames = [
-            'Day', 'Date', 'Time_Interval', 'Calls_Offered', 'Calls_Answered',
-            'Calls_Abandoned', 'Abandonment_Rate_%', 'Average_Handle_Time_Seconds',
-            'Average_Speed_of_Answer_Seconds', 'Day_Type', 'Holiday_Name', 'Special_Event'
-        ]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    with stage('generate_rows') as span, open(output_file, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=OUTPUT_FIELDS)
         writer.writeheader()
 
         current_date = start_date
@@ -240,6 +603,7 @@ def generate_annual_data():
                 })
 
             current_date += timedelta(days=1)
+        span.rows = day_number * 36
 
     print(f"✓ Generated {output_file}")
     print(f"✓ Total days: {day_number}")
@@ -253,5 +617,32 @@ def generate_annual_data():
     print(f"✓ Perfect for testing forecasting methods!")
 
 if __name__ == '__main__':
-    random.seed(42)  # For reproducible results
-    generate_annual_data()
+    parser = argparse.ArgumentParser(description='Generate sample call center interval data')
+    parser.add_argument('--vectorized', action='store_true',
+                        help='use the NumPy generator (fast, for large stress-test datasets)')
+    parser.add_argument('--start', default='2025-01-01', help='first date (vectorized mode)')
+    parser.add_argument('--end', default='2025-12-31', help='last date (vectorized mode)')
+    parser.add_argument('--output', default='call_center_annual_data.csv', help='output file (vectorized mode): .csv, .parquet, .feather or .npz')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for reproducible results')
+    parser.add_argument('--sites', help='JSON file with a list of site definitions (multi-site mode)')
+    parser.add_argument('--partition', action='store_true',
+                        help='multi-site mode: write one file per site/queue/year under --output')
+    parser.add_argument('--format', choices=['csv', 'parquet', 'feather', 'npz'], default='csv',
+                        help='file format for --partition output (default: csv)')
+    parser.add_argument('--workers', type=int, help='multi-site mode: worker processes (default: all cores)')
+    add_metrics_arguments(parser, 'generate_annual_call_data')
+    args = parser.parse_args()
+
+    with RunMetrics('generate_annual_call_data', args.metrics, args.profile):
+        if args.sites:
+            with open(args.sites) as f:
+                sites = json.load(f)
+            generate_multi_site_data(sites, datetime.fromisoformat(args.start), datetime.fromisoformat(args.end),
+                                     output=args.output, partition=args.partition,
+                                     workers=args.workers, seed=args.seed, file_format=args.format)
+        elif args.vectorized:
+            generate_annual_data_vectorized(datetime.fromisoformat(args.start), datetime.fromisoformat(args.end),
+                                            output_file=args.output, seed=args.seed)
+        else:
+            random.seed(args.seed)  # For reproducible results
+            generate_annual_data()
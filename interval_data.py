@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Interval Data I/O - Typed Columnar Formats for Call Center Datasets
+
+The interval CSVs (call_center_annual_data.csv, erlang_c_staffing_forecast.csv,
+...) store everything as text: rates like "2.21%", dates like "1/1/25" and
+intervals like "08:00-08:15". This module converts them once into proper
+dtypes and reads/writes them in columnar binary formats, so multi-year
+datasets load in a fraction of the CSV time and memory.
+
+Typed columns:
+- Date: datetime64
+- Time_Interval: categorical, plus Interval_Index = 15-minute slot of the day
+  (08:00-08:15 → 32; 0-95 covers a 24x7 day)
+- *_% columns: float32 percentages ("2.21%" → 2.21)
+- Counts, AHT, ASA, agents: int16 (int32 if a column exceeds the int16 range)
+- Day, Day_Type, Holiday_Name, Special_Event, Site, Queue: categorical
+
+A typed interval row takes roughly 30 bytes, against 500+ bytes for the
+same row parsed as strings.
+
+Supported files (chosen by extension):
+- .csv      - read and converted to typed columns
+- .parquet  - requires pyarrow (pip install pyarrow)
+- .feather  - requires pyarrow (pip install pyarrow)
+- .npz      - NumPy only, always available
+
+Large CSVs:
+    iter_interval_chunks() streams a CSV as typed chunks, and
+    load_interval_csv() assembles them into one frame. Chunk sizes are
+    derived from a memory budget, so parsing a multi-year, multi-site file
+    never holds more than about `memory_budget_mb` of raw strings at once.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUMNAR_EXTENSIONS = ('.parquet', '.feather', '.npz')
+
+INTERVAL_MINUTES = 15
+
+INTEGER_COLUMNS = [
+    'Calls_Offered', 'Calls_Answered', 'Calls_Abandoned',
+    'Average_Handle_Time_Seconds', 'Average_Speed_of_Answer_Seconds',
+    'Required_Agents', 'Estimated_ASA_Seconds'
+]
+CATEGORICAL_COLUMNS = [
+    'Site', 'Queue', 'Day', 'Time_Interval', 'Day_Type', 'Holiday_Name', 'Special_Event'
+]
+COUNT_DTYPE = 'int16'
+WIDE_COUNT_DTYPE = 'int32'
+RATE_DTYPE = 'float32'
+
+# Raw-string parsing budget for chunked CSV loading, and the rows sampled to
+# estimate the in-memory size of one parsed row
+DEFAULT_MEMORY_BUDGET_MB = 64
+SAMPLE_ROWS = 1000
+
+
+def parse_dates(values):
+    """Parse m/d/yy (or ISO) date strings, converting each distinct value once"""
+    values = pd.Series(values, copy=False).astype('category')
+    try:
+        categories = pd.to_datetime(values.cat.categories, format='%m/%d/%y')
+    except ValueError:
+        categories = pd.to_datetime(values.cat.categories, format='mixed')
+    return pd.Series(categories.take(values.cat.codes), index=values.index)
+
+
+def interval_index(values, interval_minutes=INTERVAL_MINUTES):
+    """Slot-of-day index for "HH:MM-HH:MM" labels (08:00-08:15 → 32 for 15-min slots)"""
+    values = pd.Series(values, copy=False).astype('category')
+    starts = values.cat.categories.str.slice(0, 5).str.split(':')
+    slots = np.array([(int(h) * 60 + int(m)) // interval_minutes for h, m in starts], dtype=np.int16)
+    return pd.Series(slots.take(values.cat.codes), index=values.index)
+
+
+def format_dates(values):
+    """Format dates back to the CSVs' m/d/yy style (e.g. for worksheet output)"""
+    dates = pd.to_datetime(pd.Series(values, copy=False))
+    return (dates.dt.month.astype(str) + '/' + dates.dt.day.astype(str) + '/'
+            + (dates.dt.year % 100).map('{:02d}'.format))
+
+
+def count_dtype(values):
+    """int16 when every value fits, otherwise int32"""
+    info = np.iinfo(COUNT_DTYPE)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        return WIDE_COUNT_DTYPE
+    return COUNT_DTYPE
+
+
+def to_typed_frame(df):
+    """
+    Convert a raw interval frame (strings as read from CSV) to typed columns.
+
+    Columns already typed are left alone, so the function is safe to apply
+    to data read back from a columnar file.
+    """
+    df = df.copy()
+
+    for column in df.columns:
+        if not column.endswith('_%'):
+            continue
+        if pd.api.types.is_string_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column].str.rstrip('%'))
+        df[column] = df[column].astype(RATE_DTYPE)
+
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(count_dtype(df[column]))
+
+    if 'Date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Date']):
+        df['Date'] = parse_dates(df['Date'])
+    if 'Date' in df.columns:
+        df['Date'] = df['Date'].astype('datetime64[ns]')
+
+    if 'Time_Interval' in df.columns and 'Interval_Index' not in df.columns:
+        position = df.columns.get_loc('Time_Interval') + 1
+        df.insert(position, 'Interval_Index', interval_index(df['Time_Interval']))
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                if values.isna().any():
+                    values = values.cat.add_categories(['']).fillna('')
+                df[column] = values
+            else:
+                df[column] = values.fillna('').astype('category')
+
+    return df
+
+
+def _extension(path):
+    return os.path.splitext(path)[1].lower()
+
+
+def _require_pyarrow(path):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(f"Reading/writing {_extension(path)} files requires pyarrow "
+                          "(pip install pyarrow), or use .npz instead")
+
+
+def _write_npz(df, path):
+    arrays = {'__columns__': np.array(df.columns, dtype=str)}
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            arrays[f'{column}__codes'] = values.cat.codes.to_numpy()
+            arrays[f'{column}__categories'] = np.array(values.cat.categories, dtype=str)
+        elif pd.api.types.is_datetime64_any_dtype(values):
+            arrays[column] = values.to_numpy().astype('datetime64[D]')
+        elif pd.api.types.is_string_dtype(values):
+            arrays[column] = values.to_numpy().astype(str)
+        else:
+            arrays[column] = values.to_numpy()
+    np.savez(path, **arrays)
+
+
+def _read_npz(path, columns=None):
+    with np.load(path) as archive:
+        names = list(archive['__columns__'])
+        data = {}
+        for column in names:
+            if columns is not None and column not in columns:
+                continue
+            if f'{column}__codes' in archive:
+                data[column] = pd.Categorical.from_codes(
+                    archive[f'{column}__codes'], archive[f'{column}__categories'])
+            else:
+                data[column] = archive[column]
+    return pd.DataFrame(data)
+
+
+def write_interval_data(df, path):
+    """
+    Write an interval frame in the format given by the file extension.
+
+    The frame is converted with to_typed_frame() first, so raw CSV-style
+    frames can be passed directly.
+    """
+    df = to_typed_frame(df)
+    extension = _extension(path)
+
+    if extension == '.csv':
+        df.to_csv(path, index=False)
+    elif extension == '.parquet':
+        _require_pyarrow(path)
+        df.to_parquet(path, index=False)
+    elif extension == '.feather':
+        _require_pyarrow(path)
+        df.reset_index(drop=True).to_feather(path)
+    elif extension == '.npz':
+        _write_npz(df, path)
+    else:
+        raise ValueError(f"Unsupported interval data format: {path}")
+
+
+def estimate_chunksize(path, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, columns=None):
+    """
+    Rows per chunk that keep one raw (string-typed) chunk within the budget.
+
+    Parses the first SAMPLE_ROWS rows and measures their deep memory usage.
+    """
+    sample = pd.read_csv(path, usecols=columns, nrows=SAMPLE_ROWS)
+    bytes_per_row = sample.memory_usage(deep=True, index=False).sum() / max(len(sample), 1)
+    return max(int(memory_budget_mb * 1024 * 1024 / max(bytes_per_row, 1)), 1)
+
+
+def iter_interval_chunks(path, chunksize=None, columns=None,
+                         memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
+    """
+    Stream an interval CSV as typed DataFrame chunks.
+
+    Args:
+        path: CSV file in the call_center_annual_data.csv layout (extra
+            columns such as Site/Queue or forecast columns are fine)
+        chunksize: rows per chunk (default: derived from memory_budget_mb)
+        columns: optional list of columns to load
+        memory_budget_mb: raw-string parsing budget used to size chunks
+
+    Categories can differ between chunks; load_interval_csv() unifies them.
+    """
+    if chunksize is None:
+        chunksize = estimate_chunksize(path, memory_budget_mb, columns)
+
+    # Let the parser build labels and dates as categoricals directly: each
+    # distinct string is materialized once per chunk instead of once per row.
+    # low_memory=False parses each chunk in one block: pandas' internal
+    # sub-blocks fail to merge categoricals when a mostly empty column
+    # (Holiday_Name, Special_Event) is all blank in one of them.
+    dtype = {column: 'category' for column in CATEGORICAL_COLUMNS + ['Date']}
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize, dtype=dtype, low_memory=False):
+        yield to_typed_frame(chunk)
+
+
+def _concat_typed(chunks):
+    """Concatenate typed chunks, keeping categoricals and compact dtypes"""
+    if not chunks:
+        return pd.DataFrame()
+    data = {}
+    for column in chunks[0].columns:
+        parts = [chunk[column] for chunk in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            data[column] = pd.api.types.union_categoricals(parts)
+        else:
+            values = np.concatenate([part.to_numpy() for part in parts])
+            if column in INTEGER_COLUMNS:
+                values = values.astype(count_dtype(values))
+            data[column] = values
+    return pd.DataFrame(data)
+
+
+def load_interval_csv(path, columns=None, chunksize=None,
+                      memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, iterator=False):
+    """
+    Load an interval CSV into compact typed columns.
+
+    Returns the full typed frame, or the chunk iterator from
+    iter_interval_chunks() when iterator=True. Either way the raw text is
+    parsed one budget-sized chunk at a time; only the typed result (about
+    30 bytes per row) is kept.
+    """
+    chunks = iter_interval_chunks(path, chunksize, columns, memory_budget_mb)
+    if iterator:
+        return chunks
+    return _concat_typed(list(chunks))
+
+
+def read_interval_data(path, columns=None):
+    """
+    Read an interval dataset (CSV or columnar) into a typed DataFrame.
+
+    Args:
+        path: .csv, .parquet, .feather or .npz file
+        columns: optional list of columns to load
+    """
+    extension = _extension(path)
+
+    if extension == '.csv':
+        return load_interval_csv(path, columns=columns)
+    elif extension == '.parquet':
+        _require_pyarrow(path)
+        df = pd.read_parquet(path, columns=columns)
+    elif extension == '.feather':
+        _require_pyarrow(path)
+        df = pd.read_feather(path, columns=columns)
+    elif extension == '.npz':
+        df = _read_npz(path, columns)
+    else:
+        raise ValueError(f"Unsupported interval data format: {path}")
+
+    return to_typed_frame(df)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Convert an interval dataset between CSV and columnar formats')
+    parser.add_argument('source', help='input file (.csv, .parquet, .feather, .npz)')
+    parser.add_argument('target', help='output file (.csv, .parquet, .feather, .npz)')
+    args = parser.parse_args()
+
+    data = read_interval_data(args.source)
+    write_interval_data(data, args.target)
+    print(f"✓ Converted {args.source} → {args.target} ({len(data)} rows)")
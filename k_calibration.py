@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+K-Value Calibration - Fit the Square Root Staffing Rule to Exact Erlang Results
+
+The Staffing Calculator staffs Required_Agents = CEILING(A + K×√A) with a
+hand-picked K (B7 = 1.6; erlang_c_staffing_forecast.csv uses 1.5), and
+k_value_calibration_guide.md describes tuning K by hand in Excel. This
+module calibrates K from the historical intervals instead:
+
+1. Traffic per interval: A = Calls_Offered × AHT / 900
+2. Exact minimum agents per interval for the target (80/90 by default):
+   Erlang C (erlang_c.required_agents, optionally with an ASA cap), or
+   Erlang A with patience estimated from the history's ASA and
+   abandonment (erlang_a.required_agents, --model erlang_a)
+3. Batched grid search: every K in K_GRID is applied to every interval at
+   once, and an interval is covered when CEILING(A + K×√A) reaches its exact
+   requirement. Each group gets the smallest K covering at least `coverage`
+   of its intervals.
+
+Groups (--by):
+- all:          one K for B7
+- interval:     one K per Time_Interval (time of day)
+- day_type:     Weekday / Weekend / Holiday
+- traffic_band: one K per band of traffic (TRAFFIC_BANDS, in Erlangs)
+
+Results are saved as a CSV report and a JSON table, and are written back
+into the forecast template's Staffing Calculator: B7 gets the overall K,
+the per-group table goes next to the exact Erlang C table, and each
+Safety_Buffer formula looks its K up in that table (B7 when no row
+matches). Holidays are not visible in the template, so a day_type table is
+looked up as Weekday/Weekend there.
+
+Usage:
+    python k_calibration.py call_center_annual_data.csv --by traffic_band
+    python k_calibration.py call_center_annual_data.csv --by interval --coverage 0.9 --template ""
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from erlang_c import (INTERVAL_SECONDS, SERVICE_LEVEL_TARGET, SERVICE_LEVEL_THRESHOLD,
+                      required_agents, traffic_intensity)
+
+GROUPINGS = ('all', 'interval', 'day_type', 'traffic_band')
+MODELS = ('erlang_c', 'erlang_a')
+
+K_GRID = np.round(np.arange(0, 5.0001, 0.01), 2)
+TRAFFIC_BANDS = (0, 1, 2, 3, 5, 8, 13, 20, 35, 60, 100)
+DEFAULT_COVERAGE = 0.95
+
+# K-values currently in use: erlang_c_staffing_forecast.csv and the template's B7
+REFERENCE_K = (1.5, 1.6)
+
+# Intervals per block of the grid search (block × len(K_GRID) cells)
+SEARCH_BLOCK = 8192
+
+
+def day_types(history):
+    """Weekday / Weekend / Holiday per interval (from Day_Type, else from the date)"""
+    if 'Day_Type' in history.columns:
+        labels = history['Day_Type'].astype(str).str.upper()
+        return np.where(labels.str.startswith('HOLIDAY'), 'Holiday',
+                        np.where(labels.str.startswith('WEEKEND'), 'Weekend', 'Weekday'))
+    weekend = pd.to_datetime(history['Date']).dt.dayofweek.to_numpy() >= 5
+    return np.where(weekend, 'Weekend', 'Weekday')
+
+
+def band_label(lower, upper):
+    return f"{lower:g}+" if upper is None else f"{lower:g}-{upper:g}"
+
+
+def group_keys(history, traffic, by):
+    """Lookup key per interval: Time_Interval label, day type, band lower bound or 'All'"""
+    if by == 'all':
+        return np.full(len(history), 'All', dtype=object)
+    if by == 'interval':
+        return history['Time_Interval'].astype(str).to_numpy()
+    if by == 'day_type':
+        return day_types(history)
+    if by == 'traffic_band':
+        bands = np.asarray(TRAFFIC_BANDS, dtype=float)
+        return bands[np.searchsorted(bands, traffic, side='right') - 1]
+    raise ValueError(f"by must be one of {GROUPINGS}, got {by!r}")
+
+
+def staffed_agents(traffic, k):
+    """Square root rule as the template computes it: CEILING(A + K×√A, 1)"""
+    return np.ceil(traffic + k * np.sqrt(traffic) - 1e-9)
+
+
+def exact_requirements(history, model='erlang_c', target_sl=SERVICE_LEVEL_TARGET,
+                       threshold=SERVICE_LEVEL_THRESHOLD, max_asa=None, max_abandon=None,
+                       interval_seconds=INTERVAL_SECONDS):
+    """Exact minimum agents per historical interval under Erlang C or Erlang A"""
+    calls = history['Calls_Offered'].to_numpy(dtype=float)
+    aht = history['Average_Handle_Time_Seconds'].to_numpy(dtype=float)
+    if model == 'erlang_c':
+        return required_agents(calls, aht, target_sl=target_sl, threshold=threshold,
+                               max_asa=max_asa, interval_seconds=interval_seconds)
+    if model == 'erlang_a':
+        from erlang_a import estimate_patience, required_agents as erlang_a_required_agents
+        return erlang_a_required_agents(calls, aht, estimate_patience(history), max_abandon=max_abandon,
+                                        target_sl=target_sl, threshold=threshold, max_asa=max_asa,
+                                        interval_seconds=interval_seconds)
+    raise ValueError(f"model must be one of {MODELS}, got {model!r}")
+
+
+def calibrate_k(history, by='traffic_band', coverage=DEFAULT_COVERAGE, model='erlang_c',
+                target_sl=SERVICE_LEVEL_TARGET, threshold=SERVICE_LEVEL_THRESHOLD, max_asa=None,
+                max_abandon=None, interval_seconds=INTERVAL_SECONDS):
+    """
+    Fit K per group so that CEILING(A + K×√A) covers the exact requirement
+    in at least `coverage` of the group's intervals.
+
+    Args:
+        history: typed interval history (interval_data.read_interval_data)
+        by: grouping, one of GROUPINGS
+        coverage: share of intervals (with calls) that must be staffed to
+            the exact requirement
+        model: 'erlang_c', or 'erlang_a' for abandonment-aware requirements
+        target_sl, threshold: service level goal (80/90)
+        max_asa: optional ASA cap in seconds for the exact requirement
+        max_abandon: abandonment cap for model='erlang_a'
+
+    Returns:
+        DataFrame with one row per group: Group (lookup key), Label, K,
+        Intervals, Met_Target_%, Met_At_K_<ref>_% for REFERENCE_K,
+        Agent_Intervals at K and at the references, Average_Traffic and the
+        observed Average_ASA_Seconds and Abandonment_Rate_%
+    """
+    if not 0 < coverage <= 1:
+        raise ValueError("coverage must be in (0, 1]")
+
+    calls = history['Calls_Offered'].to_numpy(dtype=float)
+    aht = history['Average_Handle_Time_Seconds'].to_numpy(dtype=float)
+    traffic = traffic_intensity(calls, aht, interval_seconds)
+    needed = exact_requirements(history, model, target_sl, threshold, max_asa, max_abandon, interval_seconds)
+
+    # Intervals without calls are met by any K; leave them out of the shares
+    active = np.flatnonzero(calls > 0)
+    if not active.size:
+        raise ValueError("history has no intervals with calls to calibrate on")
+    keys = group_keys(history, traffic, by)[active]
+    groups, codes = np.unique(keys, return_inverse=True)
+    order = np.argsort(codes, kind='stable')
+    active, codes = active[order], codes[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    sizes = np.diff(np.r_[starts, len(codes)])
+
+    # ===== BATCHED GRID SEARCH: intervals × K_GRID =====
+    covered = np.zeros((len(groups), len(K_GRID)))
+    for start in range(0, len(active), SEARCH_BLOCK):
+        rows = active[start:start + SEARCH_BLOCK]
+        met = staffed_agents(traffic[rows, None], K_GRID[None, :]) >= needed[rows, None]
+        block_codes = codes[start:start + SEARCH_BLOCK]
+        block_starts = np.flatnonzero(np.r_[True, block_codes[1:] != block_codes[:-1]])
+        covered[block_codes[block_starts]] += np.add.reduceat(met.astype(np.int32), block_starts, axis=0)
+    share = covered / sizes[:, None]
+    reached = share >= coverage - 1e-12
+    best = np.where(reached.any(axis=1), reached.argmax(axis=1), len(K_GRID) - 1)
+    k_values = K_GRID[best]
+
+    # ===== REPORT =====
+    group_traffic = traffic[active]
+    k_per_row = k_values[codes]
+    report = pd.DataFrame({
+        'Group': groups,
+        'K': k_values,
+        'Intervals': sizes,
+        'Met_Target_%': (share[np.arange(len(groups)), best] * 100).round(1),
+    })
+    for reference in REFERENCE_K:
+        column = int(np.argmin(np.abs(K_GRID - reference)))
+        report[f'Met_At_K_{reference:g}_%'] = (share[:, column] * 100).round(1)
+    report['Agent_Intervals'] = np.add.reduceat(staffed_agents(group_traffic, k_per_row), starts).astype(np.int64)
+    for reference in REFERENCE_K:
+        report[f'Agent_Intervals_K_{reference:g}'] = np.add.reduceat(
+            staffed_agents(group_traffic, reference), starts).astype(np.int64)
+    report['Exact_Agent_Intervals'] = np.add.reduceat(needed[active], starts).astype(np.int64)
+    report['Average_Traffic'] = (np.add.reduceat(group_traffic, starts) / sizes).round(2)
+
+    group_calls = calls[active]
+    if 'Average_Speed_of_Answer_Seconds' in history.columns:
+        asa = history['Average_Speed_of_Answer_Seconds'].to_numpy(dtype=float)[active]
+        report['Average_ASA_Seconds'] = (np.add.reduceat(asa * group_calls, starts)
+                                         / np.add.reduceat(group_calls, starts)).round(1)
+    if 'Calls_Abandoned' in history.columns:
+        abandoned = history['Calls_Abandoned'].to_numpy(dtype=float)[active]
+        report['Abandonment_Rate_%'] = (np.add.reduceat(abandoned, starts)
+                                        / np.add.reduceat(group_calls, starts) * 100).round(2)
+
+    if by == 'traffic_band':
+        bands = list(TRAFFIC_BANDS) + [None]
+        upper = {lower: bands[i + 1] for i, lower in enumerate(TRAFFIC_BANDS)}
+        report.insert(1, 'Label', [band_label(lower, upper[lower]) for lower in groups])
+        report['Group'] = report['Group'].astype(float)
+    else:
+        report.insert(1, 'Label', report['Group'])
+        if by == 'interval':
+            first_seen = pd.unique(history['Time_Interval'].astype(str))
+            report = report.set_index('Group').loc[[g for g in first_seen if g in set(groups)]].reset_index()
+    return report
+
+
+def k_table(report, overall, by, coverage, model, target_sl, threshold):
+    """JSON-ready calibration table for the template (see create_forecast_template.write_k_table)"""
+    return {
+        'by': by,
+        'k': float(overall),
+        'coverage': coverage,
+        'model': model,
+        'target_sl': target_sl,
+        'threshold': threshold,
+        'groups': [{'key': row['Group'] if by != 'traffic_band' else float(row['Group']),
+                    'label': str(row['Label']), 'k': float(row['K']), 'intervals': int(row['Intervals']),
+                    'met_target': float(row['Met_Target_%'])}
+                   for _, row in report.iterrows()],
+    }
+
+
+def save_k_table(table, path):
+    with open(path, 'w') as f:
+        json.dump(table, f, indent=2)
+
+
+def load_k_table(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_template(path, table):
+    """Write a calibration table into an existing forecast template's Staffing Calculator"""
+    from openpyxl import load_workbook
+    from create_forecast_template import STAFFING_SHEET, write_k_table
+
+    workbook = load_workbook(path)
+    rows = write_k_table(workbook[STAFFING_SHEET], table)
+    workbook.save(path)
+    return rows
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    import time
+
+    from interval_data import read_interval_data
+
+    parser = argparse.ArgumentParser(description='Calibrate the square root staffing K-value from history')
+    parser.add_argument('history', nargs='?', default='call_center_annual_data.csv',
+                        help='interval history with Calls_Offered and AHT (default: %(default)s)')
+    parser.add_argument('--by', choices=GROUPINGS, default='traffic_band',
+                        help='one K per group (default: %(default)s)')
+    parser.add_argument('--coverage', type=float, default=DEFAULT_COVERAGE,
+                        help='share of intervals staffed to the exact requirement (default: %(default)s)')
+    parser.add_argument('--model', choices=MODELS, default='erlang_c',
+                        help='exact requirement: Erlang C, or Erlang A with patience from ASA and '
+                             'abandonment (default: %(default)s)')
+    parser.add_argument('--target-sl', type=float, default=SERVICE_LEVEL_TARGET,
+                        help='service level target as a fraction (default: %(default)s)')
+    parser.add_argument('--threshold', type=float, default=SERVICE_LEVEL_THRESHOLD,
+                        help='service level threshold in seconds (default: %(default)s)')
+    parser.add_argument('--max-asa', type=float, help='optional ASA cap in seconds')
+    parser.add_argument('--max-abandon', type=float, help='abandonment cap for --model erlang_a')
+    parser.add_argument('--output', default='k_calibration.csv', help='per-group report CSV (default: %(default)s)')
+    parser.add_argument('--table', default='k_calibration.json',
+                        help='calibration table JSON, for create_forecast_template.py --k-table (default: %(default)s)')
+    parser.add_argument('--template', default='call_center_forecast_template.xlsx',
+                        help='forecast template to write the table into (default: %(default)s; "" to skip)')
+    args = parser.parse_args()
+
+    history = read_interval_data(args.history)
+    options = dict(coverage=args.coverage, model=args.model, target_sl=args.target_sl,
+                   threshold=args.threshold, max_asa=args.max_asa, max_abandon=args.max_abandon)
+
+    started = time.perf_counter()
+    report = calibrate_k(history, by=args.by, **options)
+    overall = calibrate_k(history, by='all', **options)['K'].iloc[0]
+    elapsed = time.perf_counter() - started
+
+    report.to_csv(args.output, index=False)
+    table = k_table(report, overall, args.by, args.coverage, args.model, args.target_sl, args.threshold)
+    save_k_table(table, args.table)
+
+    print(f"✓ Calibrated {len(report)} {args.by} groups over {report['Intervals'].sum():,} intervals "
+          f"in {elapsed:.2f}s ({args.model}, {args.target_sl:.0%}/{args.threshold:g}, "
+          f"{args.coverage:.0%} coverage)")
+    print(f"✓ Overall K = {overall:.2f}; groups range {report['K'].min():.2f}-{report['K'].max():.2f}")
+    total = report['Agent_Intervals'].sum()
+    for reference in REFERENCE_K:
+        column = f'Agent_Intervals_K_{reference:g}'
+        met = (report[f'Met_At_K_{reference:g}_%'] * report['Intervals']).sum() / report['Intervals'].sum()
+        print(f"✓ K = {reference:g} staffs {report[column].sum() - total:+,} agent-intervals vs calibrated "
+              f"({met:.1f}% of intervals met)")
+    print(f"✓ Saved {args.output} and {args.table}")
+
+    if args.template:
+        if os.path.exists(args.template):
+            rows = write_template(args.template, table)
+            print(f"✓ Wrote the K table into {args.template} ({rows} Safety_Buffer formulas)")
+        else:
+            print(f"  (template {args.template} not found; use create_forecast_template.py --k-table {args.table})")
@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+"""
+Multi-Skill Call Center Simulation - Event-Driven Engine with Replications
+
+MULTI_SKILLED_AGENT_FORECASTING_GUIDE.md describes simulation as the most
+accurate multi-skill method and sketches it with SimPy (one generator per
+agent and per call). This module is a runnable engine built for throughput:
+
+- Agents are identical within an agent group (a row of the skill matrix),
+  so agent state is a few integer arrays per group (idle, on duty, leaving)
+  rather than one object per agent.
+- Arrivals for the whole horizon are drawn up front with NumPy (Poisson
+  counts per interval and skill, uniform times within the interval) and
+  merged in time order with a heap of service completions. Staffing changes
+  at interval boundaries are a third, pre-sorted event stream.
+- Abandonment is resolved lazily: a queued call whose patience has run out
+  is dropped when it reaches the head of its queue, so no events are
+  scheduled for it.
+- Routing: an arriving call goes to an idle agent of the most efficient
+  group that has its skill; a freed agent takes the longest-waiting call
+  among the skills it handles. Handle time is AHT / efficiency.
+
+Replications run in parallel processes. Each replication draws its arrivals,
+handle times and patience from separate random streams keyed by (seed,
+replication), so two staffing plans simulated with the same seed see the
+same calls (common random numbers) and their difference is not noise.
+
+Inputs:
+- Forecast CSV(s) with Forecasted_Calls or Calls_Offered per Date and
+  Time_Interval: one file per skill (Skill=path), or one file with a Queue
+  column whose values are the skills
+- Skill matrix CSV: Group, Agents, then one column per skill holding the
+  group's efficiency on that skill (0 = not skilled), e.g.
+      Group,Agents,Sales,Support
+      Sales,6,1.0,0
+      Cross,3,0.85,0.85
+- Optional staffing CSV: Date, Time_Interval and one agent-count column per
+  group (default: the matrix's Agents in every interval)
+
+Without a skill matrix the forecast is one skill handled by one group
+staffed from its Required_Agents column, which checks the Erlang C plan in
+erlang_c_staffing_forecast.csv against abandonment and randomness.
+
+Usage:
+    python multiskill_simulation.py erlang_c_staffing_forecast.csv --replications 100
+    python multiskill_simulation.py Sales=sales.csv Support=support.csv --skill-matrix skill_matrix.csv
+"""
+
+import heapq
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from erlang_c import INTERVAL_SECONDS, SERVICE_LEVEL_THRESHOLD
+from interval_data import read_interval_data, format_dates
+
+SECONDS_PER_DAY = 86400
+DEFAULT_AHT = 270
+DEFAULT_PATIENCE = 120
+HANDLE_DISTRIBUTIONS = ('exponential', 'lognormal', 'fixed')
+REPLICATIONS_PER_TASK = 4
+Z_95 = 1.959964
+
+# Model shared with each worker process (set once by _init_worker)
+_MODEL = None
+
+
+# ============================================================================
+# INPUTS
+# ============================================================================
+
+def load_skill_forecasts(specs):
+    """
+    Read per-skill call forecasts into interval × skill arrays.
+
+    Args:
+        specs: forecast files as "Skill=path" or "path"; a file without a
+            skill name is split by its Queue column, or named after the file
+            ('All' when it is the only one)
+
+    Returns:
+        (intervals, skills, calls, aht, agents): intervals is a DataFrame of
+        Date, Interval_Index, Time_Interval; calls and aht are (intervals ×
+        skills) arrays (aht is NaN where the file has no AHT column); agents
+        is the Required_Agents total per interval, or None
+    """
+    frames = []
+    for spec in specs:
+        name, _, path = spec.rpartition('=')
+        data = read_interval_data(path)
+        calls_column = 'Forecasted_Calls' if 'Forecasted_Calls' in data.columns else 'Calls_Offered'
+        frame = pd.DataFrame({
+            'Date': data['Date'],
+            'Interval_Index': data['Interval_Index'],
+            'Time_Interval': data['Time_Interval'].astype(str),
+            'Calls': data[calls_column].astype(float),
+            'AHT': data['Average_Handle_Time_Seconds'].astype(float)
+            if 'Average_Handle_Time_Seconds' in data.columns else np.nan,
+            'Agents': data['Required_Agents'].astype(float) if 'Required_Agents' in data.columns else np.nan,
+        })
+        if name:
+            frame['Skill'] = name
+        elif 'Queue' in data.columns:
+            frame['Skill'] = data['Queue'].astype(str).to_numpy()
+        elif len(specs) == 1:
+            frame['Skill'] = 'All'
+        else:
+            frame['Skill'] = os.path.splitext(os.path.basename(path))[0]
+        frames.append(frame)
+
+    data = pd.concat(frames, ignore_index=True)
+    data['Calls_x_AHT'] = data['Calls'] * data['AHT']
+    grouped = data.groupby(['Date', 'Interval_Index', 'Skill'], sort=True)
+    # min_count=1 keeps files without AHT / Required_Agents columns as NaN rather than 0
+    totals = pd.DataFrame({
+        'Calls': grouped['Calls'].sum(),
+        'Calls_x_AHT': grouped['Calls_x_AHT'].sum(min_count=1),
+        'AHT': grouped['AHT'].mean(),
+        'Agents': grouped['Agents'].sum(min_count=1),
+    })
+    calls = totals['Calls'].unstack('Skill', fill_value=0.0)
+    skills = list(calls.columns)
+    # Call-weighted AHT where several rows (sites) share an interval and skill
+    weighted = (totals['Calls_x_AHT'] / totals['Calls']).where(totals['Calls'] > 0, totals['AHT'])
+    aht = weighted.unstack('Skill').reindex(index=calls.index, columns=skills)
+
+    intervals = calls.index.to_frame(index=False)
+    labels = data.drop_duplicates(['Date', 'Interval_Index']).set_index(['Date', 'Interval_Index'])
+    intervals['Time_Interval'] = labels['Time_Interval'].reindex(calls.index).to_numpy()
+
+    agents = None
+    if data['Agents'].notna().any():
+        agents = totals['Agents'].groupby(['Date', 'Interval_Index']).sum().reindex(calls.index).to_numpy()
+
+    return intervals, skills, calls.to_numpy(dtype=float), aht.to_numpy(dtype=float), agents
+
+
+def load_skill_matrix(path, skills):
+    """
+    Read a skill matrix CSV (Group, Agents, one efficiency column per skill).
+
+    Efficiencies may be fractions (0.85) or percentages (85 or "85%").
+
+    Returns:
+        (groups, agents, efficiency): efficiency is a (groups × skills) array
+    """
+    matrix = pd.read_csv(path)
+    missing = [skill for skill in skills if skill not in matrix.columns]
+    if missing:
+        raise ValueError(f"Skill matrix {path} has no column for: {', '.join(missing)}")
+
+    efficiency = matrix[skills].apply(lambda column: pd.to_numeric(
+        column.astype(str).str.rstrip('%'), errors='coerce')).fillna(0.0).to_numpy(dtype=float)
+    efficiency = np.where(efficiency > 1, efficiency / 100, efficiency)
+    return matrix['Group'].astype(str).tolist(), matrix['Agents'].to_numpy(dtype=int), efficiency
+
+
+def load_staffing(path, intervals, groups):
+    """Per-interval agent counts (intervals × groups) from a staffing CSV"""
+    staffing = read_interval_data(path)
+    staffing = staffing.set_index(['Date', 'Interval_Index'])[groups]
+    keys = pd.MultiIndex.from_frame(intervals[['Date', 'Interval_Index']])
+    staffing = staffing.reindex(keys)
+    if staffing.isna().any().any():
+        raise ValueError(f"Staffing file {path} does not cover every forecast interval")
+    return staffing.to_numpy(dtype=int)
+
+
+def build_model(intervals, skills, calls, aht, groups, efficiency, staffing,
+                patience=DEFAULT_PATIENCE, handle_distribution='exponential', handle_cv=1.0,
+                threshold=SERVICE_LEVEL_THRESHOLD, interval_seconds=INTERVAL_SECONDS):
+    """
+    Assemble the arrays the simulator runs on.
+
+    Args:
+        intervals: DataFrame with Date, Interval_Index (slot of the day) and
+            Time_Interval, in time order
+        skills, groups: names for the columns of calls and rows of efficiency
+        calls: expected calls per interval and skill (intervals × skills)
+        aht: mean handle time in seconds (intervals × skills, or per skill)
+        efficiency: (groups × skills) efficiency, 0 where a group lacks the skill
+        staffing: agents on duty (intervals × groups, or per group)
+        patience: mean patience in seconds before abandoning (exponential),
+            scalar or per skill
+        handle_distribution: 'exponential' (as Erlang C assumes), 'lognormal'
+            (coefficient of variation handle_cv) or 'fixed'
+        threshold: service level answer-time threshold in seconds
+    """
+    if handle_distribution not in HANDLE_DISTRIBUTIONS:
+        raise ValueError(f"handle_distribution must be one of {', '.join(HANDLE_DISTRIBUTIONS)}")
+    n_intervals, n_skills = len(intervals), len(skills)
+    calls = np.asarray(calls, dtype=float).reshape(n_intervals, n_skills)
+    aht = np.broadcast_to(np.asarray(aht, dtype=float), (n_intervals, n_skills))
+    aht = np.where(np.isnan(aht), DEFAULT_AHT, aht)
+    efficiency = np.asarray(efficiency, dtype=float).reshape(len(groups), n_skills)
+    staffing = np.broadcast_to(np.asarray(staffing, dtype=int), (n_intervals, len(groups)))
+    unserved = [skill for skill, served in zip(skills, (efficiency > 0).any(axis=0)) if not served]
+    if unserved:
+        raise ValueError(f"No agent group handles: {', '.join(unserved)}")
+
+    days = (pd.DatetimeIndex(intervals['Date']) - pd.Timestamp(intervals['Date'].min())).days
+    starts = (np.asarray(days, dtype=float) * SECONDS_PER_DAY
+              + intervals['Interval_Index'].to_numpy(dtype=float) * interval_seconds)
+    if np.any(np.diff(starts) <= 0):
+        raise ValueError("Intervals must be in time order without duplicates")
+
+    # Most efficient groups are offered a call first
+    routes = [[int(g) for g in np.argsort(-efficiency[:, s], kind='stable') if efficiency[g, s] > 0]
+              for s in range(n_skills)]
+    group_skills = [[int(s) for s in np.flatnonzero(efficiency[g] > 0)] for g in range(len(groups))]
+
+    return {
+        'intervals': intervals.reset_index(drop=True),
+        'skills': list(skills),
+        'groups': list(groups),
+        'calls': calls,
+        'aht': aht,
+        'efficiency': efficiency,
+        'staffing': staffing,
+        'starts': starts,
+        'interval_seconds': interval_seconds,
+        'patience': np.broadcast_to(np.asarray(patience, dtype=float), (n_skills,)).copy(),
+        'handle_distribution': handle_distribution,
+        'handle_cv': handle_cv,
+        'threshold': threshold,
+        'routes': routes,
+        'group_skills': group_skills,
+    }
+
+
+# ============================================================================
+# SIMULATION
+# ============================================================================
+
+def _handle_draws(rng, n, distribution, cv):
+    """Unit-mean handle time multipliers"""
+    if distribution == 'exponential':
+        return rng.exponential(1.0, n)
+    if distribution == 'lognormal':
+        sigma2 = np.log1p(cv * cv)
+        return rng.lognormal(-sigma2 / 2, np.sqrt(sigma2), n)
+    return np.ones(n)
+
+
+def _staffing_events(model):
+    """(time, agents per group) at each interval start, and zero at each gap"""
+    starts, staffing = model['starts'], model['staffing']
+    length = model['interval_seconds']
+    zero = [0] * staffing.shape[1]
+    events = []
+    for t, start in enumerate(starts.tolist()):
+        events.append((start, staffing[t].tolist()))
+        if t + 1 == len(starts) or starts[t + 1] > start + length:
+            events.append((start + length, zero))
+    return events
+
+
+def simulate(model, seed=0, replication=0):
+    """
+    Simulate one replication of the whole horizon.
+
+    Returns a dict of per-interval arrays: offered, answered, answered within
+    the threshold, abandoned and total wait (intervals × skills), and busy
+    agent-seconds (intervals × groups).
+    """
+    streams = np.random.SeedSequence([seed, replication]).spawn(3)
+    arrival_rng, handle_rng, patience_rng = (np.random.default_rng(s) for s in streams)
+    n_intervals, n_skills = model['calls'].shape
+    n_groups = len(model['groups'])
+
+    # ===== ARRIVALS, HANDLE TIMES AND PATIENCE FOR EVERY CALL =====
+    counts = arrival_rng.poisson(model['calls']).ravel()
+    cell = np.repeat(np.arange(n_intervals * n_skills), counts)
+    arrivals = model['starts'][cell // n_skills] + arrival_rng.random(len(cell)) * model['interval_seconds']
+    order = np.argsort(arrivals, kind='stable')
+    cell, arrivals = cell[order], arrivals[order]
+    skill = cell % n_skills
+    n = len(cell)
+    work = _handle_draws(handle_rng, n, model['handle_distribution'], model['handle_cv']) * model['aht'].ravel()[cell]
+    deadlines = arrivals + patience_rng.exponential(1.0, n) * model['patience'][skill]
+
+    arrival_l, skill_l, work_l, deadline_l = arrivals.tolist(), skill.tolist(), work.tolist(), deadlines.tolist()
+    inverse = np.where(model['efficiency'] > 0, 1 / np.maximum(model['efficiency'], 1e-12), 0).tolist()
+    routes, group_skills = model['routes'], model['group_skills']
+    boundaries = _staffing_events(model)
+
+    # ===== AGENT AND CALL STATE =====
+    idle = [0] * n_groups
+    on_duty = [0] * n_groups
+    leaving = [0] * n_groups
+    queues = [deque() for _ in range(n_skills)]
+    wait = [-1.0] * n
+    duration = [0.0] * n
+    served_by = [-1] * n
+    heap = []
+    push, pop = heapq.heappush, heapq.heappop
+
+    def take_next(g, now):
+        """A free agent of group g takes the longest-waiting call it can handle"""
+        best = -1
+        for s in group_skills[g]:
+            queue = queues[s]
+            while queue and deadline_l[queue[0]] <= now:
+                queue.popleft()  # abandoned while waiting
+            if queue and (best < 0 or queue[0] < best):
+                best, best_skill = queue[0], s
+        if best < 0:
+            idle[g] += 1
+            return
+        queues[best_skill].popleft()
+        d = work_l[best] * inverse[g][best_skill]
+        wait[best] = now - arrival_l[best]
+        duration[best] = d
+        served_by[best] = g
+        push(heap, (now + d, g))
+
+    # ===== EVENT LOOP =====
+    inf = float('inf')
+    i, b = 0, 0
+    next_arrival = arrival_l[0] if n else inf
+    next_boundary = boundaries[0][0]
+    while True:
+        next_done = heap[0][0] if heap else inf
+        if next_boundary <= next_arrival and next_boundary <= next_done:
+            if next_boundary == inf:
+                break
+            now, target = boundaries[b]
+            for g in range(n_groups):
+                change = target[g] - on_duty[g]
+                on_duty[g] = target[g]
+                if change > 0:
+                    returning = min(leaving[g], change)
+                    leaving[g] -= returning
+                    for _ in range(change - returning):
+                        take_next(g, now)
+                elif change < 0:
+                    off = min(idle[g], -change)
+                    idle[g] -= off
+                    leaving[g] += -change - off  # busy agents leave when their call ends
+            b += 1
+            next_boundary = boundaries[b][0] if b < len(boundaries) else inf
+        elif next_arrival <= next_done:
+            c, now = i, next_arrival
+            s = skill_l[c]
+            for g in routes[s]:
+                if idle[g]:
+                    idle[g] -= 1
+                    d = work_l[c] * inverse[g][s]
+                    wait[c] = 0.0
+                    duration[c] = d
+                    served_by[c] = g
+                    push(heap, (now + d, g))
+                    break
+            else:
+                queues[s].append(c)
+            i += 1
+            next_arrival = arrival_l[i] if i < n else inf
+        else:
+            now, g = pop(heap)
+            if leaving[g]:
+                leaving[g] -= 1
+            else:
+                take_next(g, now)
+
+    return _tally(model, cell, arrivals, np.array(wait), np.array(duration), np.array(served_by))
+
+
+def _tally(model, cell, arrivals, wait, duration, served_by):
+    """Per-interval counts and busy time from the per-call results"""
+    n_intervals, n_skills = model['calls'].shape
+    n_groups = len(model['groups'])
+    size = n_intervals * n_skills
+    answered = wait >= 0
+
+    offered = np.bincount(cell, minlength=size)
+    answered_count = np.bincount(cell, weights=answered, minlength=size)
+    within = np.bincount(cell, weights=answered & (wait <= model['threshold']), minlength=size)
+    wait_total = np.bincount(cell, weights=np.where(answered, wait, 0.0), minlength=size)
+
+    # Busy time split across the intervals each service overlaps
+    starts, length = model['starts'], model['interval_seconds']
+    begin = arrivals[answered] + wait[answered]
+    end = begin + duration[answered]
+    group = served_by[answered]
+    slot = np.searchsorted(starts, begin, side='right') - 1
+    busy = np.zeros(n_intervals * n_groups)
+    while len(slot):
+        interval_start = starts[slot]
+        overlap = np.minimum(end, interval_start + length) - np.maximum(begin, interval_start)
+        busy += np.bincount(slot * n_groups + group, weights=np.maximum(overlap, 0), minlength=busy.size)
+        more = (end > interval_start + length) & (slot + 1 < n_intervals)
+        slot, begin, end, group = slot[more] + 1, begin[more], end[more], group[more]
+
+    shape = (n_intervals, n_skills)
+    return {
+        'offered': offered.reshape(shape),
+        'answered': answered_count.reshape(shape),
+        'within': within.reshape(shape),
+        'abandoned': (offered - answered_count).reshape(shape),
+        'wait': wait_total.reshape(shape),
+        'busy': busy.reshape(n_intervals, n_groups),
+    }
+
+
+# ============================================================================
+# REPLICATIONS
+# ============================================================================
+
+def _init_worker(model):
+    global _MODEL
+    _MODEL = model
+
+
+def _run_block(replications, seed):
+    return [simulate(_MODEL, seed, replication) for replication in replications]
+
+
+def run_replications(model, replications=100, seed=0, workers=None):
+    """
+    Run independent replications on a process pool.
+
+    Replication r always uses the random streams of (seed, r), whichever
+    worker runs it, so results are reproducible and comparable across
+    staffing plans. Returns the per-replication results of simulate().
+    """
+    blocks = [range(start, min(start + REPLICATIONS_PER_TASK, replications))
+              for start in range(0, replications, REPLICATIONS_PER_TASK)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model,)) as pool:
+        results = [result for block in pool.map(_run_block, blocks, [seed] * len(blocks)) for result in block]
+    return results
+
+
+def summarize(model, results):
+    """
+    Combine replications into per-interval tables.
+
+    Returns:
+        (skill_df, group_df): skill_df has one row per interval and skill with
+        mean calls offered/answered/abandoned, Service_Level_% (answered within
+        the threshold ÷ offered) with its 95% half-width across replications,
+        ASA_Seconds and Abandonment_Rate_%; group_df has the agents and
+        Occupancy_% of each agent group per interval
+    """
+    stacked = {key: np.stack([result[key] for result in results]) for key in results[0]}
+    replications = len(results)
+    offered = stacked['offered'].sum(axis=0)
+    answered = stacked['answered'].sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        per_replication = stacked['within'] / stacked['offered']
+        observed = (stacked['offered'] > 0).sum(axis=0)
+        mean_sl = np.nansum(per_replication, axis=0) / observed
+        spread = np.sqrt(np.nansum((per_replication - mean_sl) ** 2, axis=0) / np.maximum(observed - 1, 1))
+        half_width = Z_95 * spread / np.sqrt(observed)
+        asa = stacked['wait'].sum(axis=0) / answered
+        abandon_rate = stacked['abandoned'].sum(axis=0) / offered
+
+    intervals = model['intervals']
+    n_intervals, n_skills = offered.shape
+    skill_df = pd.DataFrame({
+        'Date': np.repeat(intervals['Date'].to_numpy(), n_skills),
+        'Time_Interval': np.repeat(intervals['Time_Interval'].to_numpy(), n_skills),
+        'Skill': model['skills'] * n_intervals,
+        'Calls_Offered': (offered / replications).ravel().round(2),
+        'Calls_Answered': (answered / replications).ravel().round(2),
+        'Calls_Abandoned': (stacked['abandoned'].sum(axis=0) / replications).ravel().round(2),
+        'Service_Level_%': (mean_sl * 100).ravel().round(1),
+        'Service_Level_CI_95%': (half_width * 100).ravel().round(1),
+        'ASA_Seconds': asa.ravel().round(1),
+        'Abandonment_Rate_%': (abandon_rate * 100).ravel().round(1),
+    })
+
+    n_groups = len(model['groups'])
+    staffed = model['staffing'] * float(model['interval_seconds'])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        occupancy = stacked['busy'].mean(axis=0) / staffed
+    group_df = pd.DataFrame({
+        'Date': np.repeat(intervals['Date'].to_numpy(), n_groups),
+        'Time_Interval': np.repeat(intervals['Time_Interval'].to_numpy(), n_groups),
+        'Group': model['groups'] * n_intervals,
+        'Agents': model['staffing'].ravel(),
+        'Occupancy_%': (occupancy * 100).ravel().round(1),
+    })
+    return skill_df, group_df
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Multi-skill call center simulation with parallel replications')
+    parser.add_argument('forecasts', nargs='+',
+                        help='forecast files as Skill=path or path (a Queue column splits skills)')
+    parser.add_argument('--skill-matrix', help='CSV of Group, Agents and one efficiency column per skill')
+    parser.add_argument('--staffing', help='CSV of Date, Time_Interval and agents per group (default: matrix Agents)')
+    parser.add_argument('--aht', type=float, help=f'handle time in seconds where the forecast has none '
+                                                  f'(default: {DEFAULT_AHT})')
+    parser.add_argument('--handle-distribution', choices=HANDLE_DISTRIBUTIONS, default='exponential')
+    parser.add_argument('--handle-cv', type=float, default=1.0, help='lognormal coefficient of variation (default: 1.0)')
+    parser.add_argument('--patience', type=float, default=DEFAULT_PATIENCE,
+                        help='mean patience in seconds before abandoning (default: %(default)s)')
+    parser.add_argument('--threshold', type=float, default=SERVICE_LEVEL_THRESHOLD,
+                        help='service level threshold in seconds (default: %(default)s)')
+    parser.add_argument('--replications', type=int, default=100, help='replications (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed; equal seeds give common random numbers')
+    parser.add_argument('--workers', type=int, help='worker processes (default: all cores)')
+    parser.add_argument('--output', default='simulation_results.csv', help='per-skill results CSV (default: %(default)s)')
+    parser.add_argument('--occupancy-output', default='simulation_occupancy.csv',
+                        help='per-group occupancy CSV (default: %(default)s)')
+    args = parser.parse_args()
+
+    intervals, skills, calls, aht, required = load_skill_forecasts(args.forecasts)
+    if args.aht is not None:
+        aht = np.where(np.isnan(aht), args.aht, aht)
+    if args.skill_matrix:
+        groups, agents, efficiency = load_skill_matrix(args.skill_matrix, skills)
+        staffing = load_staffing(args.staffing, intervals, groups) if args.staffing else agents
+    elif required is not None:
+        groups, efficiency, staffing = ['All'], np.ones((1, len(skills))), required.astype(int)[:, None]
+    else:
+        parser.error('give --skill-matrix, or a forecast with a Required_Agents column')
+
+    model = build_model(intervals, skills, calls, aht, groups, efficiency, staffing,
+                        patience=args.patience, handle_distribution=args.handle_distribution,
+                        handle_cv=args.handle_cv, threshold=args.threshold)
+    started = time.perf_counter()
+    results = run_replications(model, args.replications, args.seed, args.workers)
+    elapsed = time.perf_counter() - started
+    skill_df, group_df = summarize(model, results)
+
+    for frame, path in ((skill_df, args.output), (group_df, args.occupancy_output)):
+        frame['Date'] = format_dates(frame['Date'])
+        frame.to_csv(path, index=False)
+
+    workers = args.workers or os.cpu_count()
+    simulated = sum(result['offered'].sum() for result in results)
+    print(f"✓ Simulated {args.replications} replications × {len(intervals)} intervals "
+          f"({simulated:,.0f} calls) in {elapsed:.1f}s on {workers} workers "
+          f"({simulated / elapsed / workers:,.0f} calls/s per core)")
+    for skill in skills:
+        rows = skill_df[skill_df['Skill'] == skill]
+        offered = rows['Calls_Offered'].sum()
+        print(f"  {skill}: SL {(rows['Service_Level_%'] * rows['Calls_Offered']).sum() / offered:.1f}%, "
+              f"ASA {(rows['ASA_Seconds'] * rows['Calls_Answered']).sum() / rows['Calls_Answered'].sum():.0f}s, "
+              f"abandoned {rows['Calls_Abandoned'].sum() / offered * 100:.1f}%")
+    print(f"✓ Saved per-skill results to {args.output} and occupancy to {args.occupancy_output}")
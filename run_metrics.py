@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Run Metrics - Stage Timings, Throughput and Memory for the Pipeline Scripts
+
+The generators print ✓ lines as they go, which says what finished but not
+where a slow nightly run spent its time. Each stage of a script is wrapped
+in stage(), which records wall time, rows processed, throughput and the
+process's peak memory (RSS) at the end of the stage:
+
+    with RunMetrics('create_service_level_calculator', 'service_level.metrics.json'):
+        with stage('read_forecast') as span:
+            forecast_df = pd.read_csv('erlang_c_staffing_forecast.csv')
+            span.rows = len(forecast_df)
+
+Stages that run repeatedly (once per chunk or block) are summed under one
+name, and nested stages are recorded under their parent's name. Outside a
+RunMetrics block stage() only times and discards, so the functions stay
+usable from other code without writing anything.
+
+At the end of the run (also when it fails) a JSON file lists the script,
+arguments, total time, peak RSS and every stage, ready for dashboards or
+comparison between nightly runs.
+
+Profiling (optional):
+    profile='cprofile'  writes a cProfile dump next to the metrics file
+                        (python -m pstats <file>, or snakeviz)
+    profile='sample'    samples the Python stack every SAMPLE_INTERVAL of CPU
+                        time (Unix, main thread) and adds the hottest
+                        functions to the metrics; far lower overhead than
+                        cProfile, so stage timings stay realistic
+"""
+
+import cProfile
+import json
+import os
+import platform
+import resource
+import signal
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 25
+PROFILE_MODES = ('cprofile', 'sample')
+
+_active = None
+_open_spans = []
+
+
+def peak_rss_mb():
+    """
+    Peak resident memory of this process in MB.
+
+    Reads VmHWM from /proc/self/status where it exists. It belongs to the
+    current process image and can be restarted with reset_peak_rss().
+    ru_maxrss, the fallback elsewhere, survives fork + exec, so a child
+    spawned by a large parent reports the parent's peak.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def reset_peak_rss():
+    """Restart peak_rss_mb() from the current RSS (Linux only); returns whether it was reset"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class Span:
+    """
+    A running stage, started by stage().
+
+    Use it as a context manager, or call stop() for stages that do not fit
+    a with block. Set `rows` to the number of rows processed (or pass it to
+    stop()). Stages started inside another stage are recorded under its
+    name ("build_sheet/erlang_c"), and the outer stage's own_seconds
+    excludes them.
+    """
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.child_seconds = 0.0
+        self.parent = _open_spans[-1] if _open_spans else None
+        self.path = f"{self.parent.path}/{name}" if self.parent else name
+        self.started = time.perf_counter()
+        self.stopped = False
+        _open_spans.append(self)
+
+    def stop(self, rows=None):
+        if self.stopped:
+            return
+        self.stopped = True
+        seconds = time.perf_counter() - self.started
+        if rows is not None:
+            self.rows = rows
+        if self in _open_spans:
+            _open_spans.remove(self)
+        if self.parent is not None:
+            self.parent.child_seconds += seconds
+        if _active is not None:
+            _active.record(self.path, seconds, seconds - self.child_seconds, self.rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def stage(name, rows=None):
+    """Start timing a pipeline stage; it is recorded in the active RunMetrics, if any"""
+    return Span(name, rows)
+
+
+class StackSampler:
+    """Statistical profiler: counts the Python functions on the stack at each CPU-time tick"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self.own = Counter()
+        self.total = Counter()
+
+    def _sample(self, signum, frame):
+        self.samples += 1
+        seen = set()
+        innermost = True
+        while frame is not None:
+            code = frame.f_code
+            key = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            if innermost:
+                self.own[key] += 1
+                innermost = False
+            if key not in seen:
+                self.total[key] += 1
+                seen.add(key)
+            frame = frame.f_back
+
+    def start(self):
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    def summary(self, top=TOP_FUNCTIONS):
+        samples = max(self.samples, 1)
+        return {
+            'type': 'sample',
+            'interval_ms': self.interval * 1000,
+            'samples': self.samples,
+            'top_functions': [
+                {'function': key, 'own_share': round(self.own[key] / samples, 4),
+                 'total_share': round(count / samples, 4)}
+                for key, count in self.total.most_common(top)
+            ],
+            'top_own': [
+                {'function': key, 'own_share': round(count / samples, 4)}
+                for key, count in self.own.most_common(top)
+            ],
+        }
+
+
+class RunMetrics:
+    """
+    Collect stage metrics for one script run and write them as JSON on exit.
+
+    Args:
+        script: name recorded in the metrics (e.g. the script's module name)
+        metrics_file: JSON output path (None: collect without writing)
+        profile: None, 'cprofile' or 'sample' (see module docstring)
+    """
+
+    def __init__(self, script, metrics_file=None, profile=None):
+        if profile not in (None, *PROFILE_MODES):
+            raise ValueError(f"profile must be one of {PROFILE_MODES}, got {profile!r}")
+        self.script = script
+        self.metrics_file = metrics_file
+        self.profile = profile
+        self.stages = {}
+        self.profiler = None
+
+    def record(self, name, seconds, own_seconds, rows=None):
+        entry = self.stages.setdefault(name, {'name': name, 'calls': 0, 'seconds': 0.0, 'own_seconds': 0.0,
+                                              'rows': None})
+        entry['calls'] += 1
+        entry['seconds'] += seconds
+        entry['own_seconds'] += own_seconds
+        if rows is not None:
+            entry['rows'] = (entry['rows'] or 0) + int(rows)
+        entry['peak_rss_mb'] = round(peak_rss_mb(), 1)
+
+    def profile_file(self):
+        return f"{os.path.splitext(self.metrics_file or self.script)[0]}.prof"
+
+    def __enter__(self):
+        global _active
+        self.previous, _active = _active, self
+        _open_spans.clear()
+        self.created = datetime.now().isoformat(timespec='seconds')
+        self.started = time.perf_counter()
+        if self.profile == 'cprofile':
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        elif self.profile == 'sample':
+            self.profiler = StackSampler()
+            self.profiler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active
+        seconds = time.perf_counter() - self.started
+        if self.profile == 'cprofile':
+            self.profiler.disable()
+        elif self.profile == 'sample':
+            self.profiler.stop()
+        _active = self.previous
+
+        self.result = self.summary(seconds, exc)
+        if self.metrics_file:
+            with open(self.metrics_file, 'w') as f:
+                json.dump(self.result, f, indent=2)
+            print(f"✓ Saved run metrics to {self.metrics_file}")
+        return False
+
+    def summary(self, seconds, error=None):
+        stages = []
+        for entry in self.stages.values():
+            entry = dict(entry, seconds=round(entry['seconds'], 4), own_seconds=round(entry['own_seconds'], 4))
+            entry['rows_per_second'] = (round(entry['rows'] / entry['seconds'], 1)
+                                        if entry['rows'] and entry['seconds'] else None)
+            stages.append(entry)
+        result = {
+            'script': self.script,
+            'argv': sys.argv[1:],
+            'created': self.created,
+            'status': 'error' if error else 'ok',
+            'seconds': round(seconds, 4),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'python': platform.python_version(),
+            'stages': stages,
+        }
+        if error:
+            result['error'] = f"{type(error).__name__}: {error}"
+        if self.profile == 'cprofile':
+            self.profiler.dump_stats(self.profile_file())
+            result['profile'] = {'type': 'cprofile', 'file': self.profile_file()}
+        elif self.profile == 'sample':
+            result['profile'] = self.profiler.summary()
+        return result
+
+
+def add_arguments(parser, script):
+    """Add the shared --metrics / --profile options to a script's argument parser"""
+    parser.add_argument('--metrics', default=f'{script}.metrics.json',
+                        help='run metrics JSON: stage timings, rows, peak memory (default: %(default)s; '
+                             '"" to disable)')
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help='also profile the run: cProfile dump or low-overhead stack sampling')
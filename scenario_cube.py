@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Scenario Cube - Vectorized What-If Analysis for the Service Level Calculator
+
+The Schedule_Service_Level sheet answers one question at a time: type a
+shrinkage into E4, read the service levels at the fixed 90-second threshold,
+retype. This module sweeps whole ranges of
+
+- shrinkage (net agents = ROUND(scheduled × (1 - shrinkage), 1), as in E4)
+- AHT deltas in seconds, added to every interval's forecast AHT
+- volume multipliers applied to Calls_Offered
+- service level thresholds in seconds (the T in 80/T)
+
+and evaluates SL, ASA, occupancy and staffing gap for every interval ×
+scenario combination in one broadcast computation.
+
+Each input lives on its own axis of a 5-D array
+(interval, shrinkage, aht_delta, volume, threshold), and every quantity is
+computed at the smallest shape it depends on:
+- traffic depends on (interval, aht_delta, volume)
+- P(W>0), ASA and occupancy add shrinkage, but not the threshold
+- only SL and the required agents (hence the gap) depend on the threshold
+so 10,000 scenarios over a week of intervals is a few million SL cells and
+a fraction of that in Erlang C lookups, which come from the shared
+precomputed table (erlang_tables.py). Required agents are solved exactly
+(erlang_c.required_agents) once per interval × AHT delta × volume ×
+threshold.
+
+The result is a ScenarioCube: select slices with cube.sel(shrinkage=0.3),
+read full-shape metric arrays with cube['service_level'], or summarize
+every scenario into one DataFrame row with cube.scenarios().
+
+Usage:
+    python scenario_cube.py erlang_c_staffing_forecast.csv \\
+        --shrinkage 0.20:0.40:0.01 --aht-delta=-30:30:5 --volume 0.8:1.2:0.05 --threshold 20 60 90
+"""
+
+import numpy as np
+import pandas as pd
+
+from erlang_c import (INTERVAL_SECONDS, SERVICE_LEVEL_TARGET, SERVICE_LEVEL_THRESHOLD,
+                      average_speed_of_answer, occupancy, required_agents, service_level,
+                      traffic_intensity)
+from erlang_tables import load_table
+from xlsx_cache import excel_round
+
+AXES = ('interval', 'shrinkage', 'aht_delta', 'volume', 'threshold')
+METRICS = ('service_level', 'asa', 'occupancy', 'staffing_gap')
+
+# Defaults of the Schedule_Service_Level sheet (E4 and the 80/90 threshold)
+DEFAULT_SHRINKAGE = 0.25
+
+
+def _on_axis(values, axis):
+    """Reshape a 1-D array so it broadcasts along `axis` of the 5-D cube"""
+    shape = [1] * len(AXES)
+    shape[AXES.index(axis)] = -1
+    return np.asarray(values, dtype=float).reshape(shape)
+
+
+def _axis_values(values, name):
+    values = np.atleast_1d(np.asarray(values, dtype=float))
+    if values.ndim != 1 or values.size == 0:
+        raise ValueError(f"{name} must be a non-empty list of values")
+    return values
+
+
+class ScenarioCube:
+    """
+    Metrics for every interval × scenario combination.
+
+    Arrays are stored at their broadcast shape (size 1 along axes they do not
+    depend on) and expanded to the full cube shape on access without copying.
+
+    Attributes:
+        intervals: DataFrame with Date and Time_Interval per interval
+        coords: dict of axis name → 1-D array of values (see AXES)
+        target_sl: service level target used for required agents and the
+            below-target counts
+    """
+
+    def __init__(self, intervals, coords, arrays, target_sl=SERVICE_LEVEL_TARGET):
+        self.intervals = intervals
+        self.coords = coords
+        self.arrays = arrays
+        self.target_sl = target_sl
+
+    @property
+    def shape(self):
+        return tuple(len(self.coords[axis]) for axis in AXES)
+
+    @property
+    def scenario_count(self):
+        return int(np.prod(self.shape[1:]))
+
+    def __getitem__(self, metric):
+        """Full-shape (read-only) array of one metric, or of 'traffic', 'net_agents', 'required_agents'"""
+        if metric == 'staffing_gap':
+            values = self.arrays['net_agents'] - self.arrays['required_agents']
+        elif metric in self.arrays:
+            values = self.arrays[metric]
+        else:
+            raise KeyError(f"Unknown metric {metric!r}; expected one of {METRICS}")
+        return np.broadcast_to(values, self.shape)
+
+    def sel(self, **selection):
+        """
+        Sub-cube for the given axis values, e.g. sel(shrinkage=0.3, threshold=[60, 90]).
+
+        Scalars and lists both keep the axis (with one or more entries), so
+        results keep the same 5-D layout. Values are matched to the axis
+        within floating point tolerance; unknown values raise KeyError.
+        """
+        positions = {}
+        for axis, wanted in selection.items():
+            if axis not in AXES:
+                raise KeyError(f"Unknown axis {axis!r}; expected one of {AXES}")
+            values = self.coords[axis]
+            index = []
+            for value in np.atleast_1d(wanted):
+                match = np.flatnonzero(np.isclose(values, value)) if axis != 'interval' else [value]
+                if not len(match):
+                    raise KeyError(f"{value!r} is not on the {axis} axis")
+                index.append(int(match[0]))
+            positions[axis] = np.array(index)
+
+        def take(array):
+            for axis, index in positions.items():
+                dim = AXES.index(axis)
+                if array.shape[dim] > 1:
+                    array = array.take(index, axis=dim)
+            return array
+
+        coords = {axis: values[positions[axis]] if axis in positions else values
+                  for axis, values in self.coords.items()}
+        intervals = self.intervals
+        if 'interval' in positions:
+            intervals = intervals.iloc[positions['interval']].reset_index(drop=True)
+            coords['interval'] = np.arange(len(intervals))
+        arrays = {name: take(array) for name, array in self.arrays.items()}
+        return ScenarioCube(intervals, coords, arrays, self.target_sl)
+
+    def scenarios(self):
+        """
+        One row per scenario, aggregated over the intervals as the sheet's
+        summary dashboard does (plain averages, ASA over stable intervals).
+
+        Reductions run at each array's broadcast shape, so the full
+        interval × scenario cube is only formed for service level.
+        """
+        sl = self['service_level']
+        asa = self.arrays['asa']
+        stable = np.isfinite(asa)
+        asa_sum = np.where(stable, asa, 0.0).sum(axis=0)
+        asa_count = stable.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average_asa = np.where(asa_count > 0, asa_sum / asa_count, np.nan)
+        total_gap = self.arrays['net_agents'].sum(axis=0) - self.arrays['required_agents'].sum(axis=0)
+        scenario_shape = self.shape[1:]
+
+        columns = {
+            'Average_Service_Level': sl.mean(axis=0),
+            'Min_Service_Level': sl.min(axis=0),
+            'Intervals_Below_Target': (sl < self.target_sl).sum(axis=0),
+            'Average_ASA_Seconds': average_asa,
+            'Unstable_Intervals': (~stable).sum(axis=0),
+            'Average_Occupancy': self.arrays['occupancy'].mean(axis=0),
+            'Total_Staffing_Gap': total_gap,
+            'Required_Agent_Intervals': self.arrays['required_agents'].sum(axis=0),
+        }
+        index = pd.MultiIndex.from_product([self.coords[axis] for axis in AXES[1:]], names=AXES[1:])
+        return pd.DataFrame({name: np.broadcast_to(values, scenario_shape).ravel()
+                             for name, values in columns.items()}, index=index)
+
+    def to_frame(self, metrics=METRICS):
+        """
+        Long format: one row per interval × scenario (shape product rows).
+
+        Meant for small slices (e.g. cube.sel(shrinkage=0.3).to_frame());
+        use scenarios() to compare many scenarios.
+        """
+        index = pd.MultiIndex.from_product(
+            [np.arange(self.shape[0])] + [self.coords[axis] for axis in AXES[1:]], names=AXES)
+        frame = pd.DataFrame({metric: self[metric].ravel() for metric in metrics}, index=index)
+        frame = frame.reset_index()
+        frame.insert(1, 'Date', self.intervals['Date'].to_numpy()[frame['interval']])
+        frame.insert(2, 'Time_Interval', self.intervals['Time_Interval'].astype(str).to_numpy()[frame['interval']])
+        return frame
+
+
+def build_scenario_cube(forecast_df, shrinkage=(DEFAULT_SHRINKAGE,), aht_delta=(0,), volume=(1.0,),
+                        threshold=(SERVICE_LEVEL_THRESHOLD,), target_sl=SERVICE_LEVEL_TARGET,
+                        scheduled=None, table=None, interval_seconds=INTERVAL_SECONDS):
+    """
+    Evaluate every combination of the scenario inputs for every interval.
+
+    Args:
+        forecast_df: intervals with Date, Time_Interval, Calls_Offered,
+            Average_Handle_Time_Seconds and (unless `scheduled` is given)
+            Required_Agents, used as scheduled agents like the worksheet's
+            column D
+        shrinkage: shrinkage fractions in [0, 1)
+        aht_delta: seconds added to every interval's AHT
+        volume: multipliers for Calls_Offered
+        threshold: service level answer-time thresholds in seconds
+        target_sl: target for required agents and below-target counts
+        scheduled: optional scheduled agents per interval
+        table: ErlangTable to use (default: the shared load_table())
+        interval_seconds: interval length in seconds
+
+    Returns:
+        ScenarioCube
+    """
+    coords = {
+        'interval': np.arange(len(forecast_df)),
+        'shrinkage': _axis_values(shrinkage, 'shrinkage'),
+        'aht_delta': _axis_values(aht_delta, 'aht_delta'),
+        'volume': _axis_values(volume, 'volume'),
+        'threshold': _axis_values(threshold, 'threshold'),
+    }
+    if np.any((coords['shrinkage'] < 0) | (coords['shrinkage'] >= 1)):
+        raise ValueError("shrinkage must be in [0, 1)")
+    if np.any(coords['volume'] < 0):
+        raise ValueError("volume multipliers must not be negative")
+    if np.any(coords['threshold'] < 0):
+        raise ValueError("thresholds must not be negative")
+
+    table = table or load_table()
+    calls = forecast_df['Calls_Offered'].to_numpy(dtype=float)
+    base_aht = forecast_df['Average_Handle_Time_Seconds'].to_numpy(dtype=float)
+    if scheduled is None:
+        scheduled = forecast_df['Required_Agents'].to_numpy(dtype=float)
+    scheduled = np.asarray(scheduled, dtype=float)
+
+    # ===== INPUTS, EACH ON ITS OWN AXIS =====
+    calls = _on_axis(calls, 'interval') * _on_axis(coords['volume'], 'volume')
+    aht = _on_axis(base_aht, 'interval') + _on_axis(coords['aht_delta'], 'aht_delta')
+    if np.any(aht <= 0):
+        raise ValueError("aht_delta leaves a non-positive AHT in some interval")
+    net_agents = excel_round(_on_axis(scheduled, 'interval') * (1 - _on_axis(coords['shrinkage'], 'shrinkage')), 1)
+    thresholds = _on_axis(coords['threshold'], 'threshold')
+
+    # ===== ERLANG C: (interval, shrinkage, aht_delta, volume) =====
+    traffic = traffic_intensity(calls, aht, interval_seconds)
+    prob_wait = table.erlang_c(traffic, net_agents)
+
+    # ===== REQUIRED AGENTS: (interval, aht_delta, volume) per threshold =====
+    calls_grid, aht_grid = np.broadcast_arrays(calls, aht)
+    required = np.stack([
+        required_agents(calls_grid[..., 0], aht_grid[..., 0], target_sl=target_sl,
+                        threshold=value, interval_seconds=interval_seconds)
+        for value in coords['threshold']
+    ], axis=-1)
+
+    arrays = {
+        'traffic': traffic,
+        'net_agents': net_agents,
+        'prob_wait': prob_wait,
+        'service_level': service_level(traffic, net_agents, aht, thresholds, prob_wait),
+        'asa': average_speed_of_answer(traffic, net_agents, aht, prob_wait),
+        'occupancy': occupancy(traffic, net_agents),
+        'required_agents': required,
+    }
+    intervals = forecast_df[['Date', 'Time_Interval']].reset_index(drop=True)
+    return ScenarioCube(intervals, coords, arrays, target_sl)
+
+
+def parse_values(tokens):
+    """
+    Axis values from command-line tokens: plain numbers and/or inclusive
+    start:stop:step ranges ("0.20:0.40:0.05" → 0.20, 0.25, ..., 0.40).
+    """
+    values = []
+    for token in tokens:
+        if ':' not in token:
+            values.append(float(token))
+            continue
+        start, stop, step = (float(part) for part in token.split(':'))
+        if step <= 0:
+            raise ValueError(f"Range step must be positive: {token}")
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        values.extend(np.round(start + step * np.arange(count), 10))
+    return np.array(values)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from interval_data import read_interval_data, format_dates
+
+    parser = argparse.ArgumentParser(description='Sweep shrinkage, AHT, volume and SL threshold scenarios')
+    parser.add_argument('forecast', nargs='?', default='erlang_c_staffing_forecast.csv',
+                        help='intervals with Calls_Offered, AHT and Required_Agents (default: %(default)s)')
+    parser.add_argument('--shrinkage', nargs='+', default=[str(DEFAULT_SHRINKAGE)],
+                        help='shrinkage fractions or start:stop:step ranges (default: %(default)s)')
+    parser.add_argument('--aht-delta', nargs='+', default=['0'],
+                        help="AHT changes in seconds or ranges; write negative ranges as --aht-delta=-30:30:5 (default: 0)")
+    parser.add_argument('--volume', nargs='+', default=['1'],
+                        help='call volume multipliers or ranges, e.g. 0.8:1.2:0.05 (default: 1)')
+    parser.add_argument('--threshold', nargs='+', default=[str(SERVICE_LEVEL_THRESHOLD)],
+                        help='SL thresholds in seconds (default: %(default)s)')
+    parser.add_argument('--target-sl', type=float, default=SERVICE_LEVEL_TARGET,
+                        help='service level target as a fraction (default: %(default)s)')
+    parser.add_argument('--days', type=int, help='only the first N days of the forecast (default: all)')
+    parser.add_argument('--output', default='scenario_summary.csv',
+                        help='one row per scenario (default: %(default)s)')
+    parser.add_argument('--intervals-output',
+                        help='optional long CSV with one row per interval × scenario (can be large)')
+    args = parser.parse_args()
+
+    forecast = read_interval_data(args.forecast)
+    if args.days:
+        forecast = forecast[forecast['Date'].isin(forecast['Date'].drop_duplicates().iloc[:args.days])]
+    forecast = forecast.assign(Date=format_dates(forecast['Date']))
+
+    started = time.perf_counter()
+    cube = build_scenario_cube(forecast, parse_values(args.shrinkage), parse_values(args.aht_delta),
+                               parse_values(args.volume), parse_values(args.threshold), args.target_sl)
+    summary = cube.scenarios()
+    elapsed = time.perf_counter() - started
+
+    summary.round(4).to_csv(args.output)
+    if args.intervals_output:
+        cube.to_frame().round(4).to_csv(args.intervals_output, index=False)
+
+    print(f"✓ Evaluated {cube.scenario_count:,} scenarios × {cube.shape[0]} intervals "
+          f"({cube.scenario_count * cube.shape[0]:,} cells) in {elapsed:.2f}s")
+    best = summary['Average_Service_Level'].idxmax()
+    worst = summary['Average_Service_Level'].idxmin()
+    for label, key in (('Best', best), ('Worst', worst)):
+        scenario = ', '.join(f"{axis}={value:g}" for axis, value in zip(AXES[1:], key))
+        print(f"✓ {label}: {scenario} → average SL {summary.loc[key, 'Average_Service_Level']:.1%}, "
+              f"{summary.loc[key, 'Intervals_Below_Target']} intervals below target")
+    print(f"✓ Saved {args.output}" + (f" and {args.intervals_output}" if args.intervals_output else ''))
@@ -0,0 +1,30 @@
+"""Checks that benchmark cases report their own peak memory (benchmark.py, run_metrics.py)"""
+
+import numpy as np
+import pytest
+
+from benchmark import in_fresh_process, measure, prepare_inputs
+from run_metrics import peak_rss_mb
+
+# Held by the test process while the cases run; no case should report it
+PARENT_ALLOCATION_MB = 400
+
+
+@pytest.fixture(scope='module')
+def workdir(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp('benchmark'))
+    in_fresh_process(prepare_inputs, directory, [1])
+    return directory
+
+
+def test_cases_do_not_report_the_parent_peak(workdir):
+    ballast = np.ones(PARENT_ALLOCATION_MB * 1024 * 1024 // 8)
+    parent_peak = peak_rss_mb()
+
+    small = measure('erlang_c_metrics', workdir, 1, repeat=1)['peak_rss_mb']
+    large = measure('create_forecast_template', workdir, 1, repeat=1)['peak_rss_mb']
+
+    assert ballast.sum() > 0
+    assert max(small, large) < parent_peak - PARENT_ALLOCATION_MB / 2
+    # Different workloads report different peaks
+    assert large > small
@@ -0,0 +1,115 @@
+"""Checks the Erlang A engine (erlang_a.py) against an exact birth-death solve"""
+
+import numpy as np
+import pytest
+
+from erlang_a import erlang_a_metrics, required_agents
+from erlang_c import erlang_c_metrics, traffic_intensity
+
+INTERVAL_SECONDS = 900
+# calls, aht, agents, patience, threshold: staffed, tight and understaffed intervals
+CASES = [
+    (40, 270, 14, 120, 90),
+    (60, 300, 20, 60, 20),
+    (100, 270, 25, 180, 90),
+    (150, 240, 30, 45, 60),
+    (5, 270, 2, 300, 90),
+]
+QUEUE_STATES = 400
+UNIFORMIZATION_TERMS = 2000
+
+
+def birth_death_metrics(calls, aht, agents, patience, threshold):
+    """
+    M/M/N+M by brute force: the stationary distribution of the queue, then
+    the fate of a tagged arrival as a continuous-time Markov chain.
+    """
+    arrival = calls / INTERVAL_SECONDS
+    service = 1 / aht
+    abandon = 1 / patience
+
+    # ===== STATIONARY DISTRIBUTION (n calls in the system) =====
+    n = np.arange(agents + QUEUE_STATES + 1)
+    departures = np.minimum(n, agents) * service + np.maximum(n - agents, 0) * abandon
+    log_p = np.concatenate([[0.0], np.cumsum(np.log(arrival) - np.log(departures[1:]))])
+    p = np.exp(log_p - log_p.max())
+    p /= p.sum()
+    ahead = p[agents:]                  # arrival finds all agents busy and k callers waiting
+    prob_wait = ahead.sum()
+
+    # ===== TAGGED CALLER: j callers ahead, absorbed when served or abandoned =====
+    states = len(ahead)
+    j = np.arange(states)
+    forward = agents * service + j * abandon       # someone ahead leaves (j -> j-1, 0 -> served)
+    generator = np.diag(-(forward + abandon))
+    generator[j[1:], j[1:] - 1] = forward[1:]
+    to_served = np.where(j == 0, agents * service, 0.0)
+
+    fundamental = np.linalg.inv(-generator)
+    served = fundamental @ to_served                # P(answered) from each state
+    time_to_served = fundamental @ served           # E[wait × 1{answered}] from each state
+
+    # P(answered within the threshold) by uniformization
+    rate = (forward + abandon).max()
+    step = np.eye(states) + generator / rate
+    absorbed = to_served / rate
+    distribution = ahead.copy()
+    weight = np.exp(-rate * threshold)
+    answered_within = 0.0
+    cumulative = weight
+    for term in range(1, UNIFORMIZATION_TERMS):
+        answered_within += (1 - cumulative) * (distribution @ absorbed)
+        distribution = distribution @ step
+        weight *= rate * threshold / term
+        cumulative += weight
+        if 1 - cumulative < 1e-16:
+            break
+
+    answered_after_wait = ahead @ served
+    return {
+        'prob_wait': prob_wait,
+        'abandonment': prob_wait - answered_after_wait,
+        'service_level': 1 - prob_wait + answered_within,
+        'asa': (ahead @ time_to_served) / (1 - prob_wait + answered_after_wait),
+    }
+
+
+@pytest.mark.parametrize('calls, aht, agents, patience, threshold', CASES)
+def test_matches_birth_death_solve(calls, aht, agents, patience, threshold):
+    engine = erlang_a_metrics(calls, aht, agents, patience, threshold=threshold)
+    exact = birth_death_metrics(calls, aht, agents, patience, threshold)
+    for key, value in exact.items():
+        assert float(engine[key]) == pytest.approx(value, rel=1e-8, abs=1e-10), key
+
+
+def test_abandonment_matches_queue_length():
+    # Abandonment rate = θ × E[queue length] / λ, independently of the tagged-caller chain
+    calls, aht, agents, patience = 100, 270, 25, 180
+    arrival, service, abandon = calls / INTERVAL_SECONDS, 1 / aht, 1 / patience
+    n = np.arange(agents + QUEUE_STATES + 1)
+    departures = np.minimum(n, agents) * service + np.maximum(n - agents, 0) * abandon
+    log_p = np.concatenate([[0.0], np.cumsum(np.log(arrival) - np.log(departures[1:]))])
+    p = np.exp(log_p - log_p.max())
+    p /= p.sum()
+    expected = abandon * (np.maximum(n - agents, 0) * p).sum() / arrival
+
+    engine = erlang_a_metrics(calls, aht, agents, patience)
+    assert float(engine['abandonment']) == pytest.approx(expected, rel=1e-8)
+
+
+def test_infinite_patience_approaches_erlang_c():
+    calls = np.array([20.0, 50.0, 80.0])
+    agents = np.ceil(traffic_intensity(calls, 270)) + 3
+    engine = erlang_a_metrics(calls, 270, agents, patience=1e9)
+    erlang_c = erlang_c_metrics(calls, 270, agents)
+    np.testing.assert_allclose(engine['prob_wait'], erlang_c['prob_wait'], rtol=1e-5)
+    np.testing.assert_allclose(engine['service_level'], erlang_c['service_level'], rtol=1e-5)
+
+
+def test_required_agents_is_the_minimum():
+    calls = np.array([10.0, 40.0, 100.0, 150.0])
+    agents = required_agents(calls, 270, 120, max_abandon=0.05)
+    at = erlang_a_metrics(calls, 270, agents, 120)['abandonment']
+    below = erlang_a_metrics(calls, 270, agents - 1, 120)['abandonment']
+    assert np.all(at <= 0.05)
+    assert np.all(below > 0.05)
@@ -0,0 +1,106 @@
+"""Checks the vectorized Erlang C engine (erlang_c.py) against the closed form"""
+
+import math
+
+import numpy as np
+import pytest
+
+from erlang_c import average_speed_of_answer, erlang_c, erlang_c_metrics, required_agents, service_level
+
+AHT = 270
+THRESHOLD = 90
+# traffic (Erlangs), agents: small teams, a tight queue and N≈300 where FACT() overflows
+CASES = [
+    (0.5, 1),
+    (2.0, 3),
+    (4.2, 5),
+    (8.0, 12),
+    (45.0, 50),
+    (280.0, 290),
+    (290.0, 300),
+    (300.0, 330),
+]
+# Calls per 15-minute interval, from a handful of calls to a ~300-agent queue
+STAFFING_CALLS = np.array([1.0, 6.0, 25.0, 80.0, 150.0, 400.0, 1000.0])
+
+
+def closed_form(traffic, agents):
+    """
+    Erlang C straight from its definition, with every A^k/k! term in log space:
+    P(W>0) = [A^N/N! × N/(N-A)] / [Σ_{k<N} A^k/k! + A^N/N! × N/(N-A)]
+    """
+    log_terms = [k * math.log(traffic) - math.lgamma(k + 1) for k in range(agents)]
+    log_waiting = agents * math.log(traffic) - math.lgamma(agents + 1) + math.log(agents / (agents - traffic))
+    peak = max(log_terms + [log_waiting])
+    total = sum(math.exp(term - peak) for term in log_terms) + math.exp(log_waiting - peak)
+    prob_wait = math.exp(log_waiting - peak) / total
+    return {
+        'prob_wait': prob_wait,
+        'service_level': 1 - prob_wait * math.exp(-(agents - traffic) * THRESHOLD / AHT),
+        'asa': prob_wait * AHT / (agents - traffic),
+    }
+
+
+@pytest.mark.parametrize('traffic, agents', CASES)
+def test_matches_closed_form(traffic, agents):
+    exact = closed_form(traffic, agents)
+    assert float(erlang_c(traffic, agents)) == pytest.approx(exact['prob_wait'], rel=1e-10)
+    assert float(service_level(traffic, agents, AHT, THRESHOLD)) == pytest.approx(exact['service_level'], rel=1e-10)
+    assert float(average_speed_of_answer(traffic, agents, AHT)) == pytest.approx(exact['asa'], rel=1e-10)
+
+
+def test_vectorized_matches_scalar():
+    traffic = np.array([case[0] for case in CASES])
+    agents = np.array([case[1] for case in CASES])
+    expected = [closed_form(a, n)['prob_wait'] for a, n in CASES]
+    np.testing.assert_allclose(erlang_c(traffic, agents), expected, rtol=1e-10)
+
+
+@pytest.mark.parametrize('traffic, agents', [(4.2, 6.25), (45.0, 51.5), (290.0, 300.75)])
+def test_fractional_agents_interpolate(traffic, agents):
+    lower = math.floor(agents)
+    weight = agents - lower
+    below, above = closed_form(traffic, lower)['prob_wait'], closed_form(traffic, lower + 1)['prob_wait']
+    assert float(erlang_c(traffic, agents)) == pytest.approx(below + weight * (above - below), rel=1e-10)
+    assert above < float(erlang_c(traffic, agents)) < below
+
+
+def test_fractional_agents_just_above_traffic():
+    # floor(N) <= A waits with certainty; the next whole agent count is stable
+    traffic, agents = 4.2, 4.6
+    above = closed_form(traffic, 5)['prob_wait']
+    assert float(erlang_c(traffic, agents)) == pytest.approx(1 + 0.6 * (above - 1), rel=1e-10)
+
+
+def test_unstable_intervals():
+    assert float(erlang_c(5.0, 5)) == 1.0
+    assert float(service_level(5.0, 4, AHT)) == 0.0
+    assert float(average_speed_of_answer(5.0, 5, AHT)) == math.inf
+
+
+@pytest.mark.parametrize('target, metric, meets', [
+    ({'target_sl': 0.80}, 'service_level', lambda value: value >= 0.80),
+    ({'target_sl': 0.95, 'threshold': 20}, 'service_level', lambda value: value >= 0.95),
+    ({'target_sl': None, 'max_asa': 15}, 'asa', lambda value: value <= 15),
+    ({'target_sl': None, 'max_occupancy': 0.85}, 'occupancy', lambda value: value <= 0.85),
+])
+def test_required_agents_is_the_minimum(target, metric, meets):
+    threshold = target.get('threshold', THRESHOLD)
+    agents = required_agents(STAFFING_CALLS, AHT, **target)
+    at = erlang_c_metrics(STAFFING_CALLS, AHT, agents, threshold=threshold)
+    below = erlang_c_metrics(STAFFING_CALLS, AHT, agents - 1, threshold=threshold)
+    assert np.all(meets(at[metric]) & (agents > at['traffic']))
+    # One agent fewer misses the target or cannot keep up with the traffic (occupancy() reads 0 at 0 agents)
+    assert not np.any(meets(below[metric]) & (agents - 1 > below['traffic']))
+
+
+def test_required_agents_meets_every_target():
+    agents = required_agents(STAFFING_CALLS, AHT, target_sl=0.80, max_asa=10, max_occupancy=0.80)
+    at = erlang_c_metrics(STAFFING_CALLS, AHT, agents)
+    below = erlang_c_metrics(STAFFING_CALLS, AHT, agents - 1)
+    assert np.all((at['service_level'] >= 0.80) & (at['asa'] <= 10) & (at['occupancy'] <= 0.80))
+    assert not np.any((below['service_level'] >= 0.80) & (below['asa'] <= 10) & (below['occupancy'] <= 0.80))
+
+
+def test_required_agents_with_no_calls():
+    assert required_agents(np.array([0.0, 10.0]), AHT)[0] == 0
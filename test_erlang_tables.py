@@ -0,0 +1,45 @@
+"""Checks for the precomputed Erlang C lookup table (erlang_tables.py)"""
+
+import os
+
+import numpy as np
+import pytest
+
+from erlang_c import erlang_c
+from erlang_tables import ErlangTable, build_table
+
+# Worst midpoint interpolation error quoted for the default grid (step 0.02)
+DEFAULT_MAX_ERROR = 4.9e-5
+
+
+@pytest.fixture(scope='module')
+def table(tmp_path_factory):
+    table_file = str(tmp_path_factory.mktemp('erlang_table') / 'erlang_c_table.npy')
+    build_table(table_file)
+    return ErlangTable(table_file)
+
+
+def test_default_grid_interpolation_error(table):
+    assert table.max_error == pytest.approx(DEFAULT_MAX_ERROR, abs=1e-6)
+
+
+def test_lookups_match_exact_within_recorded_error(table):
+    rng = np.random.default_rng(0)
+    traffic = rng.uniform(0, table.max_traffic, 20000)
+    agents = np.ceil(traffic) + rng.integers(0, 15, traffic.size)
+    agents = np.minimum(agents, table.max_agents - 1)
+
+    error = np.abs(table.erlang_c(traffic, agents) - erlang_c(traffic, agents))
+    # float32 storage adds rounding on top of the interpolation error
+    assert error.max() <= table.max_error + 1e-6
+
+
+def test_outside_grid_falls_back_to_exact(table):
+    traffic = np.array([table.max_traffic + 10, 50.0])
+    agents = np.array([table.max_traffic + 25, table.max_agents + 5])
+    np.testing.assert_allclose(table.erlang_c(traffic, agents), erlang_c(traffic, agents))
+
+
+def test_build_leaves_no_temp_files(table, tmp_path):
+    build_table(str(tmp_path / 'table.npy'), max_traffic=5.0, max_agents=20)
+    assert sorted(os.listdir(tmp_path)) == ['table.json', 'table.npy']
@@ -0,0 +1,89 @@
+"""Checks that incremental forecast state updates match a batch run (forecast_state.py)"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecast_state import ForecastState
+from holt_winters import HoltWinters, initial_states, interval_series, run_filter
+from interval_data import read_interval_data
+from seasonal_decomposition import DecompositionState
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'call_center_annual_data.csv')
+SPLIT_DATE = pd.Timestamp('2025-06-30')
+
+
+@pytest.fixture(scope='module')
+def history():
+    return read_interval_data(HISTORY_FILE)
+
+
+@pytest.fixture(scope='module')
+def split(history):
+    return history[history['Date'] <= SPLIT_DATE], history[history['Date'] > SPLIT_DATE]
+
+
+def test_holt_winters_updates_match_one_filter_pass(history):
+    y = interval_series(history)[0]['value'].to_numpy(dtype=float)
+    m1, m2 = 36, 36 * 7
+    fit_length = 8 * m2
+    params = np.array([0.1, 0.01, 0.2, 0.2])
+
+    model = HoltWinters(m1, params=params).fit(y[:fit_length])
+    for start in range(fit_length, len(y), m1):
+        model.update(y[start:start + m1])
+
+    # One pass over the whole series from the same starting states
+    sse, level, trend, daily, weekly = run_filter(y, params[None, :], m1, m2,
+                                                  initial_states(y[:fit_length], m1, m2), burn_in=m2)
+    assert model.n == len(y)
+    assert model.level == level[0]
+    assert model.trend_value == trend[0]
+    np.testing.assert_array_equal(model.daily, daily[:, 0])
+    np.testing.assert_array_equal(model.weekly, weekly[:, 0])
+    assert model.sse == pytest.approx(sse[0], rel=1e-12)
+
+
+def test_decomposition_updates_match_batch(history, split):
+    before, after = split
+    state = ForecastState.from_history(before)
+    state.update(after)
+    batch = DecompositionState.from_history(history)
+
+    incremental = state.decomposition
+    assert incremental.last_date == batch.last_date
+    np.testing.assert_allclose(incremental.slot_totals, batch.slot_totals, rtol=1e-12)
+    np.testing.assert_array_equal(incremental.slot_days, batch.slot_days)
+    np.testing.assert_allclose(incremental.xtx, batch.xtx, rtol=1e-12)
+    np.testing.assert_allclose(incremental.xty, batch.xty, rtol=1e-12)
+
+
+def test_exponential_smoothing_updates_match_batch(history, split):
+    before, after = split
+    state = ForecastState.from_history(before)
+    state.update(after)
+
+    matrix = interval_series(history)[0]['value'].to_numpy(dtype=float).reshape(-1, len(state.slots))
+    levels = matrix[0].copy()
+    for row in matrix[1:]:
+        levels += state.ses_alpha * (row - levels)
+    np.testing.assert_allclose(state.ses_levels, levels, rtol=1e-12)
+
+
+def test_update_rejects_a_gap(split):
+    before, after = split
+    state = ForecastState.from_history(before)
+    gap = after[after['Date'] != SPLIT_DATE + pd.Timedelta(days=3)]
+    with pytest.raises(ValueError, match='2025-07-03'):
+        state.update(gap)
+    assert state.last_date == SPLIT_DATE
+    assert state.holt_winters.n == ForecastState.from_history(before).holt_winters.n
+
+
+def test_add_day_rejects_a_date_out_of_sequence(split):
+    before, after = split
+    state = ForecastState.from_history(before)
+    with pytest.raises(ValueError, match='does not follow'):
+        state.add_day(after[after['Date'] == SPLIT_DATE + pd.Timedelta(days=2)])
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Cached Formula Values - Workbooks That Open Without Recalculating
+
+openpyxl saves every formula cell with an empty cached value, so Excel has
+to recalculate the whole workbook when it opens, and readers without a
+calculation engine (pandas, openpyxl data_only=True, LibreOffice headless
+conversions) see empty cells. The generators already compute the same
+numbers in Python (the Erlang C engine), so this module stores those
+results next to the formulas in the saved file:
+
+    workbook.save(path)
+    cache_formula_values(path, 'Schedule_Service_Level',
+                         columns={'K': (8, service_levels)},
+                         cells={'C48': average_service_level})
+
+Formulas are kept, so editing an input in Excel recalculates as before.
+Only the named sheet's XML is rewritten, in row-aligned chunks, so memory
+stays flat for full-horizon sheets. When every formula in a workbook gets a
+cached value, keep_cached_values() also tells Excel to use them instead of
+recalculating on load.
+"""
+
+import math
+import os
+import posixpath
+import re
+import struct
+import zipfile
+from copy import copy
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+# calcId of current Excel versions; files saved with an older calculation
+# engine id are recalculated in full when opened
+EXCEL_CALC_ID = 191029
+
+CHUNK_BYTES = 1 << 20
+
+# A formula cell as openpyxl writes it: <c r="K8" s="3"><f>...</f><v></v></c>
+FORMULA_CELL = re.compile(rb'<c r="([A-Z]+)([0-9]+)"([^>]*)><f>(.*?)</f><v\s*(?:/>|></v>)</c>', re.S)
+
+NAMESPACES = {
+    'main': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+    'rel': 'http://schemas.openxmlformats.org/package/2006/relationships',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+}
+
+
+def excel_round(values, digits=0):
+    """ROUND() as Excel computes it: halves round away from zero (NumPy rounds them to even)"""
+    scale = 10.0 ** digits
+    values = np.asarray(values, dtype=float)
+    return np.sign(values) * np.floor(np.abs(values) * scale + 0.5 + 1e-9) / scale
+
+
+def keep_cached_values(workbook):
+    """
+    Let Excel open `workbook` from its cached values instead of recalculating.
+
+    Only use this when every formula in the workbook gets a cached value
+    (e.g. a streamed single-sheet workbook); formulas still recalculate
+    normally as soon as an input is edited.
+    """
+    workbook.calculation.fullCalcOnLoad = False
+    workbook.calculation.calcId = EXCEL_CALC_ID
+
+
+def sheet_part(archive, title):
+    """Path of the worksheet XML for sheet `title` inside an open .xlsx archive"""
+    workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    rels = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    targets = {rel.get('Id'): rel.get('Target') for rel in rels.iter(f"{{{NAMESPACES['rel']}}}Relationship")}
+    for sheet in workbook.iter(f"{{{NAMESPACES['main']}}}sheet"):
+        if sheet.get('name') == title:
+            target = targets[sheet.get(f"{{{NAMESPACES['r']}}}id")]
+            return target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+    raise KeyError(f"Worksheet '{title}' not found")
+
+
+def copy_raw_entry(source, target, info):
+    """
+    Copy archive member `info` from `source` to `target` (open ZipFiles) as is.
+
+    The local header and compressed bytes are copied without inflating and
+    deflating them again, so the entry stays byte-for-byte identical and the
+    cost is plain I/O. zipfile has no public API for this, so the entry is
+    registered in the target's central directory directly.
+    """
+    source.fp.seek(info.header_offset)
+    header = source.fp.read(zipfile.sizeFileHeader)
+    if header[:4] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    name_length, extra_length = struct.unpack('<HH', header[26:30])
+    remaining = name_length + extra_length + info.compress_size
+
+    entry = copy(info)
+    entry.header_offset = target.fp.tell()
+    target.fp.write(header)
+    while remaining:
+        block = source.fp.read(min(remaining, CHUNK_BYTES))
+        if not block:
+            raise zipfile.BadZipFile(f"Truncated entry {info.filename}")
+        target.fp.write(block)
+        remaining -= len(block)
+    if info.flag_bits & 0x08:
+        # Data descriptor after the data, with or without its signature
+        descriptor = source.fp.read(4)
+        zip64 = max(info.compress_size, info.file_size) > zipfile.ZIP64_LIMIT
+        size = (20 if zip64 else 12) if descriptor == b'PK\x07\x08' else (16 if zip64 else 8)
+        target.fp.write(descriptor + source.fp.read(size))
+
+    target.filelist.append(entry)
+    target.NameToInfo[entry.filename] = entry
+    target.start_dir = target.fp.tell()
+
+
+def _cached(value):
+    """(type attribute, <v> text) for a cached value, or None if it cannot be cached"""
+    if value is None:
+        return None
+    if isinstance(value, (bool, np.bool_)):
+        return ' t="b"', '1' if value else '0'
+    if isinstance(value, str):
+        return ' t="str"', escape(value)
+    value = float(value)
+    if not math.isfinite(value):
+        return None
+    return '', repr(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+def cache_formula_values(path, title, columns=None, cells=None):
+    """
+    Store computed results as the cached values of formula cells in a saved workbook.
+
+    Args:
+        path: .xlsx file written by openpyxl (rewritten in place)
+        title: worksheet to update; every other part is copied byte for byte
+        columns: {column letter: (first row, values)} for per-row formulas,
+            e.g. {'K': (8, service_levels)}; values may mix numbers and text
+        cells: {coordinate: value} for single cells such as summary KPIs
+
+    Returns:
+        number of formula cells that received a cached value. Cells without
+        a value (out of range, None, NaN or infinite) stay uncached.
+    """
+    columns = {column.encode(): (first, values) for column, (first, values) in (columns or {}).items()}
+    cells = {coordinate: value for coordinate, value in (cells or {}).items()}
+    cached_count = 0
+
+    def fill(match):
+        nonlocal cached_count
+        column, row, attributes, formula = match.groups()
+        coordinate = f"{column.decode()}{row.decode()}"
+        if coordinate in cells:
+            value = cells[coordinate]
+        elif column in columns:
+            first, values = columns[column]
+            index = int(row) - first
+            value = values[index] if 0 <= index < len(values) else None
+        else:
+            return match.group(0)
+        cached = _cached(value)
+        if cached is None:
+            return match.group(0)
+        cached_count += 1
+        data_type, text = cached
+        return (b'<c r="' + column + row + b'"' + attributes + data_type.encode() + b'><f>' + formula
+                + b'</f><v>' + text.encode() + b'</v></c>')
+
+    temp_path = f"{path}.tmp"
+    with zipfile.ZipFile(path) as source, zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as target:
+        part = sheet_part(source, title)
+        for item in source.infolist():
+            if item.filename != part:
+                copy_raw_entry(source, target, item)
+                continue
+            with source.open(item) as reader, target.open(item, 'w') as writer:
+                pending = b''
+                while True:
+                    chunk = reader.read(CHUNK_BYTES)
+                    data = pending + chunk
+                    # Only substitute up to the last complete row
+                    if chunk:
+                        end = data.rfind(b'</row>')
+                        end = end + len(b'</row>') if end >= 0 else 0
+                    else:
+                        end = len(data)
+                    writer.write(FORMULA_CELL.sub(fill, data[:end]))
+                    pending = data[end:]
+                    if not chunk:
+                        break
+    os.replace(temp_path, path)
+    return cached_count
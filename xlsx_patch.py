@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Worksheet Patching - Replace One Sheet Inside an Existing Workbook
+
+Updating a sheet with openpyxl.load_workbook() + save() parses and rewrites
+every sheet in the file, so the cost grows with everything else the
+workbook holds, and anything openpyxl does not round-trip is lost on the
+way. replace_sheet() instead moves a single worksheet part from a freshly
+written workbook into the existing package:
+
+    sheet_workbook.save('schedule.xlsx')          # just the new sheet
+    replace_sheet('erlang_c_staffing_forecast.xlsx', 'schedule.xlsx',
+                  'Schedule_Service_Level', index=0)
+
+- The sheet XML is streamed across in chunks, with its style references
+  (s="..." and conditional-format dxfId="...") remapped to the target
+- The styles the sheet uses are merged into the target's styles.xml;
+  identical entries are reused, so repeated updates do not grow it
+- workbook.xml, its relationships and [Content_Types].xml only change when
+  the sheet is new to the workbook
+- Every other part (other worksheets, comments, theme, ...) is copied as
+  stored, byte for byte, without being decompressed
+
+so the update time depends on the size of the sheet being written, not on
+the rest of the workbook.
+"""
+
+import itertools
+import os
+import re
+import zipfile
+from copy import copy
+from xml.sax.saxutils import escape
+
+from xlsx_cache import CHUNK_BYTES, NAMESPACES, copy_raw_entry, sheet_part
+
+STYLES_PART = 'xl/styles.xml'
+WORKBOOK_PART = 'xl/workbook.xml'
+WORKBOOK_RELS = 'xl/_rels/workbook.xml.rels'
+CONTENT_TYPES = '[Content_Types].xml'
+CALC_CHAIN = 'xl/calcChain.xml'
+
+WORKSHEET_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet'
+WORKSHEET_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml'
+
+# styles.xml sections in schema order, with the element each one lists
+STYLE_SECTIONS = [
+    ('numFmts', 'numFmt'), ('fonts', 'font'), ('fills', 'fill'), ('borders', 'border'),
+    ('cellStyleXfs', 'xf'), ('cellXfs', 'xf'), ('cellStyles', 'cellStyle'), ('dxfs', 'dxf'),
+    ('tableStyles', None), ('colors', None), ('extLst', None),
+]
+
+# Style references inside worksheet XML
+CELL_STYLE = re.compile(rb'(<(?:c|row)\b[^>]*?\ss=")([0-9]+)"')
+COLUMN_STYLE = re.compile(rb'(<col\b[^>]*?\sstyle=")([0-9]+)"')
+DXF_ID = re.compile(rb'(<cfRule\b[^>]*?\sdxfId=")([0-9]+)"')
+TAB_SELECTED = re.compile(rb'\stabSelected="(?:1|true)"')
+
+
+def _section(xml, name):
+    """Match of a styles.xml section: group 1 = attributes, group 2 = children (None if empty)"""
+    return re.search(rb'<%s\b([^>]*?)(?:/>|>(.*?)</%s>)' % (name.encode(), name.encode()), xml, re.S)
+
+
+def _children(xml, name, child):
+    match = _section(xml, name)
+    if not match or not match.group(2):
+        return []
+    tag = child.encode()
+    return re.findall(rb'<%s\b[^>]*?/>|<%s\b[^>]*>.*?</%s>' % (tag, tag, tag), match.group(2), re.S)
+
+
+def _attribute(entry, name):
+    match = re.search(rb'\s%s="([^"]*)"' % name.encode(), entry)
+    return match.group(1) if match else None
+
+
+def _set_attribute(entry, name, value):
+    """`entry` (an element or its attribute text) with attribute `name` set to `value`"""
+    value = str(value).encode()
+    pattern = re.compile(rb'(\s%s=")[^"]*"' % name.encode())
+    if pattern.search(entry):
+        return pattern.sub(lambda match: match.group(1) + value + b'"', entry, count=1)
+    if entry.startswith(b'<'):
+        end = len(entry) - 2 if entry.endswith(b'/>') else entry.index(b'>')
+        return entry[:end].rstrip() + b' %s="%s"' % (name.encode(), value) + entry[end:]
+    return entry + b' %s="%s"' % (name.encode(), value)
+
+
+def _remap(entry, name, mapping):
+    """Translate index attribute `name` of `entry` through `mapping` (unmapped values are kept)"""
+    pattern = re.compile(rb'(\s%s=")([0-9]+)"' % name.encode())
+    return pattern.sub(lambda match: match.group(1) + str(mapping.get(int(match.group(2)),
+                                                                      int(match.group(2)))).encode() + b'"',
+                       entry)
+
+
+def merge_styles(target_xml, source_xml):
+    """
+    Add the formats of one workbook's styles.xml to another's.
+
+    Entries that already exist in the target (byte-identical XML, or the same
+    number format code or named style) are reused; the rest are appended, so
+    the target's existing indices never change.
+
+    Args:
+        target_xml: styles.xml of the workbook being updated
+        source_xml: styles.xml of the workbook the sheet comes from
+
+    Returns:
+        (merged styles.xml, cell format map, differential format map): the
+        maps translate the source sheet's s="..." and dxfId="..." indices
+    """
+    if not _section(target_xml, 'cellXfs'):
+        raise ValueError("Unsupported styles.xml: no cellXfs section")
+    ours = {name: _children(target_xml, name, child) for name, child in STYLE_SECTIONS if child}
+    theirs = {name: _children(source_xml, name, child) for name, child in STYLE_SECTIONS if child}
+    counts = {name: len(entries) for name, entries in ours.items()}
+
+    def merge(name, transform=None):
+        mapping = {}
+        for index, entry in enumerate(theirs[name]):
+            if transform:
+                entry = transform(entry)
+            if entry in ours[name]:
+                mapping[index] = ours[name].index(entry)
+            else:
+                mapping[index] = len(ours[name])
+                ours[name].append(entry)
+        return mapping
+
+    # Custom number formats (ids from 164) are matched by format code
+    codes = {_attribute(entry, 'formatCode'): int(_attribute(entry, 'numFmtId')) for entry in ours['numFmts']}
+    next_id = max([163, *codes.values()]) + 1
+    number_formats = {}
+    for entry in theirs['numFmts']:
+        code = _attribute(entry, 'formatCode')
+        if code not in codes:
+            codes[code] = next_id
+            ours['numFmts'].append(_set_attribute(entry, 'numFmtId', next_id))
+            next_id += 1
+        number_formats[int(_attribute(entry, 'numFmtId'))] = codes[code]
+
+    fonts, fills, borders = merge('fonts'), merge('fills'), merge('borders')
+
+    def format_ids(entry):
+        for name, mapping in (('numFmtId', number_formats), ('fontId', fonts), ('fillId', fills),
+                              ('borderId', borders)):
+            entry = _remap(entry, name, mapping)
+        return entry
+
+    style_formats = merge('cellStyleXfs', format_ids)
+
+    # Named styles keep the target's definition when the name already exists
+    named = {_attribute(entry, 'name'): int(_attribute(entry, 'xfId') or 0) for entry in ours['cellStyles']}
+    for entry in theirs['cellStyles']:
+        name, style_format = _attribute(entry, 'name'), int(_attribute(entry, 'xfId') or 0)
+        if name in named:
+            style_formats[style_format] = named[name]
+        else:
+            ours['cellStyles'].append(_remap(entry, 'xfId', style_formats))
+            named[name] = style_formats.get(style_format, style_format)
+
+    cell_formats = merge('cellXfs', lambda entry: _remap(format_ids(entry), 'xfId', style_formats))
+    differential_formats = merge('dxfs')
+
+    merged = target_xml
+    for position, (name, child) in enumerate(STYLE_SECTIONS):
+        if not child or len(ours[name]) == counts[name]:
+            continue
+        match = _section(merged, name)
+        attributes = _set_attribute(match.group(1) if match else b'', 'count', len(ours[name]))
+        section = b'<%s%s>%s</%s>' % (name.encode(), attributes, b''.join(ours[name]), name.encode())
+        if match:
+            merged = merged[:match.start()] + section + merged[match.end():]
+            continue
+        # Missing section: insert it before the next section present, in schema order
+        following = [_section(merged, later) for later, _ in STYLE_SECTIONS[position + 1:]]
+        following = [match.start() for match in following if match]
+        start = min(following) if following else merged.rindex(b'</styleSheet>')
+        merged = merged[:start] + section + merged[start:]
+    return merged, cell_formats, differential_formats
+
+
+def _rels_part(part):
+    directory, name = part.rsplit('/', 1)
+    return f"{directory}/_rels/{name}.rels"
+
+
+def _add_sheet_entry(workbook_xml, rels_xml, content_types, title, part, index):
+    """workbook.xml, its relationships and [Content_Types].xml with a new sheet registered"""
+    relation_ids = {int(number) for number in re.findall(rb'\sId="rId([0-9]+)"', rels_xml)}
+    relation_id = f"rId{max(relation_ids, default=0) + 1}"
+    rels_xml = rels_xml.replace(
+        b'</Relationships>',
+        f'<Relationship Type="{WORKSHEET_TYPE}" Target="/{part}" Id="{relation_id}"/></Relationships>'.encode())
+    content_types = content_types.replace(
+        b'</Types>', f'<Override PartName="/{part}" ContentType="{WORKSHEET_CONTENT_TYPE}"/></Types>'.encode())
+
+    sheets = list(re.finditer(rb'<sheet\b[^>]*/>', workbook_xml))
+    sheet_id = max([int(_attribute(sheet.group(0), 'sheetId')) for sheet in sheets], default=0) + 1
+    entry = (f'<sheet xmlns:r="{NAMESPACES["r"]}" name="{escape(title, {chr(34): "&quot;"})}" '
+             f'sheetId="{sheet_id}" state="visible" r:id="{relation_id}"/>').encode()
+    if index is None or index >= len(sheets):
+        workbook_xml = workbook_xml.replace(b'</sheets>', entry + b'</sheets>', 1)
+    else:
+        start = sheets[index].start()
+        workbook_xml = workbook_xml[:start] + entry + workbook_xml[start:]
+        # Sheet-scoped names and the active tab keep pointing at the same sheets
+        shift = re.compile(rb'(\s(?:localSheetId|activeTab)=")([0-9]+)"')
+        workbook_xml = shift.sub(lambda match: match.group(1) + str(
+            int(match.group(2)) + (int(match.group(2)) >= index)).encode() + b'"', workbook_xml)
+    return workbook_xml, rels_xml, content_types
+
+
+def _copy_sheet(source, part, target, name, cell_formats, differential_formats):
+    """Stream worksheet XML between archives, translating its style indices"""
+    def translate(mapping):
+        return lambda match: match.group(1) + str(mapping.get(int(match.group(2)), 0)).encode() + b'"'
+
+    with source.open(part) as reader, target.open(name, 'w') as writer:
+        pending = b''
+        while True:
+            chunk = reader.read(CHUNK_BYTES)
+            data = pending + chunk
+            # Only rewrite up to the last complete tag
+            end = data.rfind(b'>') + 1 if chunk else len(data)
+            text = CELL_STYLE.sub(translate(cell_formats), data[:end])
+            text = COLUMN_STYLE.sub(translate(cell_formats), text)
+            text = DXF_ID.sub(translate(differential_formats), text)
+            # The target keeps its own selected tab
+            writer.write(TAB_SELECTED.sub(b'', text))
+            pending = data[end:]
+            if not chunk:
+                break
+
+
+def replace_sheet(path, sheet_path, title, index=None):
+    """
+    Put worksheet `title` from the workbook at `sheet_path` into the workbook at `path`.
+
+    Args:
+        path: existing .xlsx to update in place
+        sheet_path: workbook holding the new version of the sheet (e.g.
+            saved by openpyxl, normal or write-only); only that sheet's XML
+            and the styles it uses are read from it
+        title: sheet to replace, or to add when `path` has no sheet by that name
+        index: position of a newly added sheet (default: last); a replaced
+            sheet keeps its position
+
+    Returns:
+        True if an existing sheet was replaced, False if the sheet was added
+    """
+    temp_path = f"{path}.tmp"
+    with zipfile.ZipFile(sheet_path) as sheet, zipfile.ZipFile(path) as source:
+        new_part = sheet_part(sheet, title)
+        if _rels_part(new_part) in sheet.namelist():
+            raise ValueError(f"Worksheet '{title}' has comments, drawings or hyperlinks, "
+                             "which replace_sheet() does not carry over")
+        styles, cell_formats, differential_formats = merge_styles(source.read(STYLES_PART),
+                                                                  sheet.read(STYLES_PART))
+        patched = {STYLES_PART: styles}
+        names = set(source.namelist())
+        try:
+            part = sheet_part(source, title)
+            replaced = True
+        except KeyError:
+            part = next(name for name in (f"xl/worksheets/sheet{number}.xml" for number in itertools.count(1))
+                        if name not in names)
+            replaced = False
+
+        skipped = set()
+        if replaced:
+            # The new sheet has no relationships of its own, and Excel rebuilds
+            # the calculation chain, which may list cells the sheet no longer has
+            skipped = {_rels_part(part), CALC_CHAIN}
+            if CALC_CHAIN in names:
+                patched[WORKBOOK_RELS] = re.sub(rb'<Relationship\b[^>]*calcChain[^>]*/>', b'',
+                                                source.read(WORKBOOK_RELS))
+                patched[CONTENT_TYPES] = re.sub(rb'<Override\b[^>]*/xl/calcChain\.xml"[^>]*/>', b'',
+                                                source.read(CONTENT_TYPES))
+        else:
+            patched[WORKBOOK_PART], patched[WORKBOOK_RELS], patched[CONTENT_TYPES] = _add_sheet_entry(
+                source.read(WORKBOOK_PART), source.read(WORKBOOK_RELS), source.read(CONTENT_TYPES),
+                title, part, index)
+
+        with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as target:
+            for item in source.infolist():
+                if item.filename in skipped:
+                    continue
+                if item.filename == part:
+                    _copy_sheet(sheet, new_part, target, part, cell_formats, differential_formats)
+                elif item.filename in patched:
+                    target.writestr(copy(item), patched[item.filename])
+                else:
+                    copy_raw_entry(source, target, item)
+            if not replaced:
+                _copy_sheet(sheet, new_part, target, part, cell_formats, differential_formats)
+    os.replace(temp_path, path)
+    return replaced